@@ -0,0 +1,52 @@
+from typing import Optional, Sequence
+import numpy as np
+
+# Durations (seconds) every best-effort curve is evaluated at, so cached curves
+# from different activities line up element by element.
+CURVE_DURATIONS = np.array([
+    1, 2, 3, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 300, 420, 600,
+    900, 1200, 1800, 2700, 3600, 5400, 7200, 10800, 14400, 18000,
+], dtype=np.int64)
+
+
+def mean_max(samples: np.ndarray, durations: np.ndarray = CURVE_DURATIONS) -> np.ndarray:
+    """
+    Best average of `samples` over every duration, using a cumulative sum so each
+    duration costs one vectorized pass. Gaps (NaN) count as zero, and durations
+    longer than the activity are NaN.
+    """
+    values = np.nan_to_num(np.asarray(samples, dtype=np.float64), nan=0.0)
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+
+    curve = np.full(len(durations), np.nan, dtype=np.float32)
+    for index, secs in enumerate(durations):
+        if secs > len(values):
+            break
+        curve[index] = (cumulative[secs:] - cumulative[:-secs]).max() / secs
+    return curve
+
+
+def merge_curves(curves: Sequence[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Element-wise best of several cached curves. Returns the merged curve and, per
+    duration, the index of the curve that holds the best (-1 where none does).
+    """
+    if not len(curves):
+        return np.full(len(CURVE_DURATIONS), np.nan, dtype=np.float32), np.full(len(CURVE_DURATIONS), -1)
+
+    stacked = np.vstack(curves)
+    filled = np.where(np.isnan(stacked), -np.inf, stacked)
+    best_index = filled.argmax(axis=0)
+    best = filled[best_index, np.arange(stacked.shape[1])]
+
+    missing = np.isneginf(best)
+    best_index[missing] = -1
+    return np.where(missing, np.nan, best).astype(np.float32), best_index
+
+
+def new_bests(curve: np.ndarray, previous_best: Optional[np.ndarray]) -> np.ndarray:
+    """Mask of durations where `curve` beats `previous_best`."""
+    if previous_best is None:
+        return ~np.isnan(curve)
+    with np.errstate(invalid="ignore"):
+        return ~np.isnan(curve) & (np.isnan(previous_best) | (curve > previous_best))
@@ -0,0 +1,47 @@
+import numpy as np
+
+# Time constants (days) of the fitness (CTL) and fatigue (ATL) averages
+CTL_DAYS = 42
+ATL_DAYS = 7
+
+# Days per closed-form block; keeps decay**-BLOCK far from float64 overflow for ATL_DAYS
+BLOCK_DAYS = 256
+
+
+def ewma(load: np.ndarray, days: float, initial: float = 0.0) -> np.ndarray:
+    """
+    Exponentially weighted daily average y[t] = y[t-1] * k + load[t] * (1 - k),
+    k = exp(-1 / days), starting from y[-1] = initial.
+
+    The recurrence is solved in closed form one block at a time with a cumulative
+    sum, so the whole series is a handful of vectorized passes.
+    """
+    load = np.asarray(load, dtype=np.float64)
+    out = np.empty_like(load)
+    decay = np.exp(-1.0 / days)
+    steps = np.arange(min(BLOCK_DAYS, len(load)), dtype=np.float64)
+    grow = decay ** -steps
+    shrink = decay ** steps
+
+    previous = initial
+    for offset in range(0, len(load), BLOCK_DAYS):
+        block = load[offset:offset + BLOCK_DAYS]
+        n = len(block)
+        weighted = np.cumsum(block * grow[:n])
+        out[offset:offset + n] = shrink[:n] * (decay * previous + (1.0 - decay) * weighted)
+        previous = out[offset + n - 1]
+    return out
+
+
+def fitness_series(
+    load: np.ndarray, ctl: float = 0.0, atl: float = 0.0
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    CTL, ATL and TSB for consecutive days of training load, continuing from
+    the previous day's ctl and atl. TSB (form) is the previous day's CTL - ATL.
+    """
+    ctl_series = ewma(load, CTL_DAYS, ctl)
+    atl_series = ewma(load, ATL_DAYS, atl)
+    form = ctl_series - atl_series
+    tsb_series = np.concatenate(([ctl - atl], form[:-1])) if len(form) else form
+    return ctl_series, atl_series, tsb_series
@@ -0,0 +1,98 @@
+import logging
+from datetime import date, timedelta
+from typing import Any, Optional
+import numpy as np
+from app.enums import RollupPeriod, ZoneKind
+
+logger = logging.getLogger(__name__)
+
+# Every zone vector is stored with this many slots, whatever the athlete's zone setup.
+ZONE_SLOTS = 10
+
+# icu_zone_times ids -> slot; sweet spot gets the slot after Z7
+POWER_ZONE_SLOTS = {f"Z{n}": n - 1 for n in range(1, 8)} | {"SS": 7}
+
+# IcuActivity key holding each kind of zone time
+ICU_ZONE_KEYS = {
+    ZoneKind.power: "icu_zone_times",
+    ZoneKind.hr: "icu_hr_zone_times",
+    ZoneKind.pace: "pace_zone_times",
+    ZoneKind.gap: "gap_zone_times",
+}
+
+
+def _secs(value: Any) -> int:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise ValueError(f"expected whole seconds, got {value!r}")
+
+
+def _zone_list(value: Any) -> list[Any]:
+    if isinstance(value, list):
+        return value
+    raise ValueError(f"expected a list, got {value!r}")
+
+
+def zone_vector(values: list[int]) -> np.ndarray:
+    vector = np.zeros(ZONE_SLOTS, dtype=np.int64)
+    secs = np.asarray([_secs(value) for value in _zone_list(values)[:ZONE_SLOTS]], dtype=np.int64)
+    vector[:len(secs)] = secs
+    return vector
+
+
+def power_zone_vector(zones: list[dict[str, Any]]) -> np.ndarray:
+    vector = np.zeros(ZONE_SLOTS, dtype=np.int64)
+    for zone in _zone_list(zones):
+        if not isinstance(zone, dict):
+            raise ValueError(f"expected a zone object, got {zone!r}")
+        slot = POWER_ZONE_SLOTS.get(zone.get("id"))
+        if slot is not None:
+            vector[slot] += _secs(zone.get("secs") or 0)
+    return vector
+
+
+def extract_zone_times(icu_data: dict[str, Any]) -> dict[ZoneKind, np.ndarray]:
+    """
+    Fixed-width seconds-in-zone vectors of an IcuActivity payload. A malformed
+    zone field is logged and left out rather than failing the activity's batch.
+    """
+    zone_times = {}
+    for kind, key in ICU_ZONE_KEYS.items():
+        values = icu_data.get(key)
+        if not values:
+            continue
+        try:
+            zone_times[kind] = power_zone_vector(values) if kind == ZoneKind.power else zone_vector(values)
+        except ValueError as exc:
+            logger.warning("Skipping %s of Intervals.icu activity %s: %s", key, icu_data.get("id"), exc)
+    return zone_times
+
+
+def period_start(day: date, period: RollupPeriod) -> date:
+    if period == RollupPeriod.week:
+        return day - timedelta(days=day.weekday())
+    if period == RollupPeriod.month:
+        return day.replace(day=1)
+    return day
+
+
+def rollup_deltas(
+    removed: list[tuple[Any, Optional[date], str, np.ndarray]],
+    added: list[tuple[Any, Optional[date], str, np.ndarray]],
+) -> dict[tuple[Any, RollupPeriod, date, str], np.ndarray]:
+    """
+    Signed per-bucket changes for every rollup period, given the (athlete_id,
+    day, kind, secs) vectors leaving and entering the per-activity table.
+    Buckets whose change nets out to zero are dropped.
+    """
+    deltas: dict[tuple[Any, RollupPeriod, date, str], np.ndarray] = {}
+    for sign, entries in ((-1, removed), (1, added)):
+        for athlete_id, day, kind, secs in entries:
+            if day is None:
+                continue
+            for period in RollupPeriod:
+                key = (athlete_id, period, period_start(day, period), kind)
+                deltas[key] = deltas.get(key, 0) + sign * np.asarray(secs, dtype=np.int64)
+    return {key: delta for key, delta in deltas.items() if delta.any()}
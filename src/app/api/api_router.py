@@ -1,10 +1,10 @@
 from fastapi import APIRouter
-from starlette.responses import JSONResponse
+from app.api.responses import ModelJSONResponse
 from app.schemas.errors import ErrorResponse
-from app.api.routers import athletes, completed_activities, planned_activities, activities
+from app.api.routers import athletes, completed_activities, planned_activities, activities, streams, analytics, health
 
 api_router = APIRouter(
-    default_response_class=JSONResponse,
+    default_response_class=ModelJSONResponse,
     responses={
         400: {"model": ErrorResponse},
         401: {"model": ErrorResponse},
@@ -18,3 +18,6 @@ api_router.include_router(athletes.router, prefix="/athletes", tags=["Athletes"]
 api_router.include_router(completed_activities.router, prefix="/completedActivities", tags=["Completed Activities"])
 api_router.include_router(planned_activities.router, prefix="/plannedActivities", tags=["Planned Activities"])
 api_router.include_router(activities.router, prefix="/activities", tags=["Activities"])
+api_router.include_router(streams.router, prefix="/streams", tags=["Activity Streams"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+api_router.include_router(health.router, prefix="/health", tags=["Health"])
@@ -0,0 +1,25 @@
+from typing import Any, AsyncIterable, Optional
+from fastapi import Request
+from pydantic import BaseModel
+from starlette.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request) -> bool:
+    """Whether the client opted into a streamed newline-delimited JSON body."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def _lines(records: AsyncIterable[Any], schema: Optional[type[BaseModel]]) -> AsyncIterable[bytes]:
+    async for record in records:
+        model = record if schema is None else schema.model_validate(record, from_attributes=True)
+        yield model.model_dump_json().encode() + b"\n"
+
+
+def ndjson_response(records: AsyncIterable[Any], schema: Optional[type[BaseModel]] = None) -> StreamingResponse:
+    """
+    Stream one JSON document per record as it arrives. Records are validated
+    against schema, or sent as-is when they already are pydantic models.
+    """
+    return StreamingResponse(_lines(records, schema), media_type=NDJSON_MEDIA_TYPE)
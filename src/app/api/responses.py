@@ -0,0 +1,19 @@
+from typing import Any
+from pydantic_core import to_json
+from starlette.responses import JSONResponse
+
+
+class ModelJSONResponse(JSONResponse):
+    """
+    JSON response rendered to bytes by pydantic-core in one step.
+
+    Pydantic models are dumped through their compiled serializer; plain
+    content (the dicts FastAPI produces from a response_model) takes the same
+    path, so UUIDs and datetimes need no jsonable_encoder pass. Routes that
+    build their response model themselves can return this class directly to
+    skip response_model validation as well.
+    """
+
+    def render(self, content: Any) -> bytes:
+        # NaN and infinities have no JSON form; send null like the model serializers do
+        return to_json(content, inf_nan_mode="null")
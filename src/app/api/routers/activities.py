@@ -1,19 +1,32 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
+from app.db.session import get_read_db
+from app.api.ndjson import ndjson_response, wants_ndjson
+from app.api.responses import ModelJSONResponse
 from ...schemas.activities import ActivitiesResponse
 from app.services import activities_service
+from app.services.calendar_cache import calendar_cache
 import uuid
 from datetime import datetime
 
 router = APIRouter()
 
+@router.get("/cache/stats", response_model=dict[str, int])
+async def get_calendar_cache_stats():
+    """Hit, miss, eviction and invalidation counters of the calendar cache."""
+    return calendar_cache.stats()
+
+
 @router.get("/{athlete_id}", response_model=ActivitiesResponse)
 async def get_activities_view(
+    request: Request,
     athlete_id: uuid.UUID,
     start_date: datetime = Query(..., description="Start of the activities"),
     end_date: datetime = Query(..., description="End of the activities"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
+    if wants_ndjson(request):
+        return ndjson_response(activities_service.stream_activities_events(db, athlete_id, start_date, end_date))
     events = await activities_service.get_activities_events(db, athlete_id, start_date, end_date)
-    return ActivitiesResponse(events=events)
\ No newline at end of file
+    # The entries were built and validated by the service; serialize them as they are
+    return ModelJSONResponse(ActivitiesResponse.model_construct(events=events))
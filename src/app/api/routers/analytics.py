@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_db, get_read_db
+from app.enums import CurveKind, RollupPeriod, ZoneKind
+from app.analytics.curves import CURVE_DURATIONS
+from app.schemas.analytics import AchievementRead, CurvePoint, CurveResponse, DailySummaryResponse, FitnessResponse, ZoneTimesResponse
+from app.services import curve_service, daily_summary_service, fitness_service, zone_time_service
+import math
+import uuid
+from datetime import date, datetime
+from typing import List, Optional
+
+router = APIRouter()
+
+@router.get("/activities/{activity_id}/achievements", response_model=List[AchievementRead])
+async def get_activity_achievements(activity_id: uuid.UUID, db: AsyncSession = Depends(get_read_db)):
+    achievements = await curve_service.get_activity_achievements(db, activity_id)
+    if achievements is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Completed activity not found")
+    return achievements
+
+@router.get("/{athlete_id}/curves/{kind}", response_model=CurveResponse)
+async def get_athlete_curve(
+    athlete_id: uuid.UUID,
+    kind: CurveKind,
+    start_date: Optional[datetime] = Query(None, description="Start of the range"),
+    end_date: Optional[datetime] = Query(None, description="End of the range"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    curve, activity_ids = await curve_service.get_athlete_curve(db, athlete_id, kind, start_date, end_date)
+    points = [
+        CurvePoint(secs=int(secs), value=None if math.isnan(value) else value, activity_id=activity_id)
+        for secs, value, activity_id in zip(CURVE_DURATIONS, curve.tolist(), activity_ids)
+    ]
+    return CurveResponse(athlete_id=athlete_id, kind=kind, start_date=start_date, end_date=end_date, points=points)
+
+@router.get("/{athlete_id}/zones", response_model=ZoneTimesResponse)
+async def get_athlete_zone_times(
+    athlete_id: uuid.UUID,
+    period: RollupPeriod = Query(RollupPeriod.week, description="Rollup bucket size"),
+    start_date: Optional[date] = Query(None, description="First bucket start"),
+    end_date: Optional[date] = Query(None, description="Last bucket start"),
+    kind: Optional[ZoneKind] = Query(None, description="Only this kind of zone"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    rollups = await zone_time_service.get_zone_time_rollups(db, athlete_id, period, start_date, end_date, kind)
+    return ZoneTimesResponse(
+        athlete_id=athlete_id,
+        period=period,
+        rollups=rollups,
+        totals=zone_time_service.total_zone_times(rollups),
+    )
+
+@router.get("/{athlete_id}/summary", response_model=DailySummaryResponse)
+async def get_athlete_daily_summary(
+    athlete_id: uuid.UUID,
+    start_date: Optional[date] = Query(None, description="First day"),
+    end_date: Optional[date] = Query(None, description="Last day"),
+    sport_type: Optional[str] = Query(None, description="Only this sport"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    summaries = await daily_summary_service.get_daily_summaries(db, athlete_id, start_date, end_date, sport_type)
+    return DailySummaryResponse(
+        athlete_id=athlete_id,
+        start_date=start_date,
+        end_date=end_date,
+        days=summaries,
+        totals=daily_summary_service.total_daily_summaries(summaries),
+    )
+
+@router.get("/{athlete_id}/fitness", response_model=FitnessResponse)
+async def get_athlete_fitness(
+    athlete_id: uuid.UUID,
+    start_date: Optional[date] = Query(None, description="First day"),
+    end_date: Optional[date] = Query(None, description="Last day; days after today are forecast from planned activities"),
+    # Reading brings the stored series up to date, so this stays on the primary
+    db: AsyncSession = Depends(get_db),
+):
+    points = await fitness_service.get_fitness(db, athlete_id, start_date, end_date)
+    return FitnessResponse(athlete_id=athlete_id, points=points)
@@ -1,50 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
+from app.db.session import get_read_db, get_write_db
 from app.services import completed_activity_service
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, decode_cursor
+from app.api.ndjson import ndjson_response, wants_ndjson
+from app.schemas.pagination import Page
 from app.schemas.completed_activity import (
     CompletedActivityCreate,
     CompletedActivityRead,
     CompletedActivityUpdate,
 )
 import uuid
-from typing import List
+from typing import Optional
 
 router = APIRouter()
 
 
 @router.post("/", response_model=CompletedActivityRead, status_code=status.HTTP_201_CREATED)
 async def create_completed_activity(
-    activity_in: CompletedActivityCreate, db: AsyncSession = Depends(get_db)
+    activity_in: CompletedActivityCreate, db: AsyncSession = Depends(get_write_db)
 ):
     return await completed_activity_service.create_completed_activity(db, activity_in)
 
 
-@router.get("/athlete/{athlete_id}", response_model=List[CompletedActivityRead])
-async def get_athlete_completed(athlete_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
-    return await completed_activity_service.get_completed_activities_by_athlete(db, athlete_id)
+@router.get("/athlete/{athlete_id}", response_model=Page[CompletedActivityRead])
+async def get_athlete_completed(
+    request: Request,
+    athlete_id: uuid.UUID,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size, ignored when streaming NDJSON"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    try:
+        if wants_ndjson(request):
+            # The body is produced after the headers go out, so check the cursor first
+            if cursor is not None:
+                decode_cursor(cursor)
+            return ndjson_response(completed_activity_service.stream_completed_activities_by_athlete(db, athlete_id, cursor), CompletedActivityRead)
+        items, next_cursor = await completed_activity_service.get_completed_activities_by_athlete(db, athlete_id, limit, cursor)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.put("/{activity_id}", response_model=CompletedActivityRead)
 async def update_completed_activity(
     activity_id: uuid.UUID,
     activity_in: CompletedActivityUpdate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
 ):
-    activity = await completed_activity_service.get_completed_activity_by_id(db, activity_id)
+    activity = await completed_activity_service.update_completed_activity(db, activity_id, activity_in)
     if not activity:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Completed activity not found")
-
-    return await completed_activity_service.update_completed_activity(
-        db, db_activity=activity, activity_in=activity_in
-    )
+    return activity
 
 
 @router.delete("/{activity_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_completed(activity_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
-    activity = await completed_activity_service.get_completed_activity_by_id(db, activity_id)
-    if not activity:
+async def delete_completed(activity_id: uuid.UUID, db: AsyncSession = Depends(get_write_db)):
+    if not await completed_activity_service.delete_completed_activity(db, activity_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Completed activity not found")
-
-    await completed_activity_service.delete_completed_activity(db, activity)
-    return None
\ No newline at end of file
+    return None
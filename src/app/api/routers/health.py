@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Response, status
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.base import pool_status, replica_engines, replicas
+from app.db.session import get_db
+from app.schemas.health import ReadinessResponse
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/ready", response_model=ReadinessResponse)
+async def readiness(response: Response, db: AsyncSession = Depends(get_db)):
+    """Whether the primary answers, with this worker's live pool counts per engine."""
+    try:
+        await db.execute(text("SELECT 1"))
+        database = True
+    except (SQLAlchemyError, OSError) as exc:
+        logger.warning("Readiness check failed: %s", exc)
+        database = False
+
+    if not database:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "ready" if database else "unavailable",
+        "database": database,
+        "pool": pool_status(),
+        "replicas": [
+            {"healthy": replicas.healthy(index), "pool": pool_status(replica)}
+            for index, replica in enumerate(replica_engines)
+        ],
+    }
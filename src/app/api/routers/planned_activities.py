@@ -1,52 +1,93 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
-from app.services import planned_activity_service
+from app.db.session import get_read_db, get_write_db
+from app.services import planned_activity_service, reconciliation_service
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, decode_cursor
+from app.api.ndjson import ndjson_response, wants_ndjson
+from app.schemas.pagination import Page
 from app.schemas.planned_activity import (
     PlannedActivityCreate, 
     PlannedActivityRead, 
-    PlannedActivityUpdate
+    PlannedActivityUpdate,
+    ReconciliationResult,
 )
 import uuid
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 router = APIRouter()
 
 @router.post("/", response_model=PlannedActivityRead, status_code=status.HTTP_201_CREATED)
 async def create_planned_activity(
     activity_in: PlannedActivityCreate, 
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     return await planned_activity_service.create_planned_activity(db, activity_in)
 
-@router.get("/athlete/{athlete_id}", response_model=List[PlannedActivityRead])
-async def get_athlete_plans(athlete_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
-    return await planned_activity_service.get_planned_activities_by_athlete(db, athlete_id)
+@router.post("/batch", response_model=List[PlannedActivityRead], status_code=status.HTTP_201_CREATED)
+async def create_planned_activities(
+    activities_in: List[PlannedActivityCreate] = Body(..., min_length=1, max_length=planned_activity_service.MAX_BATCH_SIZE),
+    db: AsyncSession = Depends(get_write_db),
+):
+    """Create a whole training plan in one transaction; the result is in request order."""
+    try:
+        return await planned_activity_service.create_planned_activities(db, activities_in)
+    except planned_activity_service.UnknownAthletes as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=[
+                {"loc": ["body", index, "athlete_id"], "msg": "Athlete not found", "type": "not_found"}
+                for index in exc.indexes
+            ],
+        )
+
+@router.get("/athlete/{athlete_id}", response_model=Page[PlannedActivityRead])
+async def get_athlete_plans(
+    request: Request,
+    athlete_id: uuid.UUID,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size, ignored when streaming NDJSON"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    try:
+        if wants_ndjson(request):
+            # The body is produced after the headers go out, so check the cursor first
+            if cursor is not None:
+                decode_cursor(cursor)
+            return ndjson_response(planned_activity_service.stream_planned_activities_by_athlete(db, athlete_id, cursor), PlannedActivityRead)
+        items, next_cursor = await planned_activity_service.get_planned_activities_by_athlete(db, athlete_id, limit, cursor)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.post("/athlete/{athlete_id}/reconcile", response_model=ReconciliationResult)
+async def reconcile_athlete_plans(
+    athlete_id: uuid.UUID,
+    start_date: datetime = Query(..., description="Start of the range to reconcile"),
+    end_date: datetime = Query(..., description="End of the range to reconcile"),
+    db: AsyncSession = Depends(get_write_db),
+):
+    return await reconciliation_service.reconcile_plans(db, athlete_id, start_date, end_date)
 
 @router.put("/{activity_id}", response_model=PlannedActivityRead)
 async def update_planned_activity(
     activity_id: uuid.UUID,
     activity_in: PlannedActivityUpdate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
-    activity = await planned_activity_service.get_planned_activity_by_id(db, activity_id)
+    activity = await planned_activity_service.update_planned_activity(db, activity_id, activity_in)
     if not activity:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Planned activity not found"
         )
-    
-    return await planned_activity_service.update_planned_activity(
-        db, db_activity=activity, activity_in=activity_in
-    )
+    return activity
 
 @router.delete("/{activity_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_plan(activity_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
-    activity = await planned_activity_service.get_planned_activity_by_id(db, activity_id)
-    if not activity:
+async def delete_plan(activity_id: uuid.UUID, db: AsyncSession = Depends(get_write_db)):
+    if not await planned_activity_service.delete_planned_activity(db, activity_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Planned activity not found"
         )
-    await planned_activity_service.delete_planned_activity(db, activity)
-    return None
\ No newline at end of file
+    return None
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_read_db
+from app.api.responses import ModelJSONResponse
+from app.services import activity_stream_service
+from app.schemas.activity_stream import ActivityStreamChannel, ActivityStreamRead
+import math
+import uuid
+from typing import List, Optional
+
+router = APIRouter()
+
+@router.get("/{activity_id}", response_model=List[ActivityStreamChannel])
+async def get_activity_stream_channels(activity_id: uuid.UUID, db: AsyncSession = Depends(get_read_db)):
+    return await activity_stream_service.get_stream_channels(db, activity_id)
+
+@router.get("/{activity_id}/{channel}", response_model=ActivityStreamRead)
+async def get_activity_stream(
+    activity_id: uuid.UUID,
+    channel: str,
+    start: int = Query(0, ge=0, description="First sample (seconds for 1 Hz streams)"),
+    end: Optional[int] = Query(None, ge=0, description="End sample, exclusive"),
+    points: Optional[int] = Query(None, ge=1, le=10000, description="Downsample to at most this many points"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if end is not None and end < start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end must not be before start")
+
+    stream = await activity_stream_service.get_stream_slice(db, activity_id, channel, start, end)
+    if stream is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Stream {channel} not found")
+
+    sample_count, samples = stream
+    first = min(start, sample_count)
+    last = first + len(samples)
+
+    step = 1.0
+    if points is not None and len(samples) > points:
+        step = len(samples) / points
+        samples = activity_stream_service.downsample(samples, points)
+
+    return ModelJSONResponse(ActivityStreamRead(
+        activity_id=activity_id,
+        channel=channel,
+        sample_count=sample_count,
+        start=first,
+        end=last,
+        step=step,
+        data=[None if math.isnan(v) else v for v in samples.tolist()],
+    ))
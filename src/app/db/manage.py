@@ -1,13 +1,106 @@
 import asyncio
+from sqlalchemy import MetaData, bindparam, inspect, text
+from sqlalchemy.schema import CreateIndex, DropIndex
 from app.db.base import Base, engine
 
 # Import models here so SQLAlchemy knows about them
-from app.models import athlete, completed_activity, planned_activity
+from app.models import (
+    athlete,
+    completed_activity,
+    planned_activity,
+    sync_state,
+    icu_activity_archive,
+    activity_stream,
+    activity_curve,
+    zone_times,
+    daily_summary,
+    fitness,
+)
 
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     print("Database initialized successfully")
 
+def _existing_tables(sync_conn) -> set[str]:
+    inspector = inspect(sync_conn)
+    return {table.name for table in Base.metadata.sorted_tables if inspector.has_table(table.name)}
+
+# Indexes left INVALID by a failed concurrent build; IF NOT EXISTS would skip them
+_INVALID_INDEXES = text(
+    "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+    "WHERE NOT i.indisvalid AND pg_table_is_visible(c.oid) AND c.relname IN :names"
+).bindparams(bindparam("names", expanding=True))
+
+async def create_missing_indexes():
+    """
+    Add indexes declared on the models to an existing database; create_all
+    skips tables that already exist. Builds concurrently so writes keep going.
+    Tables the database does not have yet are skipped; init_db creates them
+    together with their indexes. Indexes an earlier interrupted build left
+    invalid are dropped and built again.
+    """
+    # Copies, so the concurrent option does not leak into create_all
+    scratch = MetaData()
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        existing = await conn.run_sync(_existing_tables)
+        indexes = [
+            index
+            for table in Base.metadata.sorted_tables if table.name in existing
+            for index in sorted(table.to_metadata(scratch).indexes, key=lambda i: i.name)
+        ]
+        invalid = set((await conn.execute(_INVALID_INDEXES, {"names": [index.name for index in indexes]})).scalars())
+        for index in indexes:
+            index.dialect_options["postgresql"]["concurrently"] = True
+            if index.name in invalid:
+                await conn.execute(DropIndex(index, if_exists=True))
+            await conn.execute(CreateIndex(index, if_not_exists=True))
+    print("Indexes created successfully")
+
+def _reflect_foreign_keys(sync_conn) -> dict[str, list[dict]]:
+    inspector = inspect(sync_conn)
+    return {
+        table.name: inspector.get_foreign_keys(table.name)
+        for table in Base.metadata.sorted_tables
+        if inspector.has_table(table.name)
+    }
+
+async def update_foreign_key_actions():
+    """
+    Bring the ON DELETE rules of existing foreign keys in line with the
+    models; create_all skips tables that already exist. The replacement is
+    added NOT VALID and validated separately, so writes are only blocked
+    for the swap, not for the scan.
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        reflected = await conn.run_sync(_reflect_foreign_keys)
+        quote = conn.dialect.identifier_preparer.quote
+        for table in Base.metadata.sorted_tables:
+            for fk in table.foreign_key_constraints:
+                columns = [column.name for column in fk.columns]
+                current = next(
+                    (
+                        existing for existing in reflected.get(table.name, [])
+                        if existing["constrained_columns"] == columns
+                        and existing["referred_table"] == fk.referred_table.name
+                    ),
+                    None,
+                )
+                wanted = (fk.ondelete or "NO ACTION").upper()
+                if current is None or (current["options"].get("ondelete") or "NO ACTION").upper() == wanted:
+                    continue
+
+                name = quote(current["name"])
+                referred = ", ".join(quote(element.column.name) for element in fk.elements)
+                await conn.exec_driver_sql(
+                    f"ALTER TABLE {quote(table.name)} DROP CONSTRAINT {name}, "
+                    f"ADD CONSTRAINT {name} FOREIGN KEY ({', '.join(map(quote, columns))}) "
+                    f"REFERENCES {quote(fk.referred_table.name)} ({referred}) ON DELETE {wanted} NOT VALID"
+                )
+                await conn.exec_driver_sql(f"ALTER TABLE {quote(table.name)} VALIDATE CONSTRAINT {name}")
+    print("Foreign keys updated successfully")
+
 if __name__ == "__main__":
     asyncio.run(init_db())
\ No newline at end of file
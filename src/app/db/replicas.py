@@ -0,0 +1,59 @@
+import logging
+import time
+from typing import Callable, Optional, Sequence
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    """
+    Round-robin over read replica session factories.
+
+    A replica is health-checked when a session checks out its connection (the
+    engines pre-ping). One that fails is skipped for retry_after_s and the next
+    one is tried; None means no replica is available and the caller should
+    read from the primary.
+    """
+
+    def __init__(
+        self,
+        sessionmakers: Sequence[async_sessionmaker[AsyncSession]],
+        retry_after_s: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.sessionmakers = list(sessionmakers)
+        self.retry_after_s = retry_after_s
+        self._clock = clock
+        self._next = 0
+        self._down_until = [0.0] * len(self.sessionmakers)
+
+    def __len__(self) -> int:
+        return len(self.sessionmakers)
+
+    def healthy(self, index: int) -> bool:
+        return self._down_until[index] <= self._clock()
+
+    def mark_down(self, index: int) -> None:
+        self._down_until[index] = self._clock() + self.retry_after_s
+
+    def _candidates(self) -> list[int]:
+        count = len(self.sessionmakers)
+        order = [(self._next + offset) % count for offset in range(count)]
+        self._next = (self._next + 1) % count if count else 0
+        return [index for index in order if self.healthy(index)]
+
+    async def open_session(self) -> Optional[AsyncSession]:
+        """A session already holding a checked connection to a healthy replica, or None."""
+        for index in self._candidates():
+            session = self.sessionmakers[index]()
+            try:
+                await session.connection()
+            except (DBAPIError, OSError) as exc:
+                await session.close()
+                self.mark_down(index)
+                logger.warning("Replica %d unavailable for %.0fs: %s", index, self.retry_after_s, exc)
+                continue
+            return session
+        return None
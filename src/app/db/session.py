@@ -1,4 +1,11 @@
-from app.db.base import async_session
+import math
+from fastapi import Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.base import async_session, replicas, settings
+
+# Clients send this header, or carry the cookie set on their writes, to read from the primary
+READ_PRIMARY_HEADER = "X-Read-Primary"
+READ_PRIMARY_COOKIE = "read_primary"
 
 # Dependency for FastAPI routes
 async def get_db():
@@ -6,4 +13,40 @@ async def get_db():
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+def reads_from_primary(request: Request) -> bool:
+    """Whether the client asked to see its own recent writes."""
+    return bool(request.headers.get(READ_PRIMARY_HEADER)) or READ_PRIMARY_COOKIE in request.cookies
+
+
+async def get_write_db(response: Response, db: AsyncSession = Depends(get_db)):
+    """
+    Primary session for routes that write. With replicas configured, the
+    response pins the client's reads to the primary for read_after_write_s so
+    it does not read around replication lag.
+    """
+    if len(replicas) and settings.read_after_write_s:
+        response.set_cookie(READ_PRIMARY_COOKIE, "1", max_age=math.ceil(settings.read_after_write_s), httponly=True)
+    yield db
+
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Session for read-only routes: the next healthy replica, or the primary
+    when none is configured or up, or when the client reads its own writes.
+    The primary session is only connected if it is used.
+    """
+    if not len(replicas) or reads_from_primary(request):
+        yield db
+        return
+
+    session = await replicas.open_session()
+    if session is None:
+        yield db
+        return
+    try:
+        yield session
+    finally:
+        await session.close()
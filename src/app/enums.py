@@ -23,4 +23,19 @@ class LogLevels(StrEnum):
     info = "INFO"
     warn = "WARN"
     error = "ERROR"
-    debug = "DEBUG"
\ No newline at end of file
+    debug = "DEBUG"
+
+class CurveKind(StrEnum):
+    power = "power"
+    pace = "pace"
+
+class ZoneKind(StrEnum):
+    power = "power"
+    hr = "hr"
+    pace = "pace"
+    gap = "gap"
+
+class RollupPeriod(StrEnum):
+    day = "day"
+    week = "week"
+    month = "month"
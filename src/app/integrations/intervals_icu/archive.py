@@ -0,0 +1,54 @@
+import json
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, Iterable
+from sqlalchemy.dialects.postgresql import insert, Insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.integrations.intervals_icu.mappers import icu_activity_id
+from app.models.icu_activity_archive import IcuActivityArchive
+
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def encode_payload(icu_data: dict[str, Any]) -> bytes:
+    """Serialize a payload deterministically so unchanged activities compare equal."""
+    return zlib.compress(json.dumps(icu_data, sort_keys=True, separators=(",", ":")).encode(), 6)
+
+
+def decode_payload(payload: bytes) -> dict[str, Any]:
+    return json.loads(zlib.decompress(payload))
+
+
+def build_archive_upsert(rows: list[dict[str, Any]]) -> Insert:
+    """One INSERT ... ON CONFLICT per batch that only rewrites payloads that changed."""
+    table = IcuActivityArchive.__table__
+    stmt = insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.intervals_id],
+        set_={"payload": stmt.excluded.payload, "fetched_at": stmt.excluded.fetched_at},
+        where=table.c.payload.is_distinct_from(stmt.excluded.payload),
+    )
+
+
+async def archive_icu_payloads(
+    db: AsyncSession,
+    athlete_id: uuid.UUID,
+    payloads: Iterable[dict[str, Any]],
+    fetched_at: datetime,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> None:
+    """Store raw payloads next to the mapped activities, in the caller's transaction."""
+    rows = list({
+        intervals_id: {
+            "intervals_id": intervals_id,
+            "athlete_id": athlete_id,
+            "payload": encode_payload(icu_data),
+            "fetched_at": fetched_at,
+        }
+        for icu_data in payloads
+        if (intervals_id := icu_activity_id(icu_data)) is not None
+    }.values())
+
+    for offset in range(0, len(rows), batch_size):
+        await db.execute(build_archive_upsert(rows[offset:offset + batch_size]))
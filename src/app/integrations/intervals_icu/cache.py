@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_last_used ON responses (last_used);
+"""
+
+
+@dataclass
+class CachedResponse:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: bytes
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Persistent, size-bounded cache of intervals.icu responses.
+
+    Bodies are stored zlib-compressed in a local SQLite file together with their
+    validators, so a repeated request can be revalidated with If-None-Match and
+    answered from disk on 304. The least recently used entries are evicted once
+    the compressed bodies exceed max_bytes.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT count(*), coalesce(sum(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": entries, "bytes": size}
+
+    def close(self) -> None:
+        self._conn.close()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, url: str, etag: Optional[str], last_modified: Optional[str], body: bytes) -> None:
+        await asyncio.to_thread(self._put, key, url, etag, last_modified, body)
+
+    async def touch(self, key: str) -> None:
+        await asyncio.to_thread(self._touch, key)
+
+    async def record_hit(self, key: str) -> None:
+        """Count a 304 answered from the cached entry and mark it recently used."""
+        self.hits += 1
+        await self.touch(key)
+
+    async def record_miss(
+        self, key: str, url: str, etag: Optional[str], last_modified: Optional[str], body: bytes
+    ) -> None:
+        """Count a full response and keep it when it carries a validator to revalidate with."""
+        self.misses += 1
+        if etag or last_modified:
+            await self.put(key, url, etag, last_modified, body)
+
+    def _get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, body = row
+        return CachedResponse(etag=etag, last_modified=last_modified, body=zlib.decompress(body))
+
+    def _put(self, key: str, url: str, etag: Optional[str], last_modified: Optional[str], body: bytes) -> None:
+        compressed = zlib.compress(body, 6)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, etag, last_modified, body, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, etag, last_modified, compressed, len(compressed), time.time()),
+            )
+            self._evict()
+
+    def _touch(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+
+    def _evict(self) -> None:
+        (total,) = self._conn.execute("SELECT coalesce(sum(size), 0) FROM responses").fetchone()
+        if total <= self.max_bytes:
+            return
+
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.evictions += len(victims)
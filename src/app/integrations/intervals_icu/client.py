@@ -1,30 +1,164 @@
-from typing import List, Any, Dict
+import asyncio
+import json
+from typing import List, Any, Dict, AsyncIterator, Optional
 import httpx
-from datetime import datetime
-from integrations.intervals_icu.mappers import map_icu_activity_to_completed
-from models.completed_activity import CompletedActivity
+from datetime import datetime, timedelta, timezone
+from app.integrations.intervals_icu.cache import ResponseCache
+from app.integrations.intervals_icu.mappers import map_icu_activity_to_completed
+from app.integrations.intervals_icu.rate_limit import TokenBucket, retry_after_seconds
+from app.models.completed_activity import CompletedActivity
 
 BASE_URL = "https://intervals.icu/api/v1"
 
+# Activities are requested in date windows so a multi-year backfill never
+# holds more than one window of payloads in memory.
+DEFAULT_WINDOW = timedelta(days=30)
+
+# Both window bounds are inclusive at one second resolution, so consecutive
+# windows start one step after the previous newest and never overlap.
+BOUND_RESOLUTION = timedelta(seconds=1)
+
+# Pages bigger than this are decoded in a worker thread to keep the event loop responsive.
+THREADED_JSON_THRESHOLD = 256 * 1024
+
+DEFAULT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=60.0)
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+
+DEFAULT_MAX_RETRIES = 3
+
+
+def create_http_client(
+    base_url: str = BASE_URL,
+    limits: httpx.Limits = DEFAULT_LIMITS,
+    timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """Build a keep-alive HTTP client that can be shared by several IntervalsClients."""
+    return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout, transport=transport)
+
+
+async def decode_json(body: bytes) -> Any:
+    """Decode a JSON body, off the event loop when it is large."""
+    if len(body) > THREADED_JSON_THRESHOLD:
+        return await asyncio.to_thread(json.loads, body)
+    return json.loads(body)
+
+
 class IntervalsClient:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        http_client: Optional[httpx.AsyncClient] = None,
+        window: timedelta = DEFAULT_WINDOW,
+        rate_limiter: Optional[TokenBucket] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        cache: Optional[ResponseCache] = None,
+    ):
         self.api_key = api_key
+        self.window = window
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.cache = cache
+        self._owns_http_client = http_client is None
+        self._http = http_client or create_http_client()
+
+    async def __aenter__(self) -> "IntervalsClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the connection pool if this client created it."""
+        if self._owns_http_client:
+            await self._http.aclose()
+
+    async def _get_json(self, path: str, params: Dict[str, Any]) -> Any:
+        if self.cache is None:
+            resp = await self._get(path, params)
+            return await decode_json(resp.content)
+
+        url = str(self._http.build_request("GET", path, params=params).url)
+        key = self.cache.key(url)
+        cached = await self.cache.get(key)
+
+        resp = await self._get(path, params, headers=cached.conditional_headers() if cached else None)
+        if cached and resp.status_code == httpx.codes.NOT_MODIFIED:
+            await self.cache.record_hit(key)
+            return await decode_json(cached.body)
+
+        await self.cache.record_miss(
+            key, url, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), resp.content
+        )
+        return await decode_json(resp.content)
+
+    async def _get(self, path: str, params: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+
+            resp = await self._http.get(path, auth=(self.api_key, ""), params=params, headers=headers)
+            if resp.status_code != httpx.codes.TOO_MANY_REQUESTS or attempt == self.max_retries:
+                break
+
+            delay = retry_after_seconds(resp, default=2.0 ** attempt)
+            if self.rate_limiter:
+                self.rate_limiter.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+
+        if resp.status_code != httpx.codes.NOT_MODIFIED:
+            resp.raise_for_status()
+        return resp
+
+    async def iter_activity_pages(
+        self,
+        athlete_id: str,
+        from_date: datetime,
+        to_date: Optional[datetime] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield raw Intervals.icu activity payloads one date window at a time,
+        oldest window first. Both from_date and to_date are inclusive.
+        """
+        to_date = (to_date or datetime.now(timezone.utc)).replace(microsecond=0)
+        path = f"/athlete/{athlete_id}/activities"
+
+        oldest = from_date.replace(microsecond=0)
+        while oldest <= to_date:
+            newest = min(oldest + self.window - BOUND_RESOLUTION, to_date)
+            page: List[Dict[str, Any]] = await self._get_json(
+                path, {"oldest": oldest.isoformat(), "newest": newest.isoformat()}
+            )
+            if page:
+                yield page
+            oldest = newest + BOUND_RESOLUTION
+
+    async def iter_activities_from_date(
+        self,
+        athlete_id: str,
+        from_date: datetime,
+        to_date: Optional[datetime] = None,
+    ) -> AsyncIterator[CompletedActivity]:
+        """Yield mapped CompletedActivity objects as each page arrives."""
+        async for page in self.iter_activity_pages(athlete_id, from_date, to_date):
+            for activity in page:
+                yield map_icu_activity_to_completed(activity, athlete_id)
+
+    async def get_activity_streams(
+        self, activity_id: str, types: Optional[List[str]] = None
+    ) -> Dict[str, List[Optional[float]]]:
+        """Fetch per-sample streams of one activity, keyed by stream type."""
+        params = {"types": ",".join(types)} if types else {}
+        streams: List[Dict[str, Any]] = await self._get_json(f"/activity/{activity_id}/streams", params)
+        return {s["type"]: s["data"] for s in streams if s.get("data") is not None}
 
     async def get_activities_from_date(
         self,
         athlete_id: str,
         from_date: datetime
     ) -> List[CompletedActivity]:
-        url = f"{BASE_URL}/athlete/{athlete_id}/activities"
-        params = {"from": from_date.isoformat()}
-
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, auth=(self.api_key, ""), params=params)
-            resp.raise_for_status()
-            response: List[Dict[str, Any]] = resp.json()
-
-        activities: List[CompletedActivity] = [
-            map_icu_activity_to_completed(activity, athlete_id)
-            for activity in response
+        return [
+            activity
+            async for activity in self.iter_activities_from_date(athlete_id, from_date)
         ]
-        return activities
@@ -1,81 +1,243 @@
+import logging
 from datetime import datetime
-from typing import Any, Optional
-from models.completed_activity import CompletedActivity, ActivitySource  
+from typing import Any, Callable, Iterable, Optional
+from app.models.completed_activity import CompletedActivity, ActivitySource
 
-def map_icu_activity_to_completed(icu_data: dict[str, Any], athlete_id: str) -> CompletedActivity:
+logger = logging.getLogger(__name__)
+
+INTERVALS_ACTIVITY_URL = "https://intervals.icu/activities/{}"
+
+
+class IcuMappingError(ValueError):
+    """Raised when an Intervals.icu payload does not match the IcuActivity shape."""
+
+
+def _str(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    raise IcuMappingError(f"expected a string, got {value!r}")
+
+
+def _float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    raise IcuMappingError(f"expected a number, got {value!r}")
+
+
+def _int(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise IcuMappingError(f"expected an integer, got {value!r}")
+
+
+def _bool(value: Any) -> Optional[bool]:
+    if value is None or isinstance(value, bool):
+        return value
+    raise IcuMappingError(f"expected a boolean, got {value!r}")
+
+
+def _id(value: Any) -> str:
+    if value is None:
+        raise IcuMappingError("missing id")
+    if isinstance(value, str) or (isinstance(value, int) and not isinstance(value, bool)):
+        return str(value)
+    raise IcuMappingError(f"expected an id, got {value!r}")
+
+
+def _object(value: Any) -> dict[str, Any]:
+    if value is None:
+        return {}
+    if isinstance(value, dict):
+        return value
+    raise IcuMappingError(f"expected an object, got {value!r}")
+
+
+def _truthy(value: Any) -> bool:
+    return bool(value)
+
+
+def _datetime(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    raise IcuMappingError(f"expected an ISO 8601 timestamp, got {value!r}")
+
+
+# CompletedActivity column <- IcuActivity key (dotted keys read nested objects) and converter
+ACTIVITY_FIELDS: tuple[tuple[str, str, Callable[[Any], Any]], ...] = (
+    # Metadata
+    ("name", "name", _str),
+    ("description", "description", _str),
+    ("sport_type", "type", _str),
+    ("sub_type", "sub_type", _str),
+    ("start_date", "start_date", _datetime),
+    ("start_date_local", "start_date_local", _datetime),
+    ("timezone", "timezone", _str),
+    ("trainer", "trainer", _bool),
+    ("commute", "commute", _bool),
+    ("race", "race", _bool),
+
+    # Summary metrics
+    ("distance_m", "distance", _float),
+    ("elapsed_time_s", "elapsed_time", _int),
+    ("moving_time_s", "moving_time", _int),
+    ("elevation_gain_m", "total_elevation_gain", _float),
+    ("elevation_loss_m", "total_elevation_loss", _float),
+    ("average_speed_mps", "average_speed", _float),
+    ("max_speed_mps", "max_speed", _float),
+    ("average_cadence", "average_cadence", _float),
+    ("average_temp_c", "average_temp", _float),
+    ("average_hr_bpm", "average_heartrate", _float),
+    ("max_hr_bpm", "max_heartrate", _float),
+    ("average_power_w", "icu_average_watts", _float),
+    ("weighted_power_w", "icu_weighted_avg_watts", _float),
+    ("max_power_w", "p_max", _float),
+    ("calories_kcal", "calories", _float),
+    ("carbs_used_g", "carbs_used", _float),
+
+    # Intervals.icu metrics
+    ("icu_training_load", "icu_training_load", _float),
+    ("icu_trimp", "trimp", _float),
+    ("icu_intensity", "icu_intensity", _float),
+    ("icu_efficiency_factor", "icu_efficiency_factor", _float),
+    ("icu_variability_index", "icu_variability_index", _float),
+    ("icu_joules", "icu_joules", _float),
+    ("icu_rpe", "icu_rpe", _float),
+    ("icu_feel", "feel", _int),
+
+    # Device & gear
+    ("device_name", "device_name", _str),
+    ("gear_id", "gear.id", _str),
+    ("gear_name", "gear.name", _str),
+    ("gear_distance_m", "gear.distance", _float),
+
+    # Sync
+    ("icu_sync_date", "icu_sync_date", _datetime),
+    ("analyzed", "analyzed", _truthy),
+)
+
+
+def _compile_row_mapper(fields: tuple[tuple[str, str, Callable[[Any], Any]], ...]):
     """
-    Convert an Intervals.icu API workout (IcuActivity) into a CompletedActivity ORM object.
+    Generate a single function that builds a column dict from a payload, so the
+    per-activity cost is one dict literal instead of a loop over the field table.
+    """
+    namespace: dict[str, Any] = {
+        "_SOURCE": ActivitySource.INTERVALS, "_URL": INTERVALS_ACTIVITY_URL, "_id": _id, "_object": _object,
+    }
+    parents = sorted({key.split(".")[0] for _, key, _ in fields if "." in key})
+
+    lines = ["def map_row(data, athlete_id):", "    get = data.get", "    icu_id = _id(get('id'))"]
+    for parent in parents:
+        lines.append(f"    {parent} = _object(get({parent!r}))")
+
+    lines += [
+        "    return {",
+        "        'source': _SOURCE,",
+        "        'external_id': icu_id,",
+        "        'intervals_id': icu_id,",
+        "        'athlete_id': athlete_id,",
+    ]
+    for index, (column, key, converter) in enumerate(fields):
+        namespace[f"_c{index}"] = converter
+        parent, _, child = key.rpartition(".")
+        getter = f"{parent}.get({child!r})" if parent else f"get({key!r})"
+        lines.append(f"        {column!r}: _c{index}({getter}),")
+    lines += ["        'intervals_url': _URL.format(icu_id),", "    }"]
+
+    exec(compile("\n".join(lines), "<icu_row_mapper>", "exec"), namespace)
+    return namespace["map_row"]
+
+
+_map_row = _compile_row_mapper(ACTIVITY_FIELDS)
+
+
+def icu_activity_id(icu_data: Any) -> Optional[str]:
+    """The payload's activity id as stored in intervals_id, or None when it has no valid one."""
+    try:
+        return _id(_object(icu_data).get("id"))
+    except IcuMappingError:
+        return None
+
+
+def _describe_error(icu_data: Any) -> str:
+    """Slow path used only for invalid payloads: name the offending field."""
+    if not isinstance(icu_data, dict):
+        return f"expected an object, got {icu_data!r}"
+    try:
+        _id(icu_data.get("id"))
+    except IcuMappingError as exc:
+        return f"id: {exc}"
+    for column, key, converter in ACTIVITY_FIELDS:
+        value = icu_data
+        path = []
+        try:
+            for part in key.split("."):
+                value = _object(value).get(part)
+                path.append(part)
+            converter(value)
+        except IcuMappingError as exc:
+            return f"{'.'.join(path)}: {exc}"
+    return "invalid payload"
+
+
+def map_icu_activity_to_values(icu_data: dict[str, Any], athlete_id: str) -> dict[str, Any]:
+    """
+    Convert an Intervals.icu API workout (IcuActivity) into CompletedActivity column values.
+    """
+    try:
+        return _map_row(icu_data, athlete_id)
+    except (IcuMappingError, KeyError, AttributeError) as exc:
+        raise IcuMappingError(
+            f"Intervals.icu activity {icu_activity_id(icu_data)}: {_describe_error(icu_data)}"
+        ) from exc
+
+
+def map_icu_activities_to_rows(payloads: Iterable[dict[str, Any]], athlete_id: str) -> list[dict[str, Any]]:
+    """
+    Convert a batch of Intervals.icu payloads into column dicts ready for a bulk
+    insert. Invalid payloads are logged and skipped.
     """
+    map_row = _map_row
+    rows = []
+    for icu_data in payloads:
+        try:
+            rows.append(map_row(icu_data, athlete_id))
+        except (IcuMappingError, KeyError, AttributeError):
+            logger.warning(
+                "Skipping Intervals.icu activity %s: %s", icu_activity_id(icu_data), _describe_error(icu_data)
+            )
+    return rows
 
-    def safe_get(key: str, default: Optional[Any] = None) -> Any:
-        return icu_data.get(key, default)
-
-    activity = CompletedActivity(
-        # Identifiers
-        source=ActivitySource.INTERVALS,
-        external_id=str(safe_get("id")),
-        intervals_id=str(safe_get("id")),
-        athlete_id=athlete_id,
-
-        # Metadata
-        name=safe_get("name"),
-        description=safe_get("description"),
-        sport_type=safe_get("type"),
-        sub_type=safe_get("sub_type"),
-        start_date=parse_datetime(safe_get("start_date")),
-        start_date_local=parse_datetime(safe_get("start_date_local")),
-        timezone=safe_get("timezone"),
-        trainer=safe_get("trainer"),
-        commute=safe_get("commute"),
-        race=safe_get("race"),
-
-        # Summary metrics
-        distance_m=safe_get("distance"),
-        elapsed_time_s=safe_get("elapsed_time"),
-        moving_time_s=safe_get("moving_time"),
-        elevation_gain_m=safe_get("total_elevation_gain"),
-        elevation_loss_m=safe_get("total_elevation_loss"),
-        average_speed_mps=safe_get("average_speed"),
-        max_speed_mps=safe_get("max_speed"),
-        average_cadence=safe_get("average_cadence"),
-        average_temp_c=safe_get("average_temp"),
-        average_hr_bpm=safe_get("average_heartrate"),
-        max_hr_bpm=safe_get("max_heartrate"),
-        average_power_w=safe_get("icu_average_watts"),
-        weighted_power_w=safe_get("icu_weighted_avg_watts"),
-        max_power_w=safe_get("p_max"),
-        calories_kcal=safe_get("calories"),
-        carbs_used_g=safe_get("carbs_used"),
-
-        # Intervals.icu metrics
-        icu_training_load=safe_get("icu_training_load"),
-        icu_trimp=safe_get("trimp"),
-        icu_intensity=safe_get("icu_intensity"),
-        icu_efficiency_factor=safe_get("icu_efficiency_factor"),
-        icu_variability_index=safe_get("icu_variability_index"),
-        icu_joules=safe_get("icu_joules"),
-        icu_rpe=safe_get("icu_rpe"),
-        icu_feel=safe_get("feel"),
-
-        # Device & gear
-        device_name=safe_get("device_name"),
-        gear_id=safe_get("gear", {}).get("id") if safe_get("gear") else None,
-        gear_name=safe_get("gear", {}).get("name") if safe_get("gear") else None,
-        gear_distance_m=safe_get("gear", {}).get("distance") if safe_get("gear") else None,
-
-        # Sync
-        icu_sync_date=parse_datetime(safe_get("icu_sync_date")),
-        analyzed=bool(safe_get("analyzed")),
-        intervals_url=f"https://intervals.icu/activities/{safe_get('id')}",
-    )
 
+def map_icu_activity_to_completed(icu_data: dict[str, Any], athlete_id: str) -> CompletedActivity:
+    """
+    Convert an Intervals.icu API workout (IcuActivity) into a CompletedActivity ORM object.
+    """
+    # The mapped keys are known columns, so the declarative constructor's
+    # per-keyword attribute check is skipped; that check and the keyword
+    # unpacking cost more than the mapping itself.
+    activity = CompletedActivity()
+    for column, value in map_icu_activity_to_values(icu_data, athlete_id).items():
+        setattr(activity, column, value)
     return activity
 
+
 def parse_datetime(dt_str: Optional[str]) -> Optional[datetime]:
     """Safe datetime parser for ICU timestamps."""
-    if not dt_str:
-        return None
     try:
-        return datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-    except Exception:
-        return None
\ No newline at end of file
+        return _datetime(dt_str)
+    except IcuMappingError:
+        return None
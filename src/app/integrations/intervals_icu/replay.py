@@ -0,0 +1,82 @@
+import asyncio
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.db.base import async_session
+from app.integrations.intervals_icu.archive import decode_payload
+from app.integrations.intervals_icu.mappers import map_icu_activities_to_rows
+from app.integrations.intervals_icu.service import SyncResult, write_activity_payloads
+from app.models.icu_activity_archive import IcuActivityArchive
+from app.services.calendar_cache import calendar_cache
+
+REPLAY_BATCH_SIZE = 2000
+
+
+def map_archived_payloads(
+    chunk: list[tuple[uuid.UUID, bytes]]
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Decompress and map archived payloads; runs in a worker process. Returns (payloads, rows)."""
+    payloads, rows = [], []
+    for athlete_id, payload in chunk:
+        icu_data = decode_payload(payload)
+        payloads.append(icu_data)
+        rows.extend(map_icu_activities_to_rows([icu_data], athlete_id))
+    return payloads, rows
+
+
+async def replay_icu_archive(
+    session_factory: async_sessionmaker = async_session,
+    athlete_id: Optional[uuid.UUID] = None,
+    batch_size: int = REPLAY_BATCH_SIZE,
+    workers: Optional[int] = None,
+) -> SyncResult:
+    """
+    Re-run the activity mapper over archived payloads and write the result
+    the way a live sync does, derived tables included, e.g. to backfill a
+    newly mapped column without calling intervals.icu.
+
+    The archive is read in intervals_id order, one keyset page at a time, and
+    each page is mapped in parallel across worker processes.
+    """
+    workers = workers or os.cpu_count() or 1
+    loop = asyncio.get_running_loop()
+    result = SyncResult()
+    last_id: Optional[str] = None
+
+    stmt = select(
+        IcuActivityArchive.intervals_id, IcuActivityArchive.athlete_id, IcuActivityArchive.payload
+    ).order_by(IcuActivityArchive.intervals_id).limit(batch_size)
+    if athlete_id is not None:
+        stmt = stmt.where(IcuActivityArchive.athlete_id == athlete_id)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async with session_factory() as db:
+            while True:
+                page_stmt = stmt if last_id is None else stmt.where(IcuActivityArchive.intervals_id > last_id)
+                batch = (await db.execute(page_stmt)).all()
+                if not batch:
+                    break
+                last_id = batch[-1].intervals_id
+
+                chunk_size = -(-len(batch) // workers)
+                chunks = [
+                    [(row.athlete_id, row.payload) for row in batch[offset:offset + chunk_size]]
+                    for offset in range(0, len(batch), chunk_size)
+                ]
+                mapped = await asyncio.gather(
+                    *(loop.run_in_executor(pool, map_archived_payloads, chunk) for chunk in chunks)
+                )
+
+                page_result = await write_activity_payloads(
+                    db,
+                    [payload for payloads, _ in mapped for payload in payloads],
+                    [row for _, rows in mapped for row in rows],
+                )
+                await db.commit()
+                calendar_cache.invalidate_days(page_result.days)
+                result += page_result
+
+    return result
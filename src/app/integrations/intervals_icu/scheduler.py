@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Iterable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.db.base import async_session
+from app.integrations.intervals_icu import service
+from app.integrations.intervals_icu.client import IntervalsClient
+from app.integrations.intervals_icu.rate_limit import TokenBucket
+from app.models.athlete import Athlete
+from app.models.sync_state import AthleteSyncState
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 8
+
+
+@dataclass
+class AthleteProgress:
+    athlete_id: uuid.UUID
+    windows_done: int = 0
+    fraction_done: float = 0.0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def activities(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    @property
+    def elapsed_s(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def activities_per_second(self) -> float:
+        elapsed = self.elapsed_s
+        return self.activities / elapsed if elapsed else 0.0
+
+
+@dataclass
+class SchedulerStats:
+    athletes_total: int
+    athletes_finished: int
+    athletes_failed: int
+    windows: int
+    activities: int
+    requests: int
+    throttled: int
+    elapsed_s: float
+
+    @property
+    def activities_per_second(self) -> float:
+        return self.activities / self.elapsed_s if self.elapsed_s else 0.0
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.elapsed_s if self.elapsed_s else 0.0
+
+
+@dataclass
+class _AthleteJob:
+    athlete: Athlete
+    progress: AthleteProgress
+    db: Optional[AsyncSession] = None
+    client: Optional[IntervalsClient] = None
+    state: Optional[AthleteSyncState] = None
+    run_start: Optional[float] = field(default=None, repr=False)
+
+
+class SyncScheduler:
+    """
+    Run incremental Intervals.icu syncs for many athletes on a bounded pool of workers.
+
+    Each turn syncs a single window of one athlete and then sends that athlete to
+    the back of the queue, so a long backfill shares the workers round-robin with
+    everyone else instead of holding one until it is done. client_for is called
+    once per athlete and the client is kept for all of its turns, then closed.
+    If a rate_limiter is given, every client is handed that one shared
+    TokenBucket.
+    """
+
+    def __init__(
+        self,
+        client_for: Callable[[Athlete], IntervalsClient],
+        workers: int = DEFAULT_WORKERS,
+        rate_limiter: Optional[TokenBucket] = None,
+        session_factory: async_sessionmaker = async_session,
+        overlap: timedelta = service.DEFAULT_SYNC_OVERLAP,
+        batch_size: int = service.UPSERT_BATCH_SIZE,
+    ):
+        self.client_for = client_for
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+        self.session_factory = session_factory
+        self.overlap = overlap
+        self.batch_size = batch_size
+
+        self.progress: dict[uuid.UUID, AthleteProgress] = {}
+        self._queue: deque[_AthleteJob] = deque()
+        self._ready = asyncio.Condition()
+        self._active = 0
+        self._started_at: Optional[float] = None
+
+    def stats(self) -> SchedulerStats:
+        progress = list(self.progress.values())
+        return SchedulerStats(
+            athletes_total=len(progress),
+            athletes_finished=sum(1 for p in progress if p.finished_at and not p.error),
+            athletes_failed=sum(1 for p in progress if p.error),
+            windows=sum(p.windows_done for p in progress),
+            activities=sum(p.activities for p in progress),
+            requests=self.rate_limiter.acquired if self.rate_limiter else 0,
+            throttled=self.rate_limiter.throttled if self.rate_limiter else 0,
+            elapsed_s=time.monotonic() - self._started_at if self._started_at else 0.0,
+        )
+
+    async def run(self, athletes: Iterable[Athlete]) -> dict[uuid.UUID, AthleteProgress]:
+        self._started_at = time.monotonic()
+        for athlete in athletes:
+            progress = AthleteProgress(athlete_id=athlete.id)
+            self.progress[athlete.id] = progress
+            self._queue.append(_AthleteJob(athlete=athlete, progress=progress))
+
+        await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+        return self.progress
+
+    async def _next_job(self) -> Optional[_AthleteJob]:
+        # A job that is mid-turn on another worker will come back to the queue,
+        # so idle workers wait for it rather than exiting early.
+        async with self._ready:
+            await self._ready.wait_for(lambda: self._queue or not self._active)
+            if not self._queue:
+                return None
+            self._active += 1
+            return self._queue.popleft()
+
+    async def _requeue(self, job: Optional[_AthleteJob]) -> None:
+        async with self._ready:
+            self._active -= 1
+            if job is not None:
+                self._queue.append(job)
+            self._ready.notify_all()
+
+    async def _worker(self) -> None:
+        while (job := await self._next_job()) is not None:
+            more = False
+            try:
+                more = await self._turn(job)
+            except Exception as exc:
+                logger.exception("Intervals.icu sync failed for athlete %s", job.athlete.id)
+                job.progress.error = str(exc)
+
+            if not more:
+                job.progress.finished_at = time.monotonic()
+                if job.client is not None:
+                    await job.client.aclose()
+                if job.db is not None:
+                    await job.db.close()
+
+            await self._requeue(job if more else None)
+
+    async def _turn(self, job: _AthleteJob) -> bool:
+        """Sync one window for the job's athlete; returns whether work is left."""
+        if job.db is None:
+            job.progress.started_at = time.monotonic()
+            job.db = self.session_factory()
+            job.state = await service.begin_sync_run(job.db, job.athlete, self.overlap)
+            job.run_start = job.state.run_cursor.timestamp()
+
+        if job.client is None:
+            job.client = self.client_for(job.athlete)
+            if self.rate_limiter is not None:
+                job.client.rate_limiter = self.rate_limiter
+
+        try:
+            result = await service.sync_next_window(job.db, job.client, job.state, self.batch_size)
+        except Exception as exc:
+            await service.record_sync_error(job.db, job.athlete.id, exc)
+            raise
+
+        if result is None:
+            job.progress.fraction_done = 1.0
+            return False
+
+        job.progress.windows_done += 1
+        job.progress.inserted += result.inserted
+        job.progress.updated += result.updated
+        job.progress.unchanged += result.unchanged
+
+        if not job.state.in_progress:
+            job.progress.fraction_done = 1.0
+            return False
+
+        target = job.state.run_target.timestamp()
+        span = target - job.run_start
+        job.progress.fraction_done = (job.state.run_cursor.timestamp() - job.run_start) / span if span else 1.0
+        return True
@@ -1,42 +1,373 @@
-from app.integrations.intervals_icu.client import IntervalsClient
-from app.integrations.intervals_icu.mappers import map_intervals_activity_to_activity
-from app.db.session import SessionLocal
-from datetime import datetime
-
-async def sync_intervals_all_activities(api_key: str, athlete_id: str):
-    client = IntervalsClient(api_key)
-    activities_df = await client.get_activities_csv(athlete_id)
-
-    activities_df = SessionLocal()
-    for _, IntervalsActivity in df.iterrows():
-        activity = map_intervals_activity_to_activity(IntervalsActivity)
-        db.add(activity)
-    activities_df.commit()
-    
-async def sync_intervals_activities_from_date(api_key: str, athlete_id: str, from_date: datetime):
-    client = IntervalsClient(api_key)
-    df = await client.get_activities_from_date(athlete_id, from_date)
-
-    db = SessionLocal()
-    for _, row in df.iterrows():
-        activity = map_intervals_activity_to_activity(row)
-        db.add(activity)
-    db.commit()
-    
-def save_icu_activity(session, raw: dict, athlete_id: int):
-    icu_fields = {k: v for k, v in raw.items() if k.startswith("icu_")}
-    activity_fields = {k: v for k, v in raw.items() if not k.startswith("icu_")}
-
-    activity = IcuActivityModel(
-        athlete_id=athlete_id,
-        name=activity_fields["name"],
-        type=activity_fields["type"],
-        start_date_local=datetime.fromisoformat(activity_fields["start_date_local"]),
-        elapsed_time=activity_fields["elapsed_time"],
-        distance=activity_fields["distance"],
-        average_speed=activity_fields["average_speed"],
-        icu_data=IcuDataModel(data=icu_fields),
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+from sqlalchemy import select, update, or_, func, literal_column
+from sqlalchemy.dialects.postgresql import insert, Insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.integrations.intervals_icu.archive import archive_icu_payloads
+from app.integrations.intervals_icu.client import BOUND_RESOLUTION, IntervalsClient
+from app.integrations.intervals_icu.mappers import icu_activity_id, map_icu_activities_to_rows
+from app.models.athlete import Athlete
+from app.models.completed_activity import CompletedActivity
+from app.models.sync_state import AthleteSyncState
+from app.services import activity_stream_service, curve_service, daily_summary_service, zone_time_service
+from app.services.calendar_cache import calendar_cache
+
+# ~50 columns per row keeps a full batch well below Postgres' 32767 bind parameter limit.
+UPSERT_BATCH_SIZE = 500
+
+# Intervals.icu history cannot predate the service itself.
+ICU_HISTORY_START = datetime(2008, 1, 1, tzinfo=timezone.utc)
+
+# Incremental runs re-read this much history to pick up late uploads and edits.
+DEFAULT_SYNC_OVERLAP = timedelta(days=3)
+
+# Scalar per-sample channels worth keeping; latlng is two-dimensional and left out.
+STREAM_TYPES = ["time", "watts", "heartrate", "cadence", "velocity_smooth", "altitude", "distance"]
+
+# Columns that are owned by the database or the sync bookkeeping and must not
+# mark an activity as changed.
+_UNCOMPARED_COLUMNS = {"id", "intervals_id", "created_at", "updated_at", "last_sync"}
+
+
+@dataclass
+class SyncResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    # Ids of the inserted and updated activities, keyed by intervals_id
+    written: dict[str, uuid.UUID] = field(default_factory=dict, repr=False)
+    # Ids of every upserted activity, unchanged ones included, keyed by intervals_id
+    ids: dict[str, uuid.UUID] = field(default_factory=dict, repr=False)
+    # (athlete_id, day) pairs the written activities left or moved into
+    days: set[tuple[uuid.UUID, date]] = field(default_factory=set, repr=False)
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    def __iadd__(self, other: "SyncResult") -> "SyncResult":
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.written.update(other.written)
+        self.ids.update(other.ids)
+        self.days |= other.days
+        return self
+
+
+def build_upsert_statement(rows: list[dict[str, Any]]) -> Insert:
+    """
+    Build one INSERT ... ON CONFLICT (intervals_id) DO UPDATE for a batch of rows.
+
+    Existing rows are only rewritten when at least one synced column differs, and
+    the statement returns one (id, intervals_id, inserted) row per inserted or updated activity,
+    so unchanged activities are the ones missing from the result.
+    """
+    table = CompletedActivity.__table__
+    stmt = insert(table).values(rows)
+    compared = [name for name in rows[0] if name not in _UNCOMPARED_COLUMNS]
+
+    set_ = {name: stmt.excluded[name] for name in compared}
+    set_["updated_at"] = func.now()
+    if "last_sync" in rows[0]:
+        set_["last_sync"] = stmt.excluded.last_sync
+
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.intervals_id],
+        set_=set_,
+        where=or_(*(table.c[name].is_distinct_from(stmt.excluded[name]) for name in compared)),
+    ).returning(table.c.id, table.c.intervals_id, literal_column("(xmax = 0)").label("inserted"))
+
+
+def _map_page(page: list[dict[str, Any]], athlete_id: uuid.UUID, synced_at: datetime) -> list[dict[str, Any]]:
+    rows = map_icu_activities_to_rows(page, athlete_id)
+    for row in rows:
+        row["last_sync"] = synced_at
+    return rows
+
+
+async def _write_payloads(
+    db: AsyncSession,
+    athlete_id: uuid.UUID,
+    payloads: list[dict[str, Any]],
+    rows: list[dict[str, Any]],
+    synced_at: datetime,
+    batch_size: int,
+) -> SyncResult:
+    """Archive the raw payloads, then write their activities and derived data."""
+    await archive_icu_payloads(db, athlete_id, payloads, synced_at)
+    return await write_activity_payloads(db, payloads, rows, batch_size)
+
+
+async def write_activity_payloads(
+    db: AsyncSession,
+    payloads: list[dict[str, Any]],
+    rows: list[dict[str, Any]],
+    batch_size: int = UPSERT_BATCH_SIZE,
+) -> SyncResult:
+    """
+    Upsert the payloads' mapped rows and bring the zone times of every
+    activity in line with its payload. Zone data is compared with what is
+    stored rather than inferred from the upsert, which does not look at it,
+    so unchanged history is backfilled and zone-only edits are picked up.
+    Live sync and archive replay both write through here, so they leave the
+    same state behind.
+    """
+    result = await upsert_completed_activities(db, rows, batch_size)
+
+    mapped = {row["intervals_id"]: row for row in rows}
+    latest = {icu_activity_id(payload): payload for payload in payloads}
+    activity_ids, zone_rows = [], []
+    for intervals_id, payload in latest.items():
+        row, activity_id = mapped.get(intervals_id), result.ids.get(intervals_id)
+        if row is None or activity_id is None:
+            continue
+        start = row["start_date_local"]
+        activity_ids.append(activity_id)
+        zone_rows.extend(zone_time_service.zone_time_rows(
+            activity_id, row["athlete_id"], start.date() if start else None, payload
+        ))
+    await zone_time_service.replace_activity_zone_times(db, activity_ids, zone_rows)
+
+    return result
+
+
+async def upsert_completed_activities(
+    db: AsyncSession, rows: Iterable[dict[str, Any]], batch_size: int = UPSERT_BATCH_SIZE
+) -> SyncResult:
+    """
+    Write activity rows in set-based batches, one upsert per batch, and
+    refresh the daily summaries of the days the written activities touch.
+    """
+    result = SyncResult()
+
+    # ON CONFLICT cannot touch the same row twice in one statement, so the
+    # last payload for an intervals_id wins.
+    unique_rows = list({row["intervals_id"]: row for row in rows}.values())
+
+    for offset in range(0, len(unique_rows), batch_size):
+        batch = unique_rows[offset:offset + batch_size]
+        # Days an updated activity is leaving, read before the upsert overwrites them
+        previous = (await db.execute(
+            select(
+                CompletedActivity.id, CompletedActivity.intervals_id,
+                CompletedActivity.athlete_id, CompletedActivity.start_date_local,
+            )
+            .where(CompletedActivity.intervals_id.in_([row["intervals_id"] for row in batch]))
+        )).all()
+
+        written = (await db.execute(build_upsert_statement(batch))).all()
+        inserted = sum(1 for row in written if row.inserted)
+        result.written.update((row.intervals_id, row.id) for row in written)
+        result.ids.update((row.intervals_id, row.id) for row in previous)
+        result.ids.update((row.intervals_id, row.id) for row in written)
+
+        changed = {row.intervals_id for row in written}
+        days = {
+            (row.athlete_id, daily_summary_service.summary_day(row.start_date_local))
+            for row in previous if row.intervals_id in changed
+        } | {
+            (row["athlete_id"], daily_summary_service.summary_day(row["start_date_local"]))
+            for row in batch if row["intervals_id"] in changed
+        }
+        await daily_summary_service.refresh_daily_summaries(db, days)
+        result.days |= {(athlete_id, day) for athlete_id, day in days if day is not None}
+
+        result.inserted += inserted
+        result.updated += len(written) - inserted
+        result.unchanged += len(batch) - len(written)
+
+    return result
+
+
+async def sync_intervals_activities_from_date(
+    db: AsyncSession,
+    client: IntervalsClient,
+    athlete_id: uuid.UUID,
+    intervals_athlete_id: str,
+    from_date: datetime,
+    to_date: Optional[datetime] = None,
+    batch_size: int = UPSERT_BATCH_SIZE,
+) -> SyncResult:
+    """
+    Sync an athlete's Intervals.icu activities between from_date and to_date.
+
+    Pages are buffered until a full batch is available, so a re-sync costs one
+    upsert per batch_size activities plus a single commit.
+    """
+    result = SyncResult()
+    synced_at = datetime.now(timezone.utc)
+    pending: list[dict[str, Any]] = []
+
+    async for page in client.iter_activity_pages(intervals_athlete_id, from_date, to_date):
+        pending.extend(page)
+
+        if len(pending) >= batch_size:
+            rows = _map_page(pending, athlete_id, synced_at)
+            result += await _write_payloads(db, athlete_id, pending, rows, synced_at, batch_size)
+            pending = []
+
+    if pending:
+        rows = _map_page(pending, athlete_id, synced_at)
+        result += await _write_payloads(db, athlete_id, pending, rows, synced_at, batch_size)
+
+    await db.commit()
+    calendar_cache.invalidate_days(result.days)
+    return result
+
+
+async def sync_intervals_all_activities(
+    db: AsyncSession,
+    client: IntervalsClient,
+    athlete_id: uuid.UUID,
+    intervals_athlete_id: str,
+) -> SyncResult:
+    return await sync_intervals_activities_from_date(
+        db, client, athlete_id, intervals_athlete_id, ICU_HISTORY_START
     )
 
-    session.add(activity)
-    session.commit()
+
+def _day_start(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class IntervalsNotLinked(ValueError):
+    """Raised when syncing an athlete that has no Intervals.icu account id."""
+
+
+async def get_sync_state(db: AsyncSession, athlete: Athlete) -> AthleteSyncState:
+    """
+    Load the athlete's sync watermark, bootstrapping it from already synced
+    activities the first time so existing history is not downloaded again.
+    """
+    if not athlete.intervals_icu_id:
+        raise IntervalsNotLinked(f"Athlete {athlete.id} has no Intervals.icu id")
+
+    state = await db.get(AthleteSyncState, athlete.id)
+    if state is not None:
+        state.intervals_icu_id = athlete.intervals_icu_id
+        return state
+
+    last_sync = (await db.execute(
+        select(func.max(CompletedActivity.last_sync)).where(
+            CompletedActivity.athlete_id == athlete.id,
+            CompletedActivity.intervals_id.is_not(None),
+        )
+    )).scalar_one()
+
+    state = AthleteSyncState(athlete_id=athlete.id, intervals_icu_id=athlete.intervals_icu_id, cursor=last_sync)
+    db.add(state)
+    return state
+
+
+async def begin_sync_run(
+    db: AsyncSession, athlete: Athlete, overlap: timedelta = DEFAULT_SYNC_OVERLAP
+) -> AthleteSyncState:
+    """
+    Start an incremental run from the athlete's watermark, or resume the run a
+    previous process left unfinished.
+    """
+    state = await get_sync_state(db, athlete)
+
+    if not state.in_progress:
+        now = datetime.now(timezone.utc)
+        # Runs start at midnight and end with the current UTC day, so every run
+        # on the same day asks for the same windows and cached responses can be
+        # revalidated instead of downloaded again.
+        run_from = state.cursor - overlap if state.cursor else ICU_HISTORY_START
+        state.run_cursor = _day_start(run_from)
+        state.run_target = _day_start(now) + timedelta(days=1) - BOUND_RESOLUTION
+        state.last_run_started_at = now
+
+    state.last_error = None
+    await db.commit()
+    return state
+
+
+async def sync_next_window(
+    db: AsyncSession,
+    client: IntervalsClient,
+    state: AthleteSyncState,
+    batch_size: int = UPSERT_BATCH_SIZE,
+) -> Optional[SyncResult]:
+    """
+    Sync one client window of an in-flight run and advance its cursor in the
+    same transaction. Returns None once the run has finished.
+    """
+    if not state.in_progress:
+        return None
+
+    # Inclusive bounds; the next window starts just after newest
+    oldest = state.run_cursor
+    newest = min(oldest + client.window - BOUND_RESOLUTION, state.run_target)
+    synced_at = datetime.now(timezone.utc)
+
+    payloads: list[dict[str, Any]] = []
+    async for page in client.iter_activity_pages(state.intervals_icu_id, oldest, newest):
+        payloads.extend(page)
+
+    rows = _map_page(payloads, state.athlete_id, synced_at)
+    result = await _write_payloads(db, state.athlete_id, payloads, rows, synced_at, batch_size)
+
+    state.run_cursor = newest + BOUND_RESOLUTION
+    if newest >= state.run_target:
+        state.cursor = state.run_target
+        state.run_cursor = None
+        state.run_target = None
+        state.last_success_at = synced_at
+
+    await db.commit()
+    calendar_cache.invalidate_days(result.days)
+    return result
+
+
+async def sync_intervals_athlete(
+    db: AsyncSession,
+    client: IntervalsClient,
+    athlete: Athlete,
+    overlap: timedelta = DEFAULT_SYNC_OVERLAP,
+    batch_size: int = UPSERT_BATCH_SIZE,
+) -> SyncResult:
+    """Fetch only what changed since the athlete's last successful sync."""
+    state = await begin_sync_run(db, athlete, overlap)
+    result = SyncResult()
+
+    try:
+        while (window_result := await sync_next_window(db, client, state, batch_size)) is not None:
+            result += window_result
+    except Exception as exc:
+        await record_sync_error(db, athlete.id, exc)
+        raise
+
+    return result
+
+
+async def record_sync_error(db: AsyncSession, athlete_id: uuid.UUID, exc: Exception) -> None:
+    """Roll back the failed window and keep the error on the athlete's sync state."""
+    await db.rollback()
+    await db.execute(
+        update(AthleteSyncState)
+        .where(AthleteSyncState.athlete_id == athlete_id)
+        .values(last_error=str(exc))
+    )
+    await db.commit()
+
+
+async def sync_intervals_activity_streams(
+    db: AsyncSession,
+    client: IntervalsClient,
+    activity_id: uuid.UUID,
+    intervals_id: str,
+    types: list[str] = STREAM_TYPES,
+) -> list[str]:
+    """
+    Download an activity's streams into the stream store and derive its curves,
+    in one transaction; returns the stored channels.
+    """
+    streams = await client.get_activity_streams(intervals_id, types)
+    await activity_stream_service.save_activity_streams(db, activity_id, streams)
+    await curve_service.compute_activity_curves(db, activity_id)
+    await db.commit()
+    return sorted(streams)
@@ -1,3 +1,10 @@
 from .athlete import Athlete
 from .completed_activity import CompletedActivity
-from .planned_activity import PlannedActivity
\ No newline at end of file
+from .planned_activity import PlannedActivity
+from .sync_state import AthleteSyncState
+from .icu_activity_archive import IcuActivityArchive
+from .activity_stream import ActivityStream
+from .activity_curve import ActivityCurve
+from .zone_times import ActivityZoneTimes, ZoneTimeRollup
+from .daily_summary import DailyTrainingSummary
+from .fitness import AthleteFitness, AthleteFitnessState
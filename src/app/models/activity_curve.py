@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import String, LargeBinary, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class ActivityCurve(Base):
+    """Cached best-effort curve of one activity, evaluated at CURVE_DURATIONS."""
+    __tablename__ = "activity_curves"
+
+    activity_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("completed_activities.id", ondelete="CASCADE"), primary_key=True
+    )
+    kind: Mapped[str] = mapped_column(String, primary_key=True)
+
+    # Little-endian float32, one value per CURVE_DURATIONS entry (watts or m/s)
+    values: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<ActivityCurve(activity_id={self.activity_id}, kind={self.kind})>"
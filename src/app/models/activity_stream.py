@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import String, Integer, LargeBinary, ForeignKey, DDL, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class ActivityStream(Base):
+    """One per-sample channel (watts, heartrate, ...) of a completed activity."""
+    __tablename__ = "activity_streams"
+
+    activity_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("completed_activities.id", ondelete="CASCADE"), primary_key=True
+    )
+    channel: Mapped[str] = mapped_column(String, primary_key=True)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Little-endian float32 samples, NaN where the device recorded nothing
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ActivityStream(activity_id={self.activity_id}, channel={self.channel}, samples={self.sample_count})>"
+
+
+# Uncompressed out-of-line storage lets substring() read only the TOAST chunks
+# covering the requested slice instead of decompressing the whole stream.
+event.listen(
+    ActivityStream.__table__,
+    "after_create",
+    DDL("ALTER TABLE activity_streams ALTER COLUMN data SET STORAGE EXTERNAL").execute_if(dialect="postgresql"),
+)
@@ -50,10 +50,11 @@ class Athlete(Base):
         onupdate=lambda: datetime.now(timezone.utc),
     )
 
-    # Relationships
+    # Relationships; the ON DELETE CASCADE foreign keys remove the children,
+    # so deleting an athlete never loads its activities
     completed_activities: Mapped[list["CompletedActivity"]] = relationship(
-        "CompletedActivity", back_populates="athlete", cascade="all, delete"
+        "CompletedActivity", back_populates="athlete", cascade="all, delete", passive_deletes=True
     )
     planned_activities: Mapped[list["PlannedActivity"]] = relationship(
-        "PlannedActivity", back_populates="athlete", cascade="all, delete"
+        "PlannedActivity", back_populates="athlete", cascade="all, delete", passive_deletes=True
     )
@@ -5,7 +5,7 @@ import enum
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Float, Integer, Boolean, DateTime, Text, Enum, func, ForeignKey
+from sqlalchemy import String, Float, Integer, Boolean, DateTime, Text, Enum, func, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.athlete import Athlete
@@ -34,7 +34,7 @@ class CompletedActivity(Base):
 
     # Metadata
     name: Mapped[Optional[str]] = mapped_column(String)
-    description: Mapped[Optional[str]] = mapped_column(Text)
+    description: Mapped[Optional[str]] = mapped_column(Text, deferred=True)
     sport_type: Mapped[Optional[str]] = mapped_column(String)
     sub_type: Mapped[Optional[str]] = mapped_column(String)
     start_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
@@ -64,39 +64,52 @@ class CompletedActivity(Base):
     calories_kcal: Mapped[Optional[float]] = mapped_column(Float)
     carbs_used_g: Mapped[Optional[float]] = mapped_column(Float)
 
+    # Column groups below are deferred: list and calendar reads never need them,
+    # and an ORM load only fetches a group when one of its attributes is touched.
+
     # Intervals.icu-specific metrics
-    icu_training_load: Mapped[Optional[float]] = mapped_column(Float)
-    icu_trimp: Mapped[Optional[float]] = mapped_column(Float)
-    icu_intensity: Mapped[Optional[float]] = mapped_column(Float)
-    icu_efficiency_factor: Mapped[Optional[float]] = mapped_column(Float)
-    icu_variability_index: Mapped[Optional[float]] = mapped_column(Float)
-    icu_joules: Mapped[Optional[float]] = mapped_column(Float)
-    icu_rpe: Mapped[Optional[float]] = mapped_column(Float)
+    icu_training_load: Mapped[Optional[float]] = mapped_column(Float, deferred=True, deferred_group="icu")
+    icu_trimp: Mapped[Optional[float]] = mapped_column(Float, deferred=True, deferred_group="icu")
+    icu_intensity: Mapped[Optional[float]] = mapped_column(Float, deferred=True, deferred_group="icu")
+    icu_efficiency_factor: Mapped[Optional[float]] = mapped_column(Float, deferred=True, deferred_group="icu")
+    icu_variability_index: Mapped[Optional[float]] = mapped_column(Float, deferred=True, deferred_group="icu")
+    icu_joules: Mapped[Optional[float]] = mapped_column(Float, deferred=True, deferred_group="icu")
+    icu_rpe: Mapped[Optional[float]] = mapped_column(Float, deferred=True, deferred_group="icu")
+    icu_feel: Mapped[Optional[int]] = mapped_column(Integer, deferred=True, deferred_group="icu")
 
     # Device & gear
-    device_name: Mapped[Optional[str]] = mapped_column(String)
-    gear_id: Mapped[Optional[str]] = mapped_column(String)
-    gear_name: Mapped[Optional[str]] = mapped_column(String)
-    gear_distance_m: Mapped[Optional[float]] = mapped_column(Float)
+    device_name: Mapped[Optional[str]] = mapped_column(String, deferred=True, deferred_group="gear")
+    gear_id: Mapped[Optional[str]] = mapped_column(String, deferred=True, deferred_group="gear")
+    gear_name: Mapped[Optional[str]] = mapped_column(String, deferred=True, deferred_group="gear")
+    gear_distance_m: Mapped[Optional[float]] = mapped_column(Float, deferred=True, deferred_group="gear")
 
     # Sync & housekeeping
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
     updated_at: Mapped[Optional[datetime]] = mapped_column(
-        DateTime(timezone=True), onupdate=func.now()
+        DateTime(timezone=True), onupdate=func.now(), deferred=True, deferred_group="sync"
     )
-    last_sync: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
-    icu_sync_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
-    strava_sync_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
-    analyzed: Mapped[bool] = mapped_column(Boolean, default=False)
+    last_sync: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), deferred=True, deferred_group="sync")
+    icu_sync_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), deferred=True, deferred_group="sync")
+    strava_sync_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), deferred=True, deferred_group="sync")
+    analyzed: Mapped[bool] = mapped_column(Boolean, default=False, deferred=True, deferred_group="sync")
 
     # Links
-    strava_url: Mapped[Optional[str]] = mapped_column(String)
-    intervals_url: Mapped[Optional[str]] = mapped_column(String)
+    strava_url: Mapped[Optional[str]] = mapped_column(String, deferred=True, deferred_group="links")
+    intervals_url: Mapped[Optional[str]] = mapped_column(String, deferred=True, deferred_group="links")
 
     def __repr__(self) -> str:
         return (
             f"<CompletedActivity(id={self.id}, source={self.source}, "
             f"sport={self.sport_type}, date={self.start_date_local})>"
-        )
\ No newline at end of file
+        )
+
+
+# Serves the athlete + date range filters and, in key order, the newest-first keyset pages
+Index(
+    "ix_completed_activities_athlete_start",
+    CompletedActivity.athlete_id,
+    CompletedActivity.start_date_local.desc().nulls_first(),
+    CompletedActivity.id.desc(),
+)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import uuid
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import String, Integer, Float, Date, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class DailyTrainingSummary(Base):
+    """Completed activity totals per athlete, local day and sport."""
+    __tablename__ = "daily_training_summaries"
+
+    athlete_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("athletes.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    sport_type: Mapped[str] = mapped_column(String, primary_key=True)
+
+    activity_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    distance_m: Mapped[Optional[float]] = mapped_column(Float)
+    moving_time_s: Mapped[Optional[int]] = mapped_column(Integer)
+    training_load: Mapped[Optional[float]] = mapped_column(Float)
+
+    def __repr__(self) -> str:
+        return f"<DailyTrainingSummary(athlete_id={self.athlete_id}, day={self.day}, sport={self.sport_type})>"
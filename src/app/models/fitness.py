@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import uuid
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Float, Date, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class AthleteFitness(Base):
+    """Fitness (CTL), fatigue (ATL) and form (TSB) of an athlete at the end of each day."""
+    __tablename__ = "athlete_fitness"
+
+    athlete_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("athletes.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    load: Mapped[float] = mapped_column(Float, nullable=False)
+    ctl: Mapped[float] = mapped_column(Float, nullable=False)
+    atl: Mapped[float] = mapped_column(Float, nullable=False)
+    tsb: Mapped[float] = mapped_column(Float, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<AthleteFitness(athlete_id={self.athlete_id}, day={self.day}, ctl={self.ctl:.1f}, atl={self.atl:.1f})>"
+
+
+class AthleteFitnessState(Base):
+    """How far an athlete's fitness series is computed, and from where it is stale."""
+    __tablename__ = "athlete_fitness_states"
+
+    athlete_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("athletes.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Last day with a stored AthleteFitness row
+    computed_through: Mapped[Optional[date]] = mapped_column(Date)
+    # Earliest day whose load changed since; the series is recomputed forward from here
+    dirty_from: Mapped[Optional[date]] = mapped_column(Date)
+
+    def __repr__(self) -> str:
+        return (
+            f"<AthleteFitnessState(athlete_id={self.athlete_id}, "
+            f"computed_through={self.computed_through}, dirty_from={self.dirty_from})>"
+        )
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import String, LargeBinary, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class IcuActivityArchive(Base):
+    """Raw Intervals.icu activity payloads, kept so new columns can be backfilled without refetching."""
+    __tablename__ = "icu_activity_archive"
+
+    intervals_id: Mapped[str] = mapped_column(String, primary_key=True)
+    athlete_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("athletes.id", ondelete="CASCADE"), index=True
+    )
+
+    # zlib-compressed, key-sorted JSON of the IcuActivity payload
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<IcuActivityArchive(intervals_id={self.intervals_id}, athlete_id={self.athlete_id})>"
@@ -5,7 +5,7 @@ from datetime import datetime, timezone
 import uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import String, Integer, Float, DateTime, Boolean, Enum, ForeignKey
+from sqlalchemy import String, Integer, Float, DateTime, Boolean, Enum, ForeignKey, Index
 
 from app.db.base import Base
 from app.enums import ActivityType, ActivityGoal
@@ -24,8 +24,11 @@ class PlannedActivity(Base):
     )
     athlete: Mapped["Athlete"] = relationship("Athlete", back_populates="planned_activities")
 
+    # Unlinked rather than blocking when the completed activity is deleted.
+    # The database rule leaves completed as it was; the activity delete
+    # endpoint clears both itself (completed_activity_service).
     linked_activity_id: Mapped[Optional[uuid.UUID]] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("completed_activities.id"), nullable=True
+        UUID(as_uuid=True), ForeignKey("completed_activities.id", ondelete="SET NULL"), nullable=True
     )
 
     linked_activity: Mapped[Optional["CompletedActivity"]] = relationship(
@@ -51,4 +54,13 @@ class PlannedActivity(Base):
     )
 
     def __repr__(self) -> str:
-        return f"<PlannedActivity(id={self.id}, name='{self.name}', type={self.type}, date={self.scheduled_date})>"
\ No newline at end of file
+        return f"<PlannedActivity(id={self.id}, name='{self.name}', type={self.type}, date={self.scheduled_date})>"
+
+
+# Serves the athlete + date range filters and, in key order, the latest-first keyset pages
+Index(
+    "ix_planned_activities_athlete_scheduled",
+    PlannedActivity.athlete_id,
+    PlannedActivity.scheduled_date.desc().nulls_first(),
+    PlannedActivity.id.desc(),
+)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import String, Text, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class AthleteSyncState(Base):
+    """Per-athlete Intervals.icu sync watermark."""
+    __tablename__ = "athlete_sync_states"
+
+    athlete_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("athletes.id", ondelete="CASCADE"), primary_key=True
+    )
+    intervals_icu_id: Mapped[str] = mapped_column(String, nullable=False)
+
+    # Activities starting before this instant were fetched by the last successful run
+    cursor: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+    # In-flight run; committed after every window so a crashed run resumes where it stopped
+    run_cursor: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    run_target: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+    last_run_started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    last_success_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    @property
+    def in_progress(self) -> bool:
+        return self.run_target is not None
+
+    def __repr__(self) -> str:
+        return (
+            f"<AthleteSyncState(athlete_id={self.athlete_id}, cursor={self.cursor}, "
+            f"run_cursor={self.run_cursor}, run_target={self.run_target})>"
+        )
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import uuid
+from datetime import date
+
+from sqlalchemy import String, Integer, Date, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class ActivityZoneTimes(Base):
+    """Seconds in each zone of one activity, as a fixed-width ZONE_SLOTS vector."""
+    __tablename__ = "activity_zone_times"
+
+    activity_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("completed_activities.id", ondelete="CASCADE"), primary_key=True
+    )
+    kind: Mapped[str] = mapped_column(String, primary_key=True)
+
+    # Denormalized so rollups can be corrected without reading the activity
+    athlete_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+
+    secs: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ActivityZoneTimes(activity_id={self.activity_id}, kind={self.kind}, day={self.day})>"
+
+
+class ZoneTimeRollup(Base):
+    """Time in zone per athlete, period bucket and zone kind, maintained incrementally."""
+    __tablename__ = "zone_time_rollups"
+
+    athlete_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("athletes.id", ondelete="CASCADE"), primary_key=True
+    )
+    period: Mapped[str] = mapped_column(String, primary_key=True)
+    period_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    kind: Mapped[str] = mapped_column(String, primary_key=True)
+
+    secs: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ZoneTimeRollup(athlete_id={self.athlete_id}, {self.period}={self.period_start}, kind={self.kind})>"
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from uuid import UUID
+from typing import Optional
+
+
+class ActivityStreamChannel(BaseModel):
+    channel: str
+    sample_count: int
+
+
+class ActivityStreamRead(BaseModel):
+    activity_id: UUID
+    channel: str
+    sample_count: int
+    start: int
+    end: int
+    step: float
+    data: list[Optional[float]]
@@ -0,0 +1,84 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import date, datetime
+from uuid import UUID
+from typing import Optional, Literal
+from app.enums import CurveKind, RollupPeriod
+
+
+class CurvePoint(BaseModel):
+    secs: int
+    value: Optional[float] = None
+    activity_id: Optional[UUID] = None
+
+
+class CurveResponse(BaseModel):
+    athlete_id: UUID
+    kind: CurveKind
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    points: list[CurvePoint]
+
+
+class AchievementRead(BaseModel):
+    id: str
+    type: Literal["BEST_POWER", "BEST_PACE"]
+    message: str
+    secs: int
+    watts: Optional[int] = None
+    pace: Optional[float] = None
+    distance: Optional[float] = None
+
+
+class ZoneTimeRollupRead(BaseModel):
+    period_start: date
+    kind: str
+    secs: list[int]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ZoneTimesResponse(BaseModel):
+    athlete_id: UUID
+    period: RollupPeriod
+    rollups: list[ZoneTimeRollupRead]
+    totals: dict[str, list[int]]
+
+
+class DailySummaryRead(BaseModel):
+    day: date
+    sport_type: str
+    activity_count: int
+    distance_m: Optional[float] = None
+    moving_time_s: Optional[int] = None
+    training_load: Optional[float] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SummaryTotals(BaseModel):
+    activity_count: int
+    distance_m: float
+    moving_time_s: int
+    training_load: float
+
+
+class DailySummaryResponse(BaseModel):
+    athlete_id: UUID
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    days: list[DailySummaryRead]
+    totals: dict[str, SummaryTotals]
+
+
+class FitnessPoint(BaseModel):
+    day: date
+    load: float
+    ctl: float
+    atl: float
+    tsb: float
+    forecast: bool = False
+
+
+class FitnessResponse(BaseModel):
+    athlete_id: UUID
+    points: list[FitnessPoint]
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Literal
+
+
+class PoolStatus(BaseModel):
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    max_overflow: int
+
+
+class ReplicaStatus(BaseModel):
+    healthy: bool
+    pool: PoolStatus
+
+
+class ReadinessResponse(BaseModel):
+    status: Literal["ready", "unavailable"]
+    database: bool
+    pool: PoolStatus
+    replicas: list[ReplicaStatus] = []
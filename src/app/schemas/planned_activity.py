@@ -36,4 +36,12 @@ class PlannedActivityRead(PlannedActivityBase):
     linked_activity_id: Optional[UUID] = None
     created_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class PlanLink(BaseModel):
+    planned_activity_id: UUID
+    completed_activity_id: UUID
+
+class ReconciliationResult(BaseModel):
+    linked: list[PlanLink]
+    missed: list[UUID]
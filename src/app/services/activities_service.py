@@ -1,56 +1,116 @@
-from datetime import datetime
+import uuid
+from datetime import date, datetime, time, timezone
+from typing import AsyncIterator, Optional
+from sqlalchemy import Select, String, case, cast, literal, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.services import planned_activity_service, completed_activity_service
+from app.enums import ActivityType
+from app.models.completed_activity import CompletedActivity
+from app.models.planned_activity import PlannedActivity
 from app.schemas.activities import ActivitiesEntry, ActivitiesSummary
+from app.services.calendar_cache import calendar_cache
 
+# Same-day events keep planned before completed.
+_PLANNED_RANK = 0
+_COMPLETED_RANK = 1
 
-async def get_activities_events(
-    db: AsyncSession, athlete_id, start_date: datetime, end_date: datetime
-):
-    planned = await planned_activity_service.get_planned_activities_by_date_range(
-        db, athlete_id, start_date, end_date
+
+def calendar_statement(
+    athlete_id: uuid.UUID, start_date: datetime, end_date: datetime, today: Optional[date] = None
+) -> Select:
+    """
+    One UNION ALL over planned and completed activities returning only the
+    columns an ActivitiesEntry needs, ordered by date in the database. Plans
+    not completed by the start of today are reported as missed.
+    """
+    today_start = datetime.combine(today or datetime.now(timezone.utc).date(), time.min, tzinfo=timezone.utc)
+    planned = select(
+        PlannedActivity.id.label("id"),
+        PlannedActivity.scheduled_date.label("date"),
+        PlannedActivity.name.label("title"),
+        # The enum column stores member names; the calendar reports values.
+        cast(case({t: t.value for t in ActivityType}, value=PlannedActivity.type), String).label("type"),
+        cast(case(
+            (PlannedActivity.completed, "completed"),
+            (PlannedActivity.scheduled_date < today_start, "missed"),
+            else_="planned",
+        ), String).label("status"),
+        PlannedActivity.target_distance.label("distance_m"),
+        PlannedActivity.target_duration.label("duration_s"),
+        PlannedActivity.target_intensity.label("training_load"),
+        literal(_PLANNED_RANK).label("source_rank"),
+    ).where(
+        PlannedActivity.athlete_id == athlete_id,
+        PlannedActivity.scheduled_date >= start_date,
+        PlannedActivity.scheduled_date <= end_date,
+    )
+
+    completed = select(
+        CompletedActivity.id,
+        CompletedActivity.start_date_local,
+        CompletedActivity.name,
+        CompletedActivity.sport_type,
+        cast(literal("completed"), String),
+        CompletedActivity.distance_m,
+        CompletedActivity.moving_time_s,
+        CompletedActivity.icu_training_load,
+        literal(_COMPLETED_RANK),
+    ).where(
+        CompletedActivity.athlete_id == athlete_id,
+        CompletedActivity.start_date_local >= start_date,
+        CompletedActivity.start_date_local <= end_date,
     )
-    completed = await completed_activity_service.get_completed_activities_by_date_range(
-        db, athlete_id, start_date, end_date
+
+    events = union_all(planned, completed).subquery("events")
+    return select(
+        events.c.id,
+        events.c.date,
+        events.c.title,
+        events.c.type,
+        events.c.status,
+        events.c.distance_m,
+        events.c.duration_s,
+        events.c.training_load,
+    ).order_by(events.c.date, events.c.source_rank)
+
+
+def _entry(row) -> ActivitiesEntry:
+    return ActivitiesEntry(
+        id=row.id,
+        date=row.date,
+        title=row.title,
+        type=row.type,
+        status=row.status,
+        data=ActivitiesSummary(
+            distance_m=row.distance_m,
+            duration_s=row.duration_s,
+            training_load=row.training_load,
+        ),
     )
 
-    events = []
-
-    for p in planned:
-        status = "completed" if p.completed else "planned"
-        events.append(
-            ActivitiesEntry(
-                id=p.id,
-                date=p.scheduled_date,
-                title=p.name,
-                type=p.type,
-                status=status,
-                data=ActivitiesSummary(
-                    distance_m=p.target_distance,
-                    duration_s=p.target_duration,
-                    training_load=p.target_intensity,
-                ),
-            )
-        )
-
-    for c in completed:
-        date_val = c.start_date_local or c.start_date
-        if date_val is None:
-            continue
-        events.append(
-            ActivitiesEntry(
-                id=c.id,
-                date=date_val,
-                title=c.name,
-                type=c.sport_type,
-                status="completed",
-                data=ActivitiesSummary(
-                    distance_m=c.distance_m,
-                    duration_s=c.moving_time_s,
-                    training_load=c.icu_training_load,
-                ),
-            )
-        )
-
-    events.sort(key=lambda x: x.date)
+
+async def stream_activities_events(
+    db: AsyncSession, athlete_id: uuid.UUID, start_date: datetime, end_date: datetime
+) -> AsyncIterator[ActivitiesEntry]:
+    """Calendar entries in date order as rows arrive from a server-side cursor."""
+    result = await db.stream(calendar_statement(athlete_id, start_date, end_date))
+    async for row in result:
+        yield _entry(row)
+
+
+async def get_activities_events(
+    db: AsyncSession, athlete_id: uuid.UUID, start_date: datetime, end_date: datetime
+) -> list[ActivitiesEntry]:
+    """
+    Calendar entries in date order, served from the calendar cache when
+    possible. The whole window is buffered anyway, so it is read with a plain
+    execute rather than the extra round trips of a server-side cursor.
+    """
+    events = calendar_cache.get(athlete_id, start_date, end_date)
+    if events is not None:
+        return events
+
+    generation = calendar_cache.generation(athlete_id)
+    result = await db.execute(calendar_statement(athlete_id, start_date, end_date))
+    events = [_entry(row) for row in result.all()]
+    calendar_cache.put(athlete_id, start_date, end_date, events, generation)
     return events
@@ -0,0 +1,84 @@
+import uuid
+from typing import Iterable, Mapping, Optional, Sequence
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.activity_stream import ActivityStream
+
+SAMPLE_DTYPE = np.dtype("<f4")
+
+
+def encode_stream(values: Iterable[Optional[float]]) -> bytes:
+    """Pack samples into little-endian float32, storing missing samples as NaN."""
+    return np.array([np.nan if v is None else v for v in values], dtype=SAMPLE_DTYPE).tobytes()
+
+
+def decode_stream(data: bytes) -> np.ndarray:
+    """Zero-copy, read-only view of stored samples."""
+    return np.frombuffer(data, dtype=SAMPLE_DTYPE)
+
+
+def downsample(samples: np.ndarray, points: int) -> np.ndarray:
+    """Average samples into at most `points` equal buckets, ignoring NaN gaps."""
+    if points <= 0 or len(samples) <= points:
+        return samples
+
+    bounds = np.linspace(0, len(samples), points + 1).astype(np.intp)[:-1]
+    present = ~np.isnan(samples)
+    totals = np.add.reduceat(np.where(present, samples, 0), bounds)
+    counts = np.add.reduceat(present, bounds)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (totals / counts).astype(SAMPLE_DTYPE)
+
+
+async def save_activity_streams(
+    db: AsyncSession, activity_id: uuid.UUID, streams: Mapping[str, Sequence[Optional[float]]]
+) -> None:
+    """Replace the given channels of an activity in one statement. The caller commits."""
+    if not streams:
+        return
+
+    rows = [
+        {"activity_id": activity_id, "channel": channel, "sample_count": len(values), "data": encode_stream(values)}
+        for channel, values in streams.items()
+    ]
+    stmt = insert(ActivityStream).values(rows)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[ActivityStream.activity_id, ActivityStream.channel],
+        set_={"sample_count": stmt.excluded.sample_count, "data": stmt.excluded.data},
+    ))
+
+
+async def get_stream_channels(db: AsyncSession, activity_id: uuid.UUID):
+    result = await db.execute(
+        select(ActivityStream.channel, ActivityStream.sample_count)
+        .where(ActivityStream.activity_id == activity_id)
+        .order_by(ActivityStream.channel)
+    )
+    return result.all()
+
+
+async def get_stream_slice(
+    db: AsyncSession, activity_id: uuid.UUID, channel: str, start: int = 0, end: Optional[int] = None
+) -> Optional[tuple[int, np.ndarray]]:
+    """
+    Read samples [start, end) of one channel. Only the requested byte range is
+    fetched from Postgres; returns (sample_count, samples) or None.
+    """
+    offset = start * SAMPLE_DTYPE.itemsize + 1
+    data = (
+        func.substring(ActivityStream.data, offset)
+        if end is None
+        else func.substring(ActivityStream.data, offset, max(end - start, 0) * SAMPLE_DTYPE.itemsize)
+    )
+    result = await db.execute(
+        select(ActivityStream.sample_count, data.label("data")).where(
+            ActivityStream.activity_id == activity_id,
+            ActivityStream.channel == channel,
+        )
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    return row.sample_count, decode_stream(row.data)
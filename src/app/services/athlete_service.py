@@ -1,8 +1,9 @@
 import uuid
-from sqlalchemy import select, delete, exists
+from sqlalchemy import select, delete, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.athlete import Athlete
 from app.schemas.athlete import AthleteCreate, AthleteUpdate
+from app.services.calendar_cache import calendar_cache
 
 async def get_athlete_by_id(db: AsyncSession, athlete_id: uuid.UUID) -> Athlete | None:
     result = await db.execute(select(Athlete).where(Athlete.id == athlete_id))
@@ -10,29 +11,41 @@ async def get_athlete_by_id(db: AsyncSession, athlete_id: uuid.UUID) -> Athlete
     return result.scalar_one_or_none()
 
 async def create_new_athlete(db: AsyncSession, athlete_in: AthleteCreate) -> Athlete:
-    new_athlete = Athlete(**athlete_in.model_dump())
-    db.add(new_athlete)
-    
+    """Insert an athlete and return it as written, in one INSERT ... RETURNING."""
+    result = await db.execute(insert(Athlete).values(**athlete_in.model_dump()).returning(Athlete))
+    athlete = result.scalar_one()
+
     await db.commit()
-    await db.refresh(new_athlete)
-    
-    return new_athlete
 
-async def update_existing_athlete(db: AsyncSession, athlete: Athlete, athlete_in: AthleteUpdate) -> Athlete:
-    for field, value in athlete_in.model_dump(exclude_unset=True).items():
-        setattr(athlete, field, value)
-    
+    return athlete
+
+async def update_existing_athlete(db: AsyncSession, athlete_id: uuid.UUID, athlete_in: AthleteUpdate) -> Athlete | None:
+    """Apply the set fields in one UPDATE ... RETURNING; None when the athlete does not exist."""
+    update_data = athlete_in.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_athlete_by_id(db, athlete_id)
+
+    result = await db.execute(
+        update(Athlete)
+        .where(Athlete.id == athlete_id)
+        .values(**update_data)
+        .returning(Athlete)
+        .execution_options(synchronize_session=False)
+    )
+    athlete = result.scalar_one_or_none()
+    if athlete is None:
+        return None
+
     await db.commit()
-    await db.refresh(athlete)
-    
+
     return athlete
 
 async def delete_athlete_by_id(db: AsyncSession, athlete_id: uuid.UUID) -> bool:
-    stmt = select(exists().where(Athlete.id == athlete_id))
-    result = await db.execute(stmt)
-    if not result.scalar():
+    """Delete an athlete in one DELETE ... RETURNING. False when it does not exist."""
+    result = await db.execute(delete(Athlete).where(Athlete.id == athlete_id).returning(Athlete.id))
+    if result.scalar_one_or_none() is None:
         return False
 
-    await db.execute(delete(Athlete).where(Athlete.id == athlete_id))
     await db.commit()
-    return True
\ No newline at end of file
+    calendar_cache.invalidate(athlete_id)
+    return True
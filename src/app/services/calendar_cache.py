@@ -0,0 +1,166 @@
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Iterable, Optional, Union
+from app.db.base import settings
+
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_TTL_S = 300.0
+
+CalendarKey = tuple[uuid.UUID, datetime, datetime]
+
+
+def _day(value: Union[date, datetime]) -> date:
+    """Day bucket of a timestamp, using the same UTC-date convention as the daily summaries."""
+    if not isinstance(value, datetime):
+        return value
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+@dataclass
+class _Entry:
+    expires_at: float
+    first_day: date
+    last_day: date
+    events: list[Any]
+
+
+class CalendarCache:
+    """
+    In-process, size-bounded cache of calendar results keyed by athlete and
+    date window.
+
+    Entries expire after ttl_s and the least recently used are evicted beyond
+    max_entries. Writers invalidate after they commit, dropping only the
+    cached windows of that athlete that cover a changed day. A read that
+    overlapped an invalidation of its athlete is not stored, so a result
+    read before a commit cannot outlive it. With settle_s, results are also not
+    stored for that long after an invalidation, while replicas may still lag.
+
+    Not thread-safe: it is only touched from the event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_s: float = DEFAULT_TTL_S,
+        settle_s: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.settle_s = settle_s
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self._clock = clock
+        self._entries: OrderedDict[CalendarKey, _Entry] = OrderedDict()
+        self._by_athlete: dict[uuid.UUID, set[CalendarKey]] = {}
+        self._generations: dict[uuid.UUID, int] = {}
+        self._invalidated_at: dict[uuid.UUID, float] = {}
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+        }
+
+    def generation(self, athlete_id: uuid.UUID) -> int:
+        """Token to pass to put(); it changes whenever the athlete is invalidated."""
+        return self._generations.get(athlete_id, 0)
+
+    def get(self, athlete_id: uuid.UUID, start_date: datetime, end_date: datetime) -> Optional[list[Any]]:
+        key = (athlete_id, start_date, end_date)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= self._clock():
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return list(entry.events)
+
+    def put(
+        self,
+        athlete_id: uuid.UUID,
+        start_date: datetime,
+        end_date: datetime,
+        events: list[Any],
+        generation: int,
+    ) -> None:
+        if generation != self.generation(athlete_id):
+            return
+        invalidated_at = self._invalidated_at.get(athlete_id)
+        if invalidated_at is not None and self._clock() - invalidated_at < self.settle_s:
+            return
+
+        key = (athlete_id, start_date, end_date)
+        self._entries[key] = _Entry(self._clock() + self.ttl_s, _day(start_date), _day(end_date), list(events))
+        self._entries.move_to_end(key)
+        self._by_athlete.setdefault(athlete_id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(
+        self, athlete_id: uuid.UUID, days: Optional[Iterable[Union[date, datetime, None]]] = None
+    ) -> int:
+        """
+        Drop the athlete's cached windows that cover any of days, or all of
+        them when days is None. Returns the entries dropped.
+        """
+        self._generations[athlete_id] = self.generation(athlete_id) + 1
+        if self.settle_s:
+            self._invalidated_at[athlete_id] = self._clock()
+
+        keys = self._by_athlete.get(athlete_id, set())
+        if days is None:
+            victims = list(keys)
+        else:
+            changed = {_day(day) for day in days if day is not None}
+            victims = [
+                key for key in keys
+                if any(self._entries[key].first_day <= day <= self._entries[key].last_day for day in changed)
+            ]
+
+        for key in victims:
+            self._remove(key)
+        self.invalidations += len(victims)
+        return len(victims)
+
+    def invalidate_days(self, athlete_days: Iterable[tuple[uuid.UUID, Union[date, datetime, None]]]) -> int:
+        """Invalidate (athlete_id, day) pairs, grouped per athlete."""
+        days: dict[uuid.UUID, set] = {}
+        for athlete_id, day in athlete_days:
+            days.setdefault(athlete_id, set()).add(day)
+        return sum(self.invalidate(athlete_id, athlete_days) for athlete_id, athlete_days in days.items())
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_athlete.clear()
+        self._generations.clear()
+        self._invalidated_at.clear()
+
+    def _remove(self, key: CalendarKey) -> None:
+        del self._entries[key]
+        keys = self._by_athlete[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._by_athlete[key[0]]
+
+
+# Shared by the calendar read path and every writer of planned or completed activities
+calendar_cache = CalendarCache(settle_s=settings.read_after_write_s if settings.replica_urls else 0.0)
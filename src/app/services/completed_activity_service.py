@@ -1,16 +1,50 @@
 import uuid
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.completed_activity import CompletedActivity
-from app.schemas.completed_activity import CompletedActivityCreate, CompletedActivityUpdate
+from app.models.planned_activity import PlannedActivity
+from app.schemas.completed_activity import CompletedActivityCreate, CompletedActivityRead, CompletedActivityUpdate
+from app.services import daily_summary_service, zone_time_service
+from app.services.calendar_cache import calendar_cache
+from app.services.pagination import DEFAULT_PAGE_SIZE, keyset_after, keyset_page, split_page
 from datetime import datetime
+from typing import Any, AsyncIterator, Optional
 
+# Read paths select just what CompletedActivityRead serializes, as plain rows
+# that skip ORM hydration and the identity map.
+READ_COLUMNS = tuple(getattr(CompletedActivity, field) for field in CompletedActivityRead.model_fields)
 
-async def get_completed_activities_by_athlete(db: AsyncSession, athlete_id: uuid.UUID):
-    result = await db.execute(
-        select(CompletedActivity).where(CompletedActivity.athlete_id == athlete_id)
+
+async def get_completed_activities_by_athlete(
+    db: AsyncSession,
+    athlete_id: uuid.UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+):
+    """One page of an athlete's activities, newest first, and the cursor for the next."""
+    stmt = keyset_page(
+        select(*READ_COLUMNS).where(CompletedActivity.athlete_id == athlete_id),
+        CompletedActivity.start_date_local,
+        CompletedActivity.id,
+        limit,
+        cursor,
+    )
+    result = await db.execute(stmt)
+    return split_page(result.all(), "start_date_local", limit)
+
+async def stream_completed_activities_by_athlete(
+    db: AsyncSession, athlete_id: uuid.UUID, cursor: Optional[str] = None
+) -> AsyncIterator[Any]:
+    """Every activity after the cursor in page order, read through a server-side cursor."""
+    stmt = keyset_after(
+        select(*READ_COLUMNS).where(CompletedActivity.athlete_id == athlete_id),
+        CompletedActivity.start_date_local,
+        CompletedActivity.id,
+        cursor,
     )
-    return result.scalars().all()
+    result = await db.stream(stmt)
+    async for row in result:
+        yield row
 
 async def get_completed_activity_by_id(db: AsyncSession, activity_id: uuid.UUID):
     result = await db.execute(
@@ -23,34 +57,108 @@ async def get_completed_activities_by_date_range(
     db: AsyncSession, athlete_id: uuid.UUID, start_date: datetime, end_date: datetime
 ):
     result = await db.execute(
-        select(CompletedActivity).where(
+        select(*READ_COLUMNS).where(
             CompletedActivity.athlete_id == athlete_id,
             CompletedActivity.start_date_local >= start_date,
             CompletedActivity.start_date_local <= end_date,
         )
     )
-    return result.scalars().all()
+    return result.all()
+
+# Pre-update copy of the row; an UPDATE ... FROM it returns the old values alongside the new
+_PREVIOUS = CompletedActivity.__table__.alias("previous")
 
 async def create_completed_activity(db: AsyncSession, activity_in: CompletedActivityCreate):
-    new_activity = CompletedActivity(**activity_in.model_dump())
-    db.add(new_activity)
+    """Insert an activity in one INSERT ... RETURNING and fold it into its daily summary."""
+    result = await db.execute(insert(CompletedActivity).values(**activity_in.model_dump()).returning(*READ_COLUMNS))
+    activity = result.one()
+    await daily_summary_service.refresh_daily_summaries(
+        db, [(activity.athlete_id, daily_summary_service.summary_day(activity.start_date_local))]
+    )
     await db.commit()
-    await db.refresh(new_activity)
-    return new_activity
+    calendar_cache.invalidate(activity.athlete_id, [activity.start_date_local])
+    return activity
+
+async def delete_completed_activity(db: AsyncSession, activity_id: uuid.UUID) -> bool:
+    """
+    Delete an activity and everything derived from it, in one transaction.
+    False when it does not exist, before anything is written.
+
+    The activity row is locked first. Its zone times are then subtracted from
+    the rollups, the plans it fulfilled are unlinked and no longer count as
+    completed, the row is deleted and its day's summaries are refreshed.
+    """
+    locked = await db.execute(
+        select(CompletedActivity.athlete_id, CompletedActivity.start_date_local)
+        .where(CompletedActivity.id == activity_id)
+        .with_for_update()
+    )
+    activity = locked.one_or_none()
+    if activity is None:
+        return False
+
+    # Zone rollups are corrected before the cascade drops the per-activity rows
+    await zone_time_service.delete_activity_zone_times(db, [activity_id])
+    # Done here rather than left to ON DELETE SET NULL, which would keep the
+    # plans completed and does not say which calendar days changed
+    unlinked = await db.execute(
+        update(PlannedActivity)
+        .where(PlannedActivity.linked_activity_id == activity_id)
+        .values(linked_activity_id=None, completed=False)
+        .returning(PlannedActivity.athlete_id, PlannedActivity.scheduled_date)
+        .execution_options(synchronize_session=False)
+    )
+    plan_days = [tuple(row) for row in unlinked.all()]
+    await db.execute(delete(CompletedActivity).where(CompletedActivity.id == activity_id))
 
-async def delete_completed_activity(db: AsyncSession, activity: CompletedActivity):
-    await db.delete(activity)
+    await daily_summary_service.refresh_daily_summaries(
+        db, [(activity.athlete_id, daily_summary_service.summary_day(activity.start_date_local))]
+    )
     await db.commit()
+    calendar_cache.invalidate_days([tuple(activity), *plan_days])
+    return True
 
 async def update_completed_activity(
     db: AsyncSession,
-    db_activity: CompletedActivity,
+    activity_id: uuid.UUID,
     activity_in: CompletedActivityUpdate,
-) -> CompletedActivity:
+):
+    """
+    Apply the set fields in one UPDATE ... RETURNING and return the activity as
+    written, or None when it does not exist.
+    """
     update_data = activity_in.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_activity, field, value)
+    if not update_data:
+        result = await db.execute(select(*READ_COLUMNS).where(CompletedActivity.id == activity_id))
+        return result.one_or_none()
+
+    result = await db.execute(
+        update(CompletedActivity)
+        .where(CompletedActivity.id == activity_id, _PREVIOUS.c.id == CompletedActivity.id)
+        .values(**update_data)
+        .returning(*READ_COLUMNS, _PREVIOUS.c.start_date_local.label("previous_start_date_local"))
+        .execution_options(synchronize_session=False)
+    )
+    activity = result.one_or_none()
+    if activity is None:
+        return None
+
+    if "start_date_local" in update_data:
+        # Zone times are only kept for dated activities, like on sync
+        if activity.start_date_local is None:
+            await zone_time_service.delete_activity_zone_times(db, [activity.id])
+        else:
+            await zone_time_service.move_activity_zone_times(db, activity.id, activity.start_date_local.date())
+
+    if update_data.keys() & {"start_date_local", "sport_type"}:
+        await daily_summary_service.refresh_daily_summaries(db, [
+            (activity.athlete_id, daily_summary_service.summary_day(activity.previous_start_date_local)),
+            (activity.athlete_id, daily_summary_service.summary_day(activity.start_date_local)),
+        ])
 
     await db.commit()
-    await db.refresh(db_activity)
-    return db_activity
+    calendar_cache.invalidate_days([
+        (activity.athlete_id, activity.previous_start_date_local),
+        (activity.athlete_id, activity.start_date_local),
+    ])
+    return activity
@@ -0,0 +1,136 @@
+import uuid
+from datetime import datetime
+from typing import Any, Optional
+import numpy as np
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.analytics.curves import CURVE_DURATIONS, mean_max, merge_curves, new_bests
+from app.enums import CurveKind
+from app.models.activity_curve import ActivityCurve
+from app.models.completed_activity import CompletedActivity
+from app.services import activity_stream_service
+
+# Stream channel each curve is computed from
+CURVE_CHANNELS = {CurveKind.power: "watts", CurveKind.pace: "velocity_smooth"}
+
+
+def _encode(curve: np.ndarray) -> bytes:
+    return curve.astype("<f4").tobytes()
+
+
+def _decode(values: bytes) -> np.ndarray:
+    return np.frombuffer(values, dtype="<f4")
+
+
+async def compute_activity_curves(db: AsyncSession, activity_id: uuid.UUID) -> dict[CurveKind, np.ndarray]:
+    """
+    Compute and cache an activity's curves from its stored streams, and fill
+    max_power_w from the 1s best when the source did not provide it. The
+    caller commits.
+    """
+    curves: dict[CurveKind, np.ndarray] = {}
+    for kind, channel in CURVE_CHANNELS.items():
+        stream = await activity_stream_service.get_stream_slice(db, activity_id, channel)
+        if stream is not None and len(stream[1]):
+            curves[kind] = mean_max(stream[1])
+
+    if not curves:
+        return curves
+
+    stmt = insert(ActivityCurve).values([
+        {"activity_id": activity_id, "kind": kind.value, "values": _encode(curve)}
+        for kind, curve in curves.items()
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[ActivityCurve.activity_id, ActivityCurve.kind],
+        set_={"values": stmt.excluded["values"], "computed_at": func.now()},
+    ))
+
+    power = curves.get(CurveKind.power)
+    if power is not None and not np.isnan(power[0]):
+        await db.execute(
+            update(CompletedActivity)
+            .where(CompletedActivity.id == activity_id)
+            .values(max_power_w=func.coalesce(CompletedActivity.max_power_w, float(power[0])))
+        )
+
+    return curves
+
+
+async def get_athlete_curve(
+    db: AsyncSession,
+    athlete_id: uuid.UUID,
+    kind: CurveKind,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    before: Optional[datetime] = None,
+) -> tuple[np.ndarray, list[Optional[uuid.UUID]]]:
+    """
+    Best-effort curve over a date range, merged from cached per-activity curves.
+    Returns the curve and the activity holding each point.
+    """
+    stmt = (
+        select(ActivityCurve.activity_id, ActivityCurve.values)
+        .join(CompletedActivity, CompletedActivity.id == ActivityCurve.activity_id)
+        .where(CompletedActivity.athlete_id == athlete_id, ActivityCurve.kind == kind.value)
+    )
+    if start_date is not None:
+        stmt = stmt.where(CompletedActivity.start_date_local >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(CompletedActivity.start_date_local <= end_date)
+    if before is not None:
+        stmt = stmt.where(CompletedActivity.start_date_local < before)
+
+    rows = (await db.execute(stmt)).all()
+    curve, best_index = merge_curves([_decode(row.values) for row in rows])
+    return curve, [rows[i].activity_id if i >= 0 else None for i in best_index]
+
+
+def _achievement(kind: CurveKind, secs: int, value: float) -> dict[str, Any]:
+    if kind == CurveKind.power:
+        return {
+            "id": f"BEST_POWER_{secs}",
+            "type": "BEST_POWER",
+            "message": f"Best {secs}s power: {round(value)}W",
+            "secs": secs,
+            "watts": round(value),
+        }
+    return {
+        "id": f"BEST_PACE_{secs}",
+        "type": "BEST_PACE",
+        "message": f"Best {secs}s pace: {value:.2f} m/s",
+        "secs": secs,
+        "pace": value,
+        "distance": value * secs,
+    }
+
+
+async def get_activity_achievements(db: AsyncSession, activity_id: uuid.UUID) -> Optional[list[dict[str, Any]]]:
+    """
+    BEST_POWER / BEST_PACE achievements of an activity against everything the
+    athlete did before it. Returns None for an unknown activity.
+    """
+    activity = (await db.execute(
+        select(CompletedActivity.athlete_id, CompletedActivity.start_date_local)
+        .where(CompletedActivity.id == activity_id)
+    )).one_or_none()
+    if activity is None:
+        return None
+
+    cached = (await db.execute(
+        select(ActivityCurve.kind, ActivityCurve.values).where(ActivityCurve.activity_id == activity_id)
+    )).all()
+
+    achievements = []
+    for row in cached:
+        kind = CurveKind(row.kind)
+        curve = _decode(row.values)
+        previous = None
+        if activity.start_date_local is not None:
+            previous, _ = await get_athlete_curve(db, activity.athlete_id, kind, before=activity.start_date_local)
+
+        for index in np.flatnonzero(new_bests(curve, previous)):
+            achievements.append(_achievement(kind, int(CURVE_DURATIONS[index]), float(curve[index])))
+
+    return achievements
@@ -0,0 +1,127 @@
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Optional
+from sqlalchemy import Date, Select, and_, cast, delete, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.completed_activity import CompletedActivity
+from app.models.daily_summary import DailyTrainingSummary
+from app.services import fitness_service
+
+# Activities without a sport are summarized under the calendar's default type
+UNKNOWN_SPORT = "Other"
+
+# start_date_local holds the local wall clock as UTC, so its UTC date is the local day
+_DAY = cast(func.timezone("UTC", CompletedActivity.start_date_local), Date)
+_SPORT = func.coalesce(CompletedActivity.sport_type, UNKNOWN_SPORT)
+
+_SUMMARY_COLUMNS = ["athlete_id", "day", "sport_type", "activity_count", "distance_m", "moving_time_s", "training_load"]
+
+
+def summary_day(start_date_local: Optional[datetime]) -> Optional[date]:
+    """Local day an activity is summarized under, None when it has no start date."""
+    if start_date_local is None:
+        return None
+    if start_date_local.tzinfo is not None:
+        start_date_local = start_date_local.astimezone(timezone.utc)
+    return start_date_local.date()
+
+
+def _aggregate() -> Select:
+    return select(
+        CompletedActivity.athlete_id,
+        _DAY,
+        _SPORT,
+        func.count(),
+        func.sum(CompletedActivity.distance_m),
+        func.sum(CompletedActivity.moving_time_s),
+        func.sum(CompletedActivity.icu_training_load),
+    ).group_by(CompletedActivity.athlete_id, _DAY, _SPORT)
+
+
+def _insert_aggregate(aggregate: Select):
+    stmt = insert(DailyTrainingSummary).from_select(_SUMMARY_COLUMNS, aggregate)
+    # A concurrent refresh of the same day may have re-inserted it already
+    return stmt.on_conflict_do_update(
+        index_elements=[DailyTrainingSummary.athlete_id, DailyTrainingSummary.day, DailyTrainingSummary.sport_type],
+        set_={name: stmt.excluded[name] for name in _SUMMARY_COLUMNS[3:]},
+    )
+
+
+async def refresh_daily_summaries(
+    db: AsyncSession, athlete_days: Iterable[tuple[uuid.UUID, Optional[date]]]
+) -> int:
+    """
+    Recompute the summary rows of the given (athlete_id, day) pairs from their
+    activities, in two statements, and mark the athletes' fitness stale from the
+    earliest of those days. Returns the days refreshed. The caller commits.
+    """
+    keys = {(athlete_id, day) for athlete_id, day in athlete_days if day is not None}
+    if not keys:
+        return 0
+
+    await db.execute(
+        delete(DailyTrainingSummary).where(
+            tuple_(DailyTrainingSummary.athlete_id, DailyTrainingSummary.day).in_(list(keys))
+        )
+    )
+
+    # Per-day timestamp ranges keep the athlete/start index usable
+    ranges = []
+    for athlete_id, day in keys:
+        start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+        ranges.append(and_(
+            CompletedActivity.athlete_id == athlete_id,
+            CompletedActivity.start_date_local >= start,
+            CompletedActivity.start_date_local < start + timedelta(days=1),
+        ))
+    await db.execute(_insert_aggregate(_aggregate().where(or_(*ranges))))
+    await fitness_service.mark_fitness_dirty(db, keys)
+    return len(keys)
+
+
+async def rebuild_daily_summaries(db: AsyncSession, athlete_id: Optional[uuid.UUID] = None) -> None:
+    """Recompute summaries from scratch, for one athlete or everyone. The caller commits."""
+    clear = delete(DailyTrainingSummary)
+    aggregate = _aggregate().where(CompletedActivity.start_date_local.is_not(None))
+    if athlete_id is not None:
+        clear = clear.where(DailyTrainingSummary.athlete_id == athlete_id)
+        aggregate = aggregate.where(CompletedActivity.athlete_id == athlete_id)
+
+    await db.execute(clear)
+    await db.execute(_insert_aggregate(aggregate))
+    await fitness_service.reset_fitness(db, athlete_id)
+
+
+async def get_daily_summaries(
+    db: AsyncSession,
+    athlete_id: uuid.UUID,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    sport_type: Optional[str] = None,
+) -> list[DailyTrainingSummary]:
+    """Summary rows for an athlete, oldest day first."""
+    stmt = select(DailyTrainingSummary).where(DailyTrainingSummary.athlete_id == athlete_id)
+    if start_date is not None:
+        stmt = stmt.where(DailyTrainingSummary.day >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(DailyTrainingSummary.day <= end_date)
+    if sport_type is not None:
+        stmt = stmt.where(DailyTrainingSummary.sport_type == sport_type)
+
+    result = await db.execute(stmt.order_by(DailyTrainingSummary.day, DailyTrainingSummary.sport_type))
+    return result.scalars().all()
+
+
+def total_daily_summaries(summaries: Iterable[DailyTrainingSummary]) -> dict[str, dict[str, float]]:
+    """Sum summary rows per sport."""
+    totals: dict[str, dict[str, float]] = {}
+    for summary in summaries:
+        total = totals.setdefault(
+            summary.sport_type, {"activity_count": 0, "distance_m": 0.0, "moving_time_s": 0, "training_load": 0.0}
+        )
+        total["activity_count"] += summary.activity_count
+        total["distance_m"] += summary.distance_m or 0.0
+        total["moving_time_s"] += summary.moving_time_s or 0
+        total["training_load"] += summary.training_load or 0.0
+    return totals
@@ -0,0 +1,179 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+import numpy as np
+from sqlalchemy import Date, cast, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.analytics.fitness import fitness_series
+from app.models.daily_summary import DailyTrainingSummary
+from app.models.fitness import AthleteFitness, AthleteFitnessState
+from app.models.planned_activity import PlannedActivity
+
+# Planned days use the same UTC-date convention as the daily summaries
+_PLANNED_DAY = cast(func.timezone("UTC", PlannedActivity.scheduled_date), Date)
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _dense_load(start: date, days: int, rows: Iterable[Any]) -> np.ndarray:
+    load = np.zeros(days, dtype=np.float64)
+    for day, total in rows:
+        load[(day - start).days] = total or 0.0
+    return load
+
+
+async def mark_fitness_dirty(db: AsyncSession, athlete_days: Iterable[tuple[uuid.UUID, Optional[date]]]) -> None:
+    """Record the earliest changed day per athlete; the next read recomputes from there. The caller commits."""
+    earliest: dict[uuid.UUID, date] = {}
+    for athlete_id, day in athlete_days:
+        if day is not None:
+            earliest[athlete_id] = min(earliest.get(athlete_id, day), day)
+    if not earliest:
+        return
+
+    stmt = insert(AthleteFitnessState).values([
+        {"athlete_id": athlete_id, "dirty_from": day} for athlete_id, day in earliest.items()
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[AthleteFitnessState.athlete_id],
+        set_={"dirty_from": func.least(AthleteFitnessState.dirty_from, stmt.excluded.dirty_from)},
+    ))
+
+
+async def reset_fitness(db: AsyncSession, athlete_id: Optional[uuid.UUID] = None) -> None:
+    """Forget computed state so the next read recomputes the whole series. The caller commits."""
+    stmt = delete(AthleteFitnessState)
+    if athlete_id is not None:
+        stmt = stmt.where(AthleteFitnessState.athlete_id == athlete_id)
+    await db.execute(stmt)
+
+
+async def refresh_fitness(db: AsyncSession, athlete_id: uuid.UUID, today: date) -> int:
+    """
+    Bring the stored series up to today, recomputing only from the earliest
+    changed day onward and continuing from the stored state of the day before.
+    Returns the days written. The caller commits.
+    """
+    state = await db.get(AthleteFitnessState, athlete_id)
+    computed_through = state.computed_through if state is not None else None
+
+    if computed_through is None:
+        start = (await db.execute(
+            select(func.min(DailyTrainingSummary.day)).where(DailyTrainingSummary.athlete_id == athlete_id)
+        )).scalar_one_or_none()
+    else:
+        start = computed_through + timedelta(days=1)
+        if state.dirty_from is not None:
+            start = min(start, state.dirty_from)
+
+    if start is None or start > today:
+        if state is not None:
+            state.dirty_from = None
+        return 0
+    if state is None:
+        state = AthleteFitnessState(athlete_id=athlete_id)
+        db.add(state)
+
+    seed = (await db.execute(
+        select(AthleteFitness.ctl, AthleteFitness.atl).where(
+            AthleteFitness.athlete_id == athlete_id, AthleteFitness.day == start - timedelta(days=1)
+        )
+    )).one_or_none()
+    loads = (await db.execute(
+        select(DailyTrainingSummary.day, func.sum(DailyTrainingSummary.training_load))
+        .where(
+            DailyTrainingSummary.athlete_id == athlete_id,
+            DailyTrainingSummary.day >= start,
+            DailyTrainingSummary.day <= today,
+        )
+        .group_by(DailyTrainingSummary.day)
+    )).all()
+
+    days = (today - start).days + 1
+    load = _dense_load(start, days, loads)
+    ctl, atl, tsb = fitness_series(load, *(seed or (0.0, 0.0)))
+
+    # A full recompute also drops rows from before a history that now starts later
+    clear = delete(AthleteFitness).where(AthleteFitness.athlete_id == athlete_id)
+    if computed_through is not None:
+        clear = clear.where(AthleteFitness.day >= start)
+    await db.execute(clear)
+
+    stmt = insert(AthleteFitness)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[AthleteFitness.athlete_id, AthleteFitness.day],
+            set_={name: stmt.excluded[name] for name in ("load", "ctl", "atl", "tsb")},
+        ),
+        [
+            {"athlete_id": athlete_id, "day": start + timedelta(days=i), "load": l, "ctl": c, "atl": a, "tsb": t}
+            for i, (l, c, a, t) in enumerate(zip(load.tolist(), ctl.tolist(), atl.tolist(), tsb.tolist()))
+        ],
+    )
+
+    state.computed_through = today
+    state.dirty_from = None
+    return days
+
+
+async def _forecast(
+    db: AsyncSession, athlete_id: uuid.UUID, last: Optional[AthleteFitness], today: date, end_date: date
+) -> list[dict[str, Any]]:
+    """Project the series past today from the load of planned, not yet completed activities."""
+    start = today + timedelta(days=1)
+    planned = (await db.execute(
+        select(_PLANNED_DAY, func.sum(PlannedActivity.target_intensity))
+        .where(
+            PlannedActivity.athlete_id == athlete_id,
+            PlannedActivity.completed.is_not(True),
+            _PLANNED_DAY >= start,
+            _PLANNED_DAY <= end_date,
+        )
+        .group_by(_PLANNED_DAY)
+    )).all()
+
+    days = (end_date - start).days + 1
+    load = _dense_load(start, days, planned)
+    ctl, atl, tsb = fitness_series(load, last.ctl if last else 0.0, last.atl if last else 0.0)
+    return [
+        {"day": start + timedelta(days=i), "load": l, "ctl": c, "atl": a, "tsb": t, "forecast": True}
+        for i, (l, c, a, t) in enumerate(zip(load.tolist(), ctl.tolist(), atl.tolist(), tsb.tolist()))
+    ]
+
+
+async def get_fitness(
+    db: AsyncSession,
+    athlete_id: uuid.UUID,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    today: Optional[date] = None,
+) -> list[dict[str, Any]]:
+    """
+    Daily CTL/ATL/TSB for an athlete, oldest first. Days after today are a
+    forecast from planned activities.
+    """
+    today = today or _today()
+    end_date = end_date or today
+
+    await refresh_fitness(db, athlete_id, today)
+    await db.commit()
+
+    stmt = select(AthleteFitness).where(
+        AthleteFitness.athlete_id == athlete_id, AthleteFitness.day <= min(end_date, today)
+    )
+    if start_date is not None:
+        stmt = stmt.where(AthleteFitness.day >= start_date)
+    stored = (await db.execute(stmt.order_by(AthleteFitness.day))).scalars().all()
+
+    points = [
+        {"day": row.day, "load": row.load, "ctl": row.ctl, "atl": row.atl, "tsb": row.tsb, "forecast": False}
+        for row in stored
+    ]
+    if end_date > today:
+        last = stored[-1] if stored and stored[-1].day == today else await db.get(AthleteFitness, (athlete_id, today))
+        forecast = await _forecast(db, athlete_id, last, today, end_date)
+        points.extend(p for p in forecast if start_date is None or p["day"] >= start_date)
+    return points
@@ -0,0 +1,72 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Optional, Sequence
+from sqlalchemy import Select, and_, or_, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """Raised when a page cursor token cannot be decoded."""
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: uuid.UUID) -> str:
+    """Opaque token for the position just after (sort_value, row_id)."""
+    payload = [sort_value.isoformat() if sort_value is not None else None, str(row_id)]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[Optional[datetime], uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        sort_value, row_id = json.loads(raw)
+        return (datetime.fromisoformat(sort_value) if sort_value is not None else None), uuid.UUID(row_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Invalid page cursor") from exc
+
+
+def keyset_after(
+    stmt: Select,
+    sort_col: InstrumentedAttribute,
+    id_col: InstrumentedAttribute,
+    cursor: Optional[str] = None,
+) -> Select:
+    """
+    stmt from the cursor onward, ordered newest first by (sort_col, id_col)
+    descending with NULL dates first.
+    """
+    if cursor is not None:
+        sort_value, row_id = decode_cursor(cursor)
+        if sort_value is None:
+            stmt = stmt.where(or_(and_(sort_col.is_(None), id_col < row_id), sort_col.is_not(None)))
+        else:
+            # Past the undated head a single row comparison seeks straight into the index
+            stmt = stmt.where(tuple_(sort_col, id_col) < tuple_(sort_value, row_id))
+    return stmt.order_by(sort_col.desc().nulls_first(), id_col.desc())
+
+
+def keyset_page(
+    stmt: Select,
+    sort_col: InstrumentedAttribute,
+    id_col: InstrumentedAttribute,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Select:
+    """
+    One page of keyset_after(). Fetches one extra row so the caller can tell
+    whether another page follows.
+    """
+    return keyset_after(stmt, sort_col, id_col, cursor).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], sort_attr: str, limit: int) -> tuple[list[Any], Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the next page, if any."""
+    items = list(rows[:limit])
+    if len(rows) <= limit:
+        return items, None
+    last = items[-1]
+    return items, encode_cursor(getattr(last, sort_attr), last.id)
@@ -1,15 +1,59 @@
 import uuid
-from sqlalchemy import select, delete
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.athlete import Athlete
 from app.models.planned_activity import PlannedActivity
-from app.schemas.planned_activity import PlannedActivityCreate, PlannedActivityUpdate
+from app.schemas.planned_activity import PlannedActivityCreate, PlannedActivityRead, PlannedActivityUpdate
+from app.services.calendar_cache import calendar_cache
+from app.services.pagination import DEFAULT_PAGE_SIZE, keyset_after, keyset_page, split_page
 from datetime import datetime
+from typing import Any, AsyncIterator, Optional, Sequence
 
-async def get_planned_activities_by_athlete(db: AsyncSession, athlete_id: uuid.UUID):
-    result = await db.execute(
-        select(PlannedActivity).where(PlannedActivity.athlete_id == athlete_id)
+# Read paths select just what PlannedActivityRead serializes, as plain rows
+READ_COLUMNS = tuple(getattr(PlannedActivity, field) for field in PlannedActivityRead.model_fields)
+
+# A 24 week plan with a few sessions a day stays well below this
+MAX_BATCH_SIZE = 1000
+
+
+class UnknownAthletes(ValueError):
+    """Raised when batch items reference athletes that do not exist; nothing was inserted."""
+
+    def __init__(self, indexes: list[int]):
+        super().__init__(f"Unknown athlete in items {indexes}")
+        self.indexes = indexes
+
+async def get_planned_activities_by_athlete(
+    db: AsyncSession,
+    athlete_id: uuid.UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+):
+    """One page of an athlete's plans, latest scheduled first, and the cursor for the next."""
+    stmt = keyset_page(
+        select(*READ_COLUMNS).where(PlannedActivity.athlete_id == athlete_id),
+        PlannedActivity.scheduled_date,
+        PlannedActivity.id,
+        limit,
+        cursor,
+    )
+    result = await db.execute(stmt)
+    return split_page(result.all(), "scheduled_date", limit)
+
+async def stream_planned_activities_by_athlete(
+    db: AsyncSession, athlete_id: uuid.UUID, cursor: Optional[str] = None
+) -> AsyncIterator[Any]:
+    """Every plan after the cursor in page order, read through a server-side cursor."""
+    stmt = keyset_after(
+        select(*READ_COLUMNS).where(PlannedActivity.athlete_id == athlete_id),
+        PlannedActivity.scheduled_date,
+        PlannedActivity.id,
+        cursor,
     )
-    return result.scalars().all()
+    result = await db.stream(stmt)
+    async for row in result:
+        yield row
 
 async def get_planned_activity_by_id(db: AsyncSession, activity_id: uuid.UUID):
     result = await db.execute(
@@ -22,34 +66,95 @@ async def get_planned_activities_by_date_range(
     db: AsyncSession, athlete_id: uuid.UUID, start_date: datetime, end_date: datetime
 ):
     result = await db.execute(
-        select(PlannedActivity).where(
+        select(*READ_COLUMNS).where(
             PlannedActivity.athlete_id == athlete_id,
             PlannedActivity.scheduled_date >= start_date,
             PlannedActivity.scheduled_date <= end_date,
         )
     )
-    return result.scalars().all()
+    return result.all()
+
+# Pre-update copy of the row; an UPDATE ... FROM it returns the old values alongside the new
+_PREVIOUS = PlannedActivity.__table__.alias("previous")
 
 async def create_planned_activity(db: AsyncSession, activity_in: PlannedActivityCreate):
-    new_activity = PlannedActivity(**activity_in.model_dump())
-    db.add(new_activity)
+    """Insert a plan and return it as written, in one INSERT ... RETURNING."""
+    result = await db.execute(insert(PlannedActivity).values(**activity_in.model_dump()).returning(*READ_COLUMNS))
+    activity = result.one()
     await db.commit()
-    await db.refresh(new_activity)
-    return new_activity
+    calendar_cache.invalidate(activity.athlete_id, [activity.scheduled_date])
+    return activity
 
-async def delete_planned_activity(db: AsyncSession, activity: PlannedActivity):
-    await db.delete(activity)
+async def create_planned_activities(db: AsyncSession, activities_in: Sequence[PlannedActivityCreate]) -> list[Any]:
+    """
+    Insert a batch of plans in one transaction and return them as written,
+    in input order. The rows go out as multi-row INSERT ... RETURNING
+    statements; either all of them are stored or none, and UnknownAthletes
+    names the items that made it fail.
+    """
+    try:
+        result = await db.execute(
+            insert(PlannedActivity).returning(*READ_COLUMNS, sort_by_parameter_order=True),
+            [activity_in.model_dump() for activity_in in activities_in],
+        )
+        activities = result.all()
+    except IntegrityError:
+        await db.rollback()
+        unknown = await _unknown_athletes(db, activities_in)
+        if unknown:
+            raise UnknownAthletes(unknown)
+        raise
     await db.commit()
-    
+    calendar_cache.invalidate_days((activity.athlete_id, activity.scheduled_date) for activity in activities)
+    return activities
+
+async def _unknown_athletes(db: AsyncSession, activities_in: Sequence[PlannedActivityCreate]) -> list[int]:
+    athlete_ids = {activity_in.athlete_id for activity_in in activities_in}
+    result = await db.execute(select(Athlete.id).where(Athlete.id.in_(athlete_ids)))
+    known = set(result.scalars().all())
+    return [index for index, activity_in in enumerate(activities_in) if activity_in.athlete_id not in known]
+
+async def delete_planned_activity(db: AsyncSession, activity_id: uuid.UUID) -> bool:
+    """Delete a plan in one DELETE ... RETURNING. False when it does not exist."""
+    result = await db.execute(
+        delete(PlannedActivity)
+        .where(PlannedActivity.id == activity_id)
+        .returning(PlannedActivity.athlete_id, PlannedActivity.scheduled_date)
+    )
+    deleted = result.one_or_none()
+    if deleted is None:
+        return False
+    await db.commit()
+    calendar_cache.invalidate_days([tuple(deleted)])
+    return True
+
 async def update_planned_activity(
-    db: AsyncSession, 
-    db_activity: PlannedActivity, 
+    db: AsyncSession,
+    activity_id: uuid.UUID,
     activity_in: PlannedActivityUpdate
-) -> PlannedActivity:
+):
+    """
+    Apply the set fields in one UPDATE ... RETURNING and return the plan as
+    written, or None when it does not exist.
+    """
     update_data = activity_in.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_activity, field, value)
-    
+    if not update_data:
+        result = await db.execute(select(*READ_COLUMNS).where(PlannedActivity.id == activity_id))
+        return result.one_or_none()
+
+    result = await db.execute(
+        update(PlannedActivity)
+        .where(PlannedActivity.id == activity_id, _PREVIOUS.c.id == PlannedActivity.id)
+        .values(**update_data)
+        .returning(*READ_COLUMNS, _PREVIOUS.c.athlete_id.label("previous_athlete_id"), _PREVIOUS.c.scheduled_date.label("previous_scheduled_date"))
+        .execution_options(synchronize_session=False)
+    )
+    activity = result.one_or_none()
+    if activity is None:
+        return None
     await db.commit()
-    await db.refresh(db_activity)
-    return db_activity
\ No newline at end of file
+    calendar_cache.invalidate_days([
+        (activity.previous_athlete_id, activity.previous_scheduled_date),
+        (activity.athlete_id, activity.scheduled_date),
+    ])
+    return activity
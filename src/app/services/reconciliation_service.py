@@ -0,0 +1,190 @@
+import uuid
+from datetime import date, datetime, timezone
+from typing import Any, NamedTuple, Optional, Sequence
+from sqlalchemy import column, exists, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app.enums import ActivityType
+from app.models.completed_activity import CompletedActivity
+from app.models.planned_activity import PlannedActivity
+from app.services.calendar_cache import calendar_cache
+from app.services.daily_summary_service import summary_day
+
+
+# A plan is only fulfilled by an activity within this relative miss of the
+# closer of its targets; a 10 minute spin does not complete a 4 hour ride.
+MAX_TARGET_MISS = 0.5
+
+
+class _Candidate(NamedTuple):
+    id: uuid.UUID
+    day: date
+    sport: ActivityType
+    duration_s: Optional[float]
+    distance_m: Optional[float]
+
+
+def sport_family(sport_type: Optional[str]) -> ActivityType:
+    """Planned activity type a completed sport_type counts as (VirtualRide is a Ride, TrailRun a Run...)."""
+    for family in (ActivityType.ride, ActivityType.run, ActivityType.swim):
+        if sport_type and family.value.lower() in sport_type.lower():
+            return family
+    return ActivityType.other
+
+
+def _closeness(plan: _Candidate, activity: _Candidate) -> float:
+    """Relative miss of the closer of the plan's duration and distance targets; 0 without targets."""
+    misses = [
+        abs(actual - target) / target
+        for target, actual in ((plan.duration_s, activity.duration_s), (plan.distance_m, activity.distance_m))
+        if target and actual is not None
+    ]
+    return min(misses) if misses else 0.0
+
+
+def _match_day(plans: Sequence[_Candidate], activities: Sequence[_Candidate]) -> list[tuple[uuid.UUID, uuid.UUID]]:
+    pairs = sorted(
+        (_closeness(plan, activity), p, a)
+        for p, plan in enumerate(plans)
+        for a, activity in enumerate(activities)
+        if plan.sport == activity.sport and _closeness(plan, activity) <= MAX_TARGET_MISS
+    )
+    used_plans, used_activities, links = set(), set(), []
+    for _, p, a in pairs:
+        if p not in used_plans and a not in used_activities:
+            used_plans.add(p)
+            used_activities.add(a)
+            links.append((plans[p].id, activities[a].id))
+    return links
+
+
+def match_plans(
+    plans: Sequence[_Candidate], activities: Sequence[_Candidate]
+) -> list[tuple[uuid.UUID, uuid.UUID]]:
+    """
+    Pair plans with completed activities of the same day and sport, closest to
+    the plan's targets first, leaving pairs beyond MAX_TARGET_MISS unlinked. Both inputs are ordered by day and are walked
+    once, merge-join style; only same-day groups are compared pairwise.
+    """
+    links = []
+    i = j = 0
+    while i < len(plans) and j < len(activities):
+        day = plans[i].day
+        if day < activities[j].day:
+            i += 1
+            continue
+        if activities[j].day < day:
+            j += 1
+            continue
+
+        i_end, j_end = i, j
+        while i_end < len(plans) and plans[i_end].day == day:
+            i_end += 1
+        while j_end < len(activities) and activities[j_end].day == day:
+            j_end += 1
+        links.extend(_match_day(plans[i:i_end], activities[j:j_end]))
+        i, j = i_end, j_end
+    return links
+
+
+def _lock_key(athlete_id: uuid.UUID) -> int:
+    """Advisory lock key of an athlete's reconcile: the signed first 64 bits of the id."""
+    return int.from_bytes(athlete_id.bytes[:8], "big", signed=True)
+
+
+async def reconcile_plans(
+    db: AsyncSession,
+    athlete_id: uuid.UUID,
+    start_date: datetime,
+    end_date: datetime,
+    today: Optional[date] = None,
+) -> dict[str, Any]:
+    """
+    Link an athlete's unlinked plans in the range to the completed activities
+    that fulfil them, in one UPDATE, and report the plans left unfulfilled
+    before today as missed. Plans linked or completed by hand are kept.
+
+    Reconciles of one athlete are serialized on a transaction-scoped advisory
+    lock taken before the reads, so a concurrent run sees the links the other
+    committed and one activity never fulfils two plans. Missed is report-only:
+    it is derived from the plans again on every read and is not stored.
+    """
+    today = today or datetime.now(timezone.utc).date()
+
+    await db.execute(select(func.pg_advisory_xact_lock(_lock_key(athlete_id))))
+    plan_rows = (await db.execute(
+        select(
+            PlannedActivity.id,
+            PlannedActivity.scheduled_date,
+            PlannedActivity.type,
+            PlannedActivity.target_duration,
+            PlannedActivity.target_distance,
+        )
+        .where(
+            PlannedActivity.athlete_id == athlete_id,
+            PlannedActivity.scheduled_date >= start_date,
+            PlannedActivity.scheduled_date <= end_date,
+            PlannedActivity.linked_activity_id.is_(None),
+            PlannedActivity.completed.is_not(True),
+        )
+        .order_by(PlannedActivity.scheduled_date, PlannedActivity.id)
+    )).all()
+    activity_rows = (await db.execute(
+        select(
+            CompletedActivity.id,
+            CompletedActivity.start_date_local,
+            CompletedActivity.sport_type,
+            CompletedActivity.moving_time_s,
+            CompletedActivity.distance_m,
+        )
+        .where(
+            CompletedActivity.athlete_id == athlete_id,
+            CompletedActivity.start_date_local >= start_date,
+            CompletedActivity.start_date_local <= end_date,
+            ~exists().where(PlannedActivity.linked_activity_id == CompletedActivity.id),
+        )
+        .order_by(CompletedActivity.start_date_local, CompletedActivity.id)
+    )).all()
+
+    plans = [
+        _Candidate(row.id, summary_day(row.scheduled_date), row.type, row.target_duration, row.target_distance)
+        for row in plan_rows
+    ]
+    activities = [
+        _Candidate(row.id, summary_day(row.start_date_local), sport_family(row.sport_type), row.moving_time_s, row.distance_m)
+        for row in activity_rows
+    ]
+    links = match_plans(plans, activities)
+
+    linked = {}
+    if links:
+        pairs = values(
+            column("plan_id", UUID(as_uuid=True)), column("activity_id", UUID(as_uuid=True)), name="links"
+        ).data(links)
+        claimed = aliased(PlannedActivity)
+        result = await db.execute(
+            update(PlannedActivity)
+            .where(
+                PlannedActivity.id == pairs.c.plan_id,
+                PlannedActivity.linked_activity_id.is_(None),
+                ~exists().where(claimed.linked_activity_id == pairs.c.activity_id),
+            )
+            .values(linked_activity_id=pairs.c.activity_id, completed=True)
+            .returning(PlannedActivity.id, PlannedActivity.linked_activity_id)
+        )
+        linked = dict(result.all())
+        await db.commit()
+    else:
+        # Nothing to write; end the transaction to release the lock
+        await db.rollback()
+
+    if linked:
+        calendar_cache.invalidate(athlete_id, [plan.day for plan in plans if plan.id in linked])
+    return {
+        "linked": [
+            {"planned_activity_id": plan.id, "completed_activity_id": linked[plan.id]}
+            for plan in plans if plan.id in linked
+        ],
+        "missed": [plan.id for plan in plans if plan.id not in linked and plan.day < today],
+    }
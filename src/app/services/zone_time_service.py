@@ -0,0 +1,182 @@
+import uuid
+from datetime import date
+from typing import Any, Iterable, Optional
+import numpy as np
+from sqlalchemy import select, delete, literal_column, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.analytics.zones import ZONE_SLOTS, extract_zone_times, rollup_deltas
+from app.enums import RollupPeriod, ZoneKind
+from app.models.zone_times import ActivityZoneTimes, ZoneTimeRollup
+
+# Adds the incoming delta to the stored vector slot by slot.
+_ADD_SECS = literal_column(
+    "ARRAY(SELECT a + b FROM unnest(zone_time_rollups.secs, excluded.secs) "
+    "WITH ORDINALITY AS t(a, b, i) ORDER BY i)"
+)
+
+
+def zone_time_rows(
+    activity_id: uuid.UUID, athlete_id: uuid.UUID, day: Optional[date], icu_data: dict[str, Any]
+) -> list[dict[str, Any]]:
+    """activity_zone_times rows for an IcuActivity payload; empty without a start date."""
+    if day is None:
+        return []
+    return [
+        {"activity_id": activity_id, "kind": kind.value, "athlete_id": athlete_id, "day": day, "secs": secs.tolist()}
+        for kind, secs in extract_zone_times(icu_data).items()
+    ]
+
+
+def _entries(rows: Iterable[Any]) -> list[tuple[Any, date, str, np.ndarray]]:
+    return [(row.athlete_id, row.day, row.kind, np.asarray(row.secs)) for row in rows]
+
+
+async def _apply_rollup_deltas(db: AsyncSession, removed: list, added: list) -> int:
+    """Add signed per-bucket deltas to the rollups in one statement; returns the buckets touched."""
+    deltas = rollup_deltas(removed, added)
+    if not deltas:
+        return 0
+
+    stmt = insert(ZoneTimeRollup).values([
+        {"athlete_id": athlete_id, "period": period.value, "period_start": start, "kind": kind, "secs": delta.tolist()}
+        for (athlete_id, period, start, kind), delta in deltas.items()
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[ZoneTimeRollup.athlete_id, ZoneTimeRollup.period, ZoneTimeRollup.period_start, ZoneTimeRollup.kind],
+        set_={"secs": _ADD_SECS},
+    ))
+    return len(deltas)
+
+
+async def _upsert_zone_times(db: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    stmt = insert(ActivityZoneTimes).values(rows)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[ActivityZoneTimes.activity_id, ActivityZoneTimes.kind],
+        set_={"athlete_id": stmt.excluded.athlete_id, "day": stmt.excluded.day, "secs": stmt.excluded.secs},
+    ))
+
+
+def _added(rows: list[dict[str, Any]]) -> list[tuple[Any, date, str, np.ndarray]]:
+    return [(row["athlete_id"], row["day"], row["kind"], np.asarray(row["secs"])) for row in rows]
+
+
+async def save_activity_zone_times(db: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    """
+    Store per-activity zone times and move the rollups by the difference to
+    what was stored before. The caller commits.
+    """
+    if not rows:
+        return
+
+    unique_rows = list({(row["activity_id"], row["kind"]): row for row in rows}.values())
+    previous = (await db.execute(
+        select(ActivityZoneTimes).where(
+            ActivityZoneTimes.activity_id.in_({row["activity_id"] for row in unique_rows})
+        )
+    )).scalars().all()
+
+    await _upsert_zone_times(db, unique_rows)
+
+    replaced = {(row["activity_id"], row["kind"]) for row in unique_rows}
+    removed = _entries(row for row in previous if (row.activity_id, row.kind) in replaced)
+    await _apply_rollup_deltas(db, removed, _added(unique_rows))
+
+
+async def replace_activity_zone_times(
+    db: AsyncSession, activity_ids: Iterable[uuid.UUID], rows: list[dict[str, Any]]
+) -> None:
+    """
+    Make the stored zone times of activity_ids exactly rows, e.g. what their
+    payloads carry now. Rows that differ from the stored ones are written,
+    kinds no longer present are deleted and the rollups move by the
+    difference; activities whose zone times did not change cost only the
+    read. The caller commits.
+    """
+    activity_ids = set(activity_ids)
+    if not activity_ids:
+        return
+
+    wanted = {(row["activity_id"], row["kind"]): row for row in rows if row["activity_id"] in activity_ids}
+    stored = {
+        (row.activity_id, row.kind): row
+        for row in (await db.execute(
+            select(ActivityZoneTimes).where(ActivityZoneTimes.activity_id.in_(activity_ids))
+        )).scalars().all()
+    }
+
+    changed = [
+        row for key, row in wanted.items()
+        if key not in stored
+        or (stored[key].athlete_id, stored[key].day, list(stored[key].secs)) != (row["athlete_id"], row["day"], list(row["secs"]))
+    ]
+    stale = [key for key in stored if key not in wanted]
+
+    if changed:
+        await _upsert_zone_times(db, changed)
+    if stale:
+        await db.execute(delete(ActivityZoneTimes).where(
+            tuple_(ActivityZoneTimes.activity_id, ActivityZoneTimes.kind).in_(stale)
+        ))
+
+    replaced = [key for key in ((row["activity_id"], row["kind"]) for row in changed) if key in stored]
+    removed = _entries(stored[key] for key in replaced + stale)
+    await _apply_rollup_deltas(db, removed, _added(changed))
+
+
+async def delete_activity_zone_times(db: AsyncSession, activity_ids: list[uuid.UUID]) -> None:
+    """Remove activities' zone times and subtract them from the rollups. The caller commits."""
+    if not activity_ids:
+        return
+
+    removed = (await db.execute(
+        delete(ActivityZoneTimes)
+        .where(ActivityZoneTimes.activity_id.in_(activity_ids))
+        .returning(ActivityZoneTimes.athlete_id, ActivityZoneTimes.day, ActivityZoneTimes.kind, ActivityZoneTimes.secs)
+    )).all()
+    await _apply_rollup_deltas(db, _entries(removed), [])
+
+
+async def move_activity_zone_times(db: AsyncSession, activity_id: uuid.UUID, day: date) -> None:
+    """Re-bucket an activity's zone times after its local start date changed. The caller commits."""
+    previous = (await db.execute(
+        select(ActivityZoneTimes).where(ActivityZoneTimes.activity_id == activity_id)
+    )).scalars().all()
+
+    moved = [
+        {"activity_id": row.activity_id, "kind": row.kind, "athlete_id": row.athlete_id, "day": day, "secs": row.secs}
+        for row in previous if row.day != day
+    ]
+    await save_activity_zone_times(db, moved)
+
+
+async def get_zone_time_rollups(
+    db: AsyncSession,
+    athlete_id: uuid.UUID,
+    period: RollupPeriod,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    kind: Optional[ZoneKind] = None,
+) -> list[ZoneTimeRollup]:
+    """Precomputed rollup rows for an athlete, oldest bucket first."""
+    stmt = select(ZoneTimeRollup).where(
+        ZoneTimeRollup.athlete_id == athlete_id,
+        ZoneTimeRollup.period == period.value,
+    )
+    if start_date is not None:
+        stmt = stmt.where(ZoneTimeRollup.period_start >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(ZoneTimeRollup.period_start <= end_date)
+    if kind is not None:
+        stmt = stmt.where(ZoneTimeRollup.kind == kind.value)
+
+    result = await db.execute(stmt.order_by(ZoneTimeRollup.period_start, ZoneTimeRollup.kind))
+    return result.scalars().all()
+
+
+def total_zone_times(rollups: Iterable[ZoneTimeRollup]) -> dict[str, list[int]]:
+    """Sum rollup rows per zone kind."""
+    totals: dict[str, np.ndarray] = {}
+    for rollup in rollups:
+        totals[rollup.kind] = totals.get(rollup.kind, np.zeros(ZONE_SLOTS, dtype=np.int64)) + np.asarray(rollup.secs)
+    return {kind: secs.tolist() for kind, secs in totals.items()}
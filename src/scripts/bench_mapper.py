@@ -0,0 +1,141 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from app.models.completed_activity import CompletedActivity, ActivitySource
+from app.integrations.intervals_icu.mappers import map_icu_activity_to_completed, map_icu_activities_to_rows
+
+# python3 src/scripts/bench_mapper.py [activities]
+
+
+def legacy_map(icu_data: dict[str, Any], athlete_id) -> CompletedActivity:
+    """The original safe_get based mapper, kept here as the baseline."""
+
+    def safe_get(key: str, default: Optional[Any] = None) -> Any:
+        return icu_data.get(key, default)
+
+    def parse_datetime(dt_str: Optional[str]) -> Optional[datetime]:
+        if not dt_str:
+            return None
+        try:
+            return datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
+        except Exception:
+            return None
+
+    return CompletedActivity(
+        source=ActivitySource.INTERVALS,
+        external_id=str(safe_get("id")),
+        intervals_id=str(safe_get("id")),
+        athlete_id=athlete_id,
+        name=safe_get("name"),
+        description=safe_get("description"),
+        sport_type=safe_get("type"),
+        sub_type=safe_get("sub_type"),
+        start_date=parse_datetime(safe_get("start_date")),
+        start_date_local=parse_datetime(safe_get("start_date_local")),
+        timezone=safe_get("timezone"),
+        trainer=safe_get("trainer"),
+        commute=safe_get("commute"),
+        race=safe_get("race"),
+        distance_m=safe_get("distance"),
+        elapsed_time_s=safe_get("elapsed_time"),
+        moving_time_s=safe_get("moving_time"),
+        elevation_gain_m=safe_get("total_elevation_gain"),
+        elevation_loss_m=safe_get("total_elevation_loss"),
+        average_speed_mps=safe_get("average_speed"),
+        max_speed_mps=safe_get("max_speed"),
+        average_cadence=safe_get("average_cadence"),
+        average_temp_c=safe_get("average_temp"),
+        average_hr_bpm=safe_get("average_heartrate"),
+        max_hr_bpm=safe_get("max_heartrate"),
+        average_power_w=safe_get("icu_average_watts"),
+        weighted_power_w=safe_get("icu_weighted_avg_watts"),
+        max_power_w=safe_get("p_max"),
+        calories_kcal=safe_get("calories"),
+        carbs_used_g=safe_get("carbs_used"),
+        icu_training_load=safe_get("icu_training_load"),
+        icu_trimp=safe_get("trimp"),
+        icu_intensity=safe_get("icu_intensity"),
+        icu_efficiency_factor=safe_get("icu_efficiency_factor"),
+        icu_variability_index=safe_get("icu_variability_index"),
+        icu_joules=safe_get("icu_joules"),
+        icu_rpe=safe_get("icu_rpe"),
+        icu_feel=safe_get("feel"),
+        device_name=safe_get("device_name"),
+        gear_id=safe_get("gear", {}).get("id") if safe_get("gear") else None,
+        gear_name=safe_get("gear", {}).get("name") if safe_get("gear") else None,
+        gear_distance_m=safe_get("gear", {}).get("distance") if safe_get("gear") else None,
+        icu_sync_date=parse_datetime(safe_get("icu_sync_date")),
+        analyzed=bool(safe_get("analyzed")),
+        intervals_url=f"https://intervals.icu/activities/{safe_get('id')}",
+    )
+
+
+def make_payloads(count: int) -> list[dict[str, Any]]:
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    payloads = []
+    for n in range(count):
+        day = start + timedelta(hours=n * 7)
+        payloads.append({
+            "id": f"i{n}",
+            "name": f"Ride {n}",
+            "type": "Ride",
+            "start_date": day.isoformat().replace("+00:00", "Z"),
+            "start_date_local": day.replace(tzinfo=None).isoformat(),
+            "timezone": "Europe/Oslo",
+            "trainer": n % 3 == 0,
+            "commute": False,
+            "race": False,
+            "distance": 30000.0 + n,
+            "elapsed_time": 3700,
+            "moving_time": 3600,
+            "total_elevation_gain": 420.0,
+            "average_speed": 8.3,
+            "max_speed": 16.1,
+            "average_cadence": 88.0,
+            "average_heartrate": 141,
+            "max_heartrate": 172,
+            "icu_average_watts": 212,
+            "icu_weighted_avg_watts": 231,
+            "p_max": 804,
+            "calories": 812,
+            "icu_training_load": 74,
+            "trimp": 101.2,
+            "icu_intensity": 78.4,
+            "icu_joules": 763200,
+            "feel": 3,
+            "device_name": "Garmin Edge 540",
+            "gear": {"id": "b123", "name": "Road bike", "distance": 1.2e6},
+            "icu_sync_date": day.isoformat().replace("+00:00", "Z"),
+            "analyzed": day.isoformat().replace("+00:00", "Z"),
+            # Unmapped payload noise, as in real IcuActivity responses
+            "icu_zone_times": [{"id": f"Z{z}", "secs": 300 * z} for z in range(1, 8)],
+            "icu_hr_zone_times": [600, 900, 1200, 600, 300, 0, 0],
+            "stream_types": ["time", "watts", "heartrate", "cadence", "velocity_smooth"],
+        })
+    return payloads
+
+
+def bench(label: str, fn, payloads, repeat: int = 7) -> None:
+    best = min(_timed(fn, payloads) for _ in range(repeat))
+    print(f"{label:<34} {len(payloads) / best:>12,.0f} activities/s")
+
+
+def _timed(fn, payloads) -> float:
+    started = time.perf_counter()
+    fn(payloads)
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    athlete_id = uuid.uuid4()
+    payloads = make_payloads(count)
+
+    bench("before: safe_get + ORM per row", lambda ps: [legacy_map(p, athlete_id) for p in ps], payloads)
+    bench("after: compiled mapper + ORM per row", lambda ps: [map_icu_activity_to_completed(p, athlete_id) for p in ps], payloads)
+    bench("after: compiled batch to rows", lambda ps: map_icu_activities_to_rows(ps, athlete_id), payloads)
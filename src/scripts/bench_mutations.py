@@ -0,0 +1,185 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import delete, event, exists, select
+from app.db.base import async_session, engine
+from app.enums import ActivitySource, ActivityType
+from app.models.athlete import Athlete
+from app.models.completed_activity import CompletedActivity
+from app.models.planned_activity import PlannedActivity
+from app.schemas.athlete import AthleteCreate, AthleteUpdate
+from app.schemas.completed_activity import CompletedActivityCreate, CompletedActivityUpdate
+from app.schemas.planned_activity import PlannedActivityCreate, PlannedActivityUpdate
+from app.services import athlete_service, completed_activity_service, daily_summary_service, planned_activity_service
+
+# Needs the database from the settings, with tables created:
+# python3 src/scripts/bench_mutations.py [repeat]
+
+
+class RoundTrips:
+    """Counts statements and commits sent by the engine."""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._statement)
+        event.listen(engine.sync_engine, "commit", self._commit)
+
+    def _statement(self, *args):
+        self.count += 1
+
+    def _commit(self, *args):
+        self.count += 1
+
+
+# The read-then-write service code the RETURNING versions replaced, kept as the baseline
+
+async def legacy_create_athlete(db, athlete_in):
+    athlete = Athlete(**athlete_in.model_dump())
+    db.add(athlete)
+    await db.commit()
+    await db.refresh(athlete)
+    return athlete
+
+
+async def legacy_update_athlete(db, athlete_id, athlete_in):
+    athlete = await athlete_service.get_athlete_by_id(db, athlete_id)
+    for field, value in athlete_in.model_dump(exclude_unset=True).items():
+        setattr(athlete, field, value)
+    await db.commit()
+    await db.refresh(athlete)
+    return athlete
+
+
+async def legacy_delete_athlete(db, athlete_id):
+    if not (await db.execute(select(exists().where(Athlete.id == athlete_id)))).scalar():
+        return False
+    await db.execute(delete(Athlete).where(Athlete.id == athlete_id))
+    await db.commit()
+    return True
+
+
+async def legacy_create_plan(db, plan_in):
+    plan = PlannedActivity(**plan_in.model_dump())
+    db.add(plan)
+    await db.commit()
+    await db.refresh(plan)
+    return plan
+
+
+async def legacy_update_plan(db, plan_id, plan_in):
+    plan = await planned_activity_service.get_planned_activity_by_id(db, plan_id)
+    for field, value in plan_in.model_dump(exclude_unset=True).items():
+        setattr(plan, field, value)
+    await db.commit()
+    await db.refresh(plan)
+    return plan
+
+
+async def legacy_delete_plan(db, plan_id):
+    plan = await planned_activity_service.get_planned_activity_by_id(db, plan_id)
+    await db.delete(plan)
+    await db.commit()
+
+
+async def legacy_create_activity(db, activity_in):
+    activity = CompletedActivity(**activity_in.model_dump())
+    db.add(activity)
+    await db.flush()
+    await daily_summary_service.refresh_daily_summaries(
+        db, [(activity.athlete_id, daily_summary_service.summary_day(activity.start_date_local))]
+    )
+    await db.commit()
+    await db.refresh(activity)
+    return activity
+
+
+async def legacy_update_activity(db, activity_id, activity_in):
+    activity = await completed_activity_service.get_completed_activity_by_id(db, activity_id)
+    for field, value in activity_in.model_dump(exclude_unset=True).items():
+        setattr(activity, field, value)
+    await db.commit()
+    await db.refresh(activity)
+    return activity
+
+
+async def legacy_delete_activity(db, activity_id):
+    activity = await completed_activity_service.get_completed_activity_by_id(db, activity_id)
+    await db.delete(activity)
+    await db.flush()
+    await daily_summary_service.refresh_daily_summaries(
+        db, [(activity.athlete_id, daily_summary_service.summary_day(activity.start_date_local))]
+    )
+    await db.commit()
+
+
+async def run(trips: RoundTrips, label: str, call, repeat: int) -> None:
+    """Best wall time and round trips of one call, each run in a fresh session like a request."""
+    best, statements = float("inf"), 0
+    for n in range(repeat):
+        async with async_session() as db:
+            before = trips.count
+            started = time.perf_counter()
+            await call(db, n)
+            best = min(best, time.perf_counter() - started)
+            statements = trips.count - before
+    print(f"{label:<36} {statements:>4} round trips {best * 1000:>9.2f} ms")
+
+
+async def main(repeat: int) -> None:
+    trips = RoundTrips()
+    when = datetime(2026, 1, 6, 7, tzinfo=timezone.utc)
+
+    for name, athlete_create, athlete_update, athlete_delete, plan_create, plan_update, plan_delete, \
+            activity_create, activity_update, activity_delete in (
+        ("before", legacy_create_athlete, legacy_update_athlete, legacy_delete_athlete,
+         legacy_create_plan, legacy_update_plan, legacy_delete_plan,
+         legacy_create_activity, legacy_update_activity, legacy_delete_activity),
+        ("after", athlete_service.create_new_athlete, athlete_service.update_existing_athlete,
+         athlete_service.delete_athlete_by_id,
+         planned_activity_service.create_planned_activity, planned_activity_service.update_planned_activity,
+         planned_activity_service.delete_planned_activity,
+         completed_activity_service.create_completed_activity, completed_activity_service.update_completed_activity,
+         completed_activity_service.delete_completed_activity),
+    ):
+        athletes = [uuid.uuid4() for _ in range(repeat)]
+        plans, activities = [], []
+
+        async def create_athlete(db, n):
+            await athlete_create(db, AthleteCreate(id=athletes[n], email=f"bench-{athletes[n]}@example.com"))
+
+        async def create_plan(db, n):
+            plan = await plan_create(db, PlannedActivityCreate(
+                athlete_id=athletes[n], name="Easy run", type=ActivityType.run, scheduled_date=when
+            ))
+            plans.append(plan.id)
+
+        async def create_activity(db, n):
+            activity = await activity_create(db, CompletedActivityCreate(
+                athlete_id=athletes[n], source=ActivitySource.INTERVALS, sport_type="Run", start_date_local=when
+            ))
+            activities.append(activity.id)
+
+        await run(trips, f"{name}: POST /athletes", create_athlete, repeat)
+        await run(trips, f"{name}: POST /plannedActivities", create_plan, repeat)
+        await run(trips, f"{name}: POST /completedActivities", create_activity, repeat)
+        await run(trips, f"{name}: PUT /athletes/{{id}}",
+                  lambda db, n: athlete_update(db, athletes[n], AthleteUpdate(ftp=250 + n)), repeat)
+        await run(trips, f"{name}: PUT /plannedActivities/{{id}}",
+                  lambda db, n: plan_update(db, plans[n], PlannedActivityUpdate(name=f"Run {n}")), repeat)
+        await run(trips, f"{name}: PUT /completedActivities/{{id}}",
+                  lambda db, n: activity_update(db, activities[n], CompletedActivityUpdate(name=f"Run {n}")), repeat)
+        await run(trips, f"{name}: DELETE /plannedActivities/{{id}}", lambda db, n: plan_delete(db, plans[n]), repeat)
+        await run(trips, f"{name}: DELETE /completedActivities/{{id}}",
+                  lambda db, n: activity_delete(db, activities[n]), repeat)
+        await run(trips, f"{name}: DELETE /athletes/{{id}}", lambda db, n: athlete_delete(db, athletes[n]), repeat)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from starlette.responses import JSONResponse
+from app.api.responses import ModelJSONResponse
+from app.schemas.activities import ActivitiesEntry, ActivitiesResponse, ActivitiesSummary
+
+# python3 src/scripts/bench_responses.py [entries ...]
+
+
+def make_events(count: int) -> list[ActivitiesEntry]:
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    return [
+        ActivitiesEntry(
+            id=uuid.uuid4(),
+            date=start + timedelta(hours=n * 7),
+            title=f"Ride {n}",
+            type="Ride",
+            status="completed" if n % 4 else "planned",
+            data=ActivitiesSummary(distance_m=30000.0 + n, duration_s=3600, training_load=74.5),
+        )
+        for n in range(count)
+    ]
+
+
+async def default_path(events: list[ActivitiesEntry]) -> bytes:
+    """What a route returning the model costs under JSONResponse: validate, encode, json.dumps."""
+    field = create_model_field(name="Response_bench", type_=ActivitiesResponse, mode="serialization")
+    content = await serialize_response(field=field, response_content=ActivitiesResponse(events=events))
+    return JSONResponse(content).body
+
+
+async def fast_path(events: list[ActivitiesEntry]) -> bytes:
+    return ModelJSONResponse(ActivitiesResponse.model_construct(events=events)).body
+
+
+def bench(label: str, fn, events, repeat: int = 3) -> float:
+    best = min(asyncio.run(_timed(fn, events)) for _ in range(repeat))
+    print(f"{label:<44} {best * 1000:>10.1f} ms")
+    return best
+
+
+async def _timed(fn, events) -> float:
+    started = time.perf_counter()
+    await fn(events)
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    for count in counts:
+        events = make_events(count)
+        before = bench(f"{count:>7,} entries before: validate + JSONResponse", default_path, events)
+        after = bench(f"{count:>7,} entries after: ModelJSONResponse", fast_path, events)
+        print(f"{'':<44} {before / after:>10.1f}x")
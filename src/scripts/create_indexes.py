@@ -0,0 +1,10 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import asyncio
+from app.db.manage import create_missing_indexes
+
+# python3 src/scripts/create_indexes.py
+
+asyncio.run(create_missing_indexes())
@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import argparse
+import asyncio
+import uuid
+from app.db.base import async_session
+from app.services.daily_summary_service import rebuild_daily_summaries
+
+# python3 src/scripts/rebuild_daily_summaries.py [--athlete-id UUID]
+
+parser = argparse.ArgumentParser(description="Recompute daily_training_summaries from completed_activities")
+parser.add_argument("--athlete-id", type=uuid.UUID, default=None)
+args = parser.parse_args()
+
+
+async def main():
+    async with async_session() as db:
+        await rebuild_daily_summaries(db, args.athlete_id)
+        await db.commit()
+
+asyncio.run(main())
+print("Daily summaries rebuilt")
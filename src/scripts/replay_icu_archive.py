@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import argparse
+import asyncio
+import uuid
+from app.integrations.intervals_icu.replay import replay_icu_archive, REPLAY_BATCH_SIZE
+
+# python3 src/scripts/replay_icu_archive.py [--athlete-id UUID] [--batch-size N] [--workers N]
+
+parser = argparse.ArgumentParser(description="Re-map archived Intervals.icu payloads into completed_activities")
+parser.add_argument("--athlete-id", type=uuid.UUID, default=None)
+parser.add_argument("--batch-size", type=int, default=REPLAY_BATCH_SIZE)
+parser.add_argument("--workers", type=int, default=None)
+args = parser.parse_args()
+
+result = asyncio.run(
+    replay_icu_archive(athlete_id=args.athlete_id, batch_size=args.batch_size, workers=args.workers)
+)
+print(f"Replayed {result.total} activities: {result.inserted} inserted, {result.updated} updated, {result.unchanged} unchanged")
@@ -0,0 +1,11 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import asyncio
+from app.db.manage import update_foreign_key_actions
+
+# Run once on databases created before the ON DELETE rules were declared:
+# python3 src/scripts/update_foreign_keys.py
+
+asyncio.run(update_foreign_key_actions())
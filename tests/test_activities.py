@@ -1,12 +1,14 @@
 import pytest
 import sys
 from pathlib import Path
+import json
 import uuid
 from datetime import datetime, timezone, timedelta
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from httpx import AsyncClient, ASGITransport
 from contextlib import asynccontextmanager
 from urllib.parse import quote
+from sqlalchemy.dialects import postgresql
 
 # Ensure src is on path
 ROOT = Path(__file__).resolve().parents[1]
@@ -15,20 +17,43 @@ sys.path.insert(0, str(SRC))
 
 from app.main import app
 from app.db.session import get_db
-from app.models.athlete import Athlete
-from app.models.completed_activity import CompletedActivity
-from app.models.planned_activity import PlannedActivity
-from app.enums import ActivityType, ActivityGoal, ActivitySource
+from app.enums import ActivityType
+from app.services import activities_service
+from app.services.calendar_cache import calendar_cache
+from app.api.responses import ModelJSONResponse
+from app.schemas.activities import ActivitiesEntry, ActivitiesResponse, ActivitiesSummary
 
 athlete_id = uuid.uuid4()
 today = datetime(2026, 1, 6, 12, 0, 0, tzinfo=timezone.utc)
 tomorrow = datetime(2026, 1, 7, 12, 0, 0, tzinfo=timezone.utc)
 yesterday = datetime(2026, 1, 5, 12, 0, 0, tzinfo=timezone.utc)
-        
+
+
+@pytest.fixture(autouse=True)
+def empty_calendar_cache():
+    """Calendar results are cached across requests; start every test cold."""
+    calendar_cache.clear()
+    yield
+    calendar_cache.clear()
+
+
+class StreamedRows:
+    """Async iterable standing in for the AsyncResult returned by session.stream()."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def __aiter__(self):
+        for row in self.rows:
+            yield row
+
+
 @asynccontextmanager
-async def mock_app():
-    """Async context manager that provides a test client with mocked DB."""
-    mock_db = AsyncMock()
+async def mock_app(rows=(), mock_db=None):
+    """Async context manager that provides a test client with mocked DB returning the given calendar rows."""
+    mock_db = mock_db or AsyncMock()
+    mock_db.execute.return_value = MagicMock(all=MagicMock(return_value=list(rows)))
+    mock_db.stream.return_value = StreamedRows(list(rows))
 
     async def override_get_db():
         yield mock_db
@@ -41,125 +66,115 @@ async def mock_app():
         app.dependency_overrides.clear()
 
 
-def mock_obj(**kwargs):
-    """Create a MagicMock with given attributes."""
-    obj = MagicMock()
-    for k, v in kwargs.items():
-        setattr(obj, k, v)
-    return obj
+def calendar_row(**kwargs):
+    """Create a calendar row as returned by the UNION ALL query."""
+    row = MagicMock()
+    fields = {
+        "id": uuid.uuid4(),
+        "title": None,
+        "type": None,
+        "distance_m": None,
+        "duration_s": None,
+        "training_load": None,
+    }
+    fields.update(kwargs)
+    for k, v in fields.items():
+        setattr(row, k, v)
+    return row
+
+
+def compiled_calendar(start_date=yesterday, end_date=tomorrow):
+    stmt = activities_service.calendar_statement(athlete_id, start_date, end_date)
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+def test_calendar_statement_is_single_ordered_union():
+    """The calendar is one UNION ALL over both tables, ordered in the database."""
+    sql = str(compiled_calendar())
+
+    assert sql.count("UNION ALL") == 1
+    assert "FROM planned_activities" in sql
+    assert "FROM completed_activities" in sql
+    assert "ORDER BY" in sql.rsplit("UNION ALL", 1)[1]
+
+
+def test_calendar_statement_selects_only_entry_columns():
+    """Only the columns an ActivitiesEntry needs leave the database."""
+    sql = str(compiled_calendar())
+
+    for column in ("target_distance", "target_duration", "target_intensity", "distance_m", "moving_time_s", "icu_training_load"):
+        assert column in sql
+    for column in ("description", "average_power_w", "gear_name", "elapsed_time_s", "created_at"):
+        assert column not in sql
+
+
+def test_calendar_statement_reports_activity_type_values():
+    """Planned types come out as enum values, matching the ORM representation."""
+    params = compiled_calendar().params
+
+    assert {t.value for t in ActivityType} <= set(params.values())
 
 
 @pytest.mark.asyncio
 async def test_get_activities_for_athlete_with_activities():
     """Test retrieving a activities for an athlete with both completed and planned activities."""
-    async with mock_app() as client:
+    rows = [
+        calendar_row(
+            date=today,
+            title="Morning Ride",
+            type="Ride",
+            status="completed",
+            distance_m=30000.0,
+            duration_s=3600,
+            training_load=85.5,
+        ),
+        calendar_row(
+            date=tomorrow,
+            title="Evening Run",
+            type=ActivityType.run.value,
+            status="planned",
+            distance_m=10000.0,
+            duration_s=2700,
+        ),
+    ]
+    async with mock_app(rows) as client:
+        start_date_str = quote(yesterday.isoformat())
+        end_date_str = quote((tomorrow + timedelta(days=1)).isoformat()) # Range covers yesterday, today and tomorrow
+
+        response = await client.get(
+            f"/myactivities/activities/{athlete_id}?start_date={start_date_str}&end_date={end_date_str}"
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "events" in data
+        assert len(data["events"]) == 2
 
-        mock_planned = [
-            mock_obj(
-                id=uuid.uuid4(),
-                athlete_id=athlete_id,
-                name="Evening Run",
-                type=ActivityType.run,
-                goal=ActivityGoal.endurance,
-                zone=None,
-                target_duration=2700,
-                target_distance=10000.0,
-                target_intensity=None,
-                scheduled_date=tomorrow,
-                completed=False,
-                linked_activity_id=None,
-                created_at=datetime.now(timezone.utc),
-            )
-        ]
-        mock_completed = [
-            mock_obj(
-                id=uuid.uuid4(),
-                athlete_id=athlete_id,
-                name="Morning Ride",
-                source=ActivitySource.STRAVA,
-                external_id=None,
-                strava_id=None,
-                intervals_id=None,
-                sport_type="Ride",
-                sub_type=None,
-                start_date=today,
-                start_date_local=today,
-                timezone=None,
-                trainer=False,
-                commute=False,
-                race=False,
-                distance_m=30000.0,
-                elapsed_time_s=3600,
-                moving_time_s=3600,
-                elevation_gain_m=None,
-                elevation_loss_m=None,
-                average_speed_mps=None,
-                max_speed_mps=None,
-                average_cadence=None,
-                average_temp_c=None,
-                max_temp_c=None,
-                min_temp_c=None,
-                average_hr_bpm=None,
-                max_hr_bpm=None,
-                average_power_w=None,
-                weighted_power_w=None,
-                max_power_w=None,
-                calories_kcal=None,
-                carbs_used_g=None,
-                icu_training_load=85.5,
-                icu_trimp=None,
-                icu_intensity=None,
-                icu_efficiency_factor=None,
-                icu_variability_index=None,
-                icu_joules=None,
-                icu_rpe=None,
-                device_name=None,
-                gear_id=None,
-                gear_name=None,
-                gear_distance_m=None,
-                created_at=datetime.now(timezone.utc),
-                updated_at=None,
-                last_sync=None,
-                icu_sync_date=None,
-                strava_sync_date=None,
-                analyzed=False,
-                strava_url=None,
-                intervals_url=None,
-            )
-        ]
-
-        with (
-            patch("app.services.planned_activity_service.get_planned_activities_by_date_range") as mock_get_planned,
-            patch("app.services.completed_activity_service.get_completed_activities_by_date_range") as mock_get_completed,
-        ):
-
-            mock_get_planned.return_value = mock_planned
-            mock_get_completed.return_value = mock_completed
-
-            # Fix: Ensure timezone information is kept when converting to string AND format is compatible
-            # Use isoformat directly, Pydantic should handle the default ISO format including microseconds
-            start_date_str = quote(yesterday.isoformat())
-            end_date_str = quote((tomorrow + timedelta(days=1)).isoformat()) # Range covers yesterday, today and tomorrow
-
-            response = await client.get(
-                f"/myactivities/activities/{athlete_id}?start_date={start_date_str}&end_date={end_date_str}"
-            )
-
-            assert response.status_code == 200
-            data = response.json()
-            assert "events" in data
-            assert len(data["events"]) == 2 # Only activities within the range, sorted
-
-            # Check for correct data and order (sorted by date, completed then planned for same date)
-            assert data["events"][0]["title"] == mock_completed[0].name
-            assert datetime.fromisoformat(data["events"][0]["date"]) == mock_completed[0].start_date_local
-            assert data["events"][0]["type"] == mock_completed[0].sport_type
-            assert data["events"][0]["status"] == "completed"
-
-            assert data["events"][1]["title"] == mock_planned[0].name
-            assert datetime.fromisoformat(data["events"][1]["date"]) == mock_planned[0].scheduled_date
-            assert data["events"][1]["type"] == mock_planned[0].type
-            assert data["events"][1]["status"] == "planned"
+        assert data["events"][0]["id"] == str(rows[0].id)
+        assert data["events"][0]["title"] == "Morning Ride"
+        assert datetime.fromisoformat(data["events"][0]["date"]) == today
+        assert data["events"][0]["type"] == "Ride"
+        assert data["events"][0]["status"] == "completed"
+        assert data["events"][0]["data"] == {"distance_m": 30000.0, "duration_s": 3600, "training_load": 85.5}
+
+        assert data["events"][1]["title"] == "Evening Run"
+        assert datetime.fromisoformat(data["events"][1]["date"]) == tomorrow
+        assert data["events"][1]["type"] == "Run"
+        assert data["events"][1]["status"] == "planned"
+
+
+@pytest.mark.asyncio
+async def test_get_activities_queries_once():
+    """The whole calendar is read with a single statement, without a server-side cursor."""
+    mock_db = AsyncMock()
+    async with mock_app(mock_db=mock_db) as client:
+        response = await client.get(
+            f"/myactivities/activities/{athlete_id}?start_date={quote(yesterday.isoformat())}&end_date={quote(tomorrow.isoformat())}"
+        )
+
+        assert response.status_code == 200
+        assert mock_db.execute.await_count == 1
+        mock_db.stream.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -170,22 +185,14 @@ async def test_get_activities_for_athlete_no_activities_in_range():
         start_date = datetime(2026, 1, 1, tzinfo=timezone.utc)
         end_date = datetime(2026, 1, 7, tzinfo=timezone.utc)
 
-        with (
-            patch("app.services.planned_activity_service.get_planned_activities_by_date_range") as mock_get_planned,
-            patch("app.services.completed_activity_service.get_completed_activities_by_date_range") as mock_get_completed,
-        ):
-
-            mock_get_planned.return_value = []
-            mock_get_completed.return_value = []
-
-            response = await client.get(
-                f"/myactivities/activities/{athlete_id}?start_date={quote(start_date.isoformat())}&end_date={quote(end_date.isoformat())}"
-            )
+        response = await client.get(
+            f"/myactivities/activities/{athlete_id}?start_date={quote(start_date.isoformat())}&end_date={quote(end_date.isoformat())}"
+        )
 
-            assert response.status_code == 200
-            data = response.json()
-            assert "events" in data
-            assert len(data["events"]) == 0
+        assert response.status_code == 200
+        data = response.json()
+        assert "events" in data
+        assert len(data["events"]) == 0
 
 @pytest.mark.asyncio
 async def test_get_activities_with_invalid_date_format():
@@ -220,190 +227,109 @@ async def test_get_activities_with_end_date_before_start_date():
         start_date = datetime(2026, 1, 7, tzinfo=timezone.utc)
         end_date = datetime(2026, 1, 1, tzinfo=timezone.utc)
 
-        with (
-            patch("app.services.planned_activity_service.get_planned_activities_by_date_range") as mock_get_planned,
-            patch("app.services.completed_activity_service.get_completed_activities_by_date_range") as mock_get_completed,
-        ):
+        # FastAPI enforces the Query params, not their logical order; the query simply matches nothing
+        response = await client.get(
+            f"/myactivities/activities/{athlete_id}?start_date={quote(start_date.isoformat())}&end_date={quote(end_date.isoformat())}"
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert "events" in data
+        assert len(data["events"]) == 0
+
+@pytest.mark.asyncio
+async def test_get_activities_ordering():
+    """Test that activities events are returned in the order the database produces them."""
+    rows = [
+        calendar_row(date=datetime(2026, 1, 6, 12, 0, 0, tzinfo=timezone.utc), title="Start Activity", type="Ride", status="planned"),
+        calendar_row(date=datetime(2026, 1, 7, 12, 0, 0, tzinfo=timezone.utc), title="Middle Activity", type="Run", status="completed"),
+        calendar_row(date=datetime(2026, 1, 8, 12, 0, 0, tzinfo=timezone.utc), title="End Activity", type="Swim", status="completed"),
+    ]
+    async with mock_app(rows) as client:
+        start_date_str = quote(yesterday.isoformat())
+        end_date_str = quote((rows[-1].date + timedelta(days=1)).isoformat())
+
+        response = await client.get(
+            f"/myactivities/activities/{athlete_id}?start_date={start_date_str}&end_date={end_date_str}"
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "events" in data
+        assert [event["title"] for event in data["events"]] == ["Start Activity", "Middle Activity", "End Activity"]
+        assert [datetime.fromisoformat(event["date"]) for event in data["events"]] == [row.date for row in rows]
+
 
-            mock_get_planned.return_value = []
-            mock_get_completed.return_value = []
+def test_calendar_statement_sorts_planned_before_completed_on_the_same_date():
+    """Ties on the date are broken by source_rank, which is lower for planned activities."""
+    compiled = compiled_calendar()
+    sql = str(compiled)
+    planned_sql, completed_sql = sql.split("UNION ALL")
+
+    assert sql.rstrip().endswith("ORDER BY events.date, events.source_rank")
+    rank_param = planned_sql.rsplit("AS source_rank", 1)[0].rsplit("%(", 1)[1].split(")s", 1)[0]
+    assert compiled.params[rank_param] == activities_service._PLANNED_RANK < activities_service._COMPLETED_RANK
+    assert "planned_activities" in planned_sql and "completed_activities" in completed_sql
 
-            # The service logic might handle this gracefully and return empty list, 
-            # or the validation could be added at the API level (FastAPI will enforce Query params, not their logical order)
-            response = await client.get(
-                f"/myactivities/activities/{athlete_id}?start_date={quote(start_date.isoformat())}&end_date={quote(end_date.isoformat())}"
-            )
-            assert response.status_code == 200
-            data = response.json()
-            assert "events" in data
-            assert len(data["events"]) == 0
 
 @pytest.mark.asyncio
-async def test_get_activities_ordering():
-    """Test that activities events are returned in chronological order."""
-    async with mock_app() as client:
-        athlete_id = uuid.uuid4()
-        today_event = datetime(2026, 1, 6, 12, 0, 0, tzinfo=timezone.utc)
-        day_plus_1_event = datetime(2026, 1, 7, 12, 0, 0, tzinfo=timezone.utc)
-        day_plus_2_event = datetime(2026, 1, 8, 12, 0, 0, tzinfo=timezone.utc)
-
-        mock_planned = [
-            mock_obj(
-                id=uuid.uuid4(),
-                athlete_id=athlete_id,
-                name="Start Activity",
-                type=ActivityType.ride,
-                goal=ActivityGoal.endurance,
-                zone=None,
-                target_duration=3600,
-                target_distance=20000.0,
-                target_intensity=None,
-                scheduled_date=today_event,
-                completed=False,
-                linked_activity_id=None,
-                created_at=datetime.now(timezone.utc),
-            )
-        ]
-        mock_completed = [
-            mock_obj(
-                id=uuid.uuid4(),
-                athlete_id=athlete_id,
-                name="Middle Activity",
-                source=ActivitySource.STRAVA,
-                external_id=None,
-                strava_id=None,
-                intervals_id=None,
-                sport_type="Run",
-                sub_type=None,
-                start_date=day_plus_1_event,
-                start_date_local=day_plus_1_event,
-                timezone=None,
-                trainer=False,
-                commute=False,
-                race=False,
-                distance_m=5000.0,
-                elapsed_time_s=1800,
-                moving_time_s=1800,
-                elevation_gain_m=None,
-                elevation_loss_m=None,
-                average_speed_mps=None,
-                max_speed_mps=None,
-                average_cadence=None,
-                average_temp_c=None,
-                max_temp_c=None,
-                min_temp_c=None,
-                average_hr_bpm=None,
-                max_hr_bpm=None,
-                average_power_w=None,
-                weighted_power_w=None,
-                max_power_w=None,
-                calories_kcal=None,
-                carbs_used_g=None,
-                icu_training_load=None,
-                icu_trimp=None,
-                icu_intensity=None,
-                icu_efficiency_factor=None,
-                icu_variability_index=None,
-                icu_joules=None,
-                icu_rpe=None,
-                device_name=None,
-                gear_id=None,
-                gear_name=None,
-                gear_distance_m=None,
-                created_at=datetime.now(timezone.utc),
-                updated_at=None,
-                last_sync=None,
-                icu_sync_date=None,
-                strava_sync_date=None,
-                analyzed=False,
-                strava_url=None,
-                intervals_url=None,
-            ),
-            mock_obj(
-                id=uuid.uuid4(),
-                athlete_id=athlete_id,
-                name="End Activity",
-                source=ActivitySource.STRAVA,
-                external_id=None,
-                strava_id=None,
-                intervals_id=None,
-                sport_type="Swim",
-                sub_type=None,
-                start_date=day_plus_2_event,
-                start_date_local=day_plus_2_event,
-                timezone=None,
-                trainer=False,
-                commute=False,
-                race=False,
-                distance_m=1000.0,
-                elapsed_time_s=1200,
-                moving_time_s=1200,
-                elevation_gain_m=None,
-                elevation_loss_m=None,
-                average_speed_mps=None,
-                max_speed_mps=None,
-                average_cadence=None,
-                average_temp_c=None,
-                max_temp_c=None,
-                min_temp_c=None,
-                average_hr_bpm=None,
-                max_hr_bpm=None,
-                average_power_w=None,
-                weighted_power_w=None,
-                max_power_w=None,
-                calories_kcal=None,
-                carbs_used_g=None,
-                icu_training_load=None,
-                icu_trimp=None,
-                icu_intensity=None,
-                icu_efficiency_factor=None,
-                icu_variability_index=None,
-                icu_joules=None,
-                icu_rpe=None,
-                device_name=None,
-                gear_id=None,
-                gear_name=None,
-                gear_distance_m=None,
-                created_at=datetime.now(timezone.utc),
-                updated_at=None,
-                last_sync=None,
-                icu_sync_date=None,
-                strava_sync_date=None,
-                analyzed=False,
-                strava_url=None,
-                intervals_url=None,
-            )
-        ]
-
-        with (
-            patch("app.services.planned_activity_service.get_planned_activities_by_date_range") as mock_get_planned,
-            patch("app.services.completed_activity_service.get_completed_activities_by_date_range") as mock_get_completed,
-        ):
-
-            mock_get_planned.return_value = mock_planned
-            mock_get_completed.return_value = mock_completed
-            # Fix: Ensure timezone information is kept when converting to string
-            start_date_str = quote(yesterday.isoformat())
-            end_date_str = quote((day_plus_2_event + timedelta(days=1)).isoformat())
-
-            response = await client.get(
-                f"/myactivities/activities/{athlete_id}?start_date={start_date_str}&end_date={end_date_str}"
-            )
-
-            assert response.status_code == 200
-            data = response.json()
-            assert "events" in data
-            assert len(data["events"]) == 3
-
-            # Assert correct chronological order
-            assert data["events"][0]["title"] == mock_planned[0].name
-            assert datetime.fromisoformat(data["events"][0]["date"]) == mock_planned[0].scheduled_date
-
-            assert data["events"][1]["title"] == mock_completed[0].name
-            assert datetime.fromisoformat(data["events"][1]["date"]) == mock_completed[0].start_date_local
-
-            assert data["events"][2]["title"] == mock_completed[1].name
-            assert datetime.fromisoformat(data["events"][2]["date"]) == mock_completed[1].start_date_local
+async def test_get_activities_same_start_end_date():
+    """Test retrieving a activities where start_date is the same as end_date."""
+    single_date = datetime(2026, 1, 6, 12, 0, 0, tzinfo=timezone.utc)
+    rows = [
+        calendar_row(date=single_date, title="Planned for today", type="Run", status="planned"),
+        calendar_row(date=single_date, title="Completed today", type="Ride", status="completed"),
+    ]
+    mock_db = AsyncMock()
+    async with mock_app(rows, mock_db=mock_db) as client:
+        response = await client.get(
+            f"/myactivities/activities/{athlete_id}?start_date={quote(single_date.isoformat())}&end_date={quote(single_date.isoformat())}"
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "events" in data
+        assert len(data["events"]) == 2 # Both activities on the same day
+        assert [event["title"] for event in data["events"]] == ["Planned for today", "Completed today"]
+
+        params = mock_db.execute.await_args.args[0].compile(dialect=postgresql.dialect()).params
+        assert params["scheduled_date_2"] == params["scheduled_date_3"] == single_date
+        assert params["start_date_local_1"] == params["start_date_local_2"] == single_date
+
+@pytest.mark.asyncio
+async def test_get_activities_only_planned_activities():
+    """Test retrieving a activities with only planned activities."""
+    start_date = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    end_date = datetime(2026, 1, 7, tzinfo=timezone.utc)
+    rows = [calendar_row(date=datetime(2026, 1, 3, tzinfo=timezone.utc), title="Future Planned Run", type="Run", status="planned")]
+    async with mock_app(rows) as client:
+        response = await client.get(
+            f"/myactivities/activities/{athlete_id}?start_date={quote(start_date.isoformat())}&end_date={quote(end_date.isoformat())}"
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "events" in data
+        assert len(data["events"]) == 1
+        assert data["events"][0]["title"] == "Future Planned Run"
+        assert data["events"][0]["status"] == "planned"
+
+@pytest.mark.asyncio
+async def test_get_activities_only_completed_activities():
+    """Test retrieving a activities with only completed activities."""
+    start_date = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    end_date = datetime(2026, 1, 7, tzinfo=timezone.utc)
+    rows = [calendar_row(date=datetime(2026, 1, 4, tzinfo=timezone.utc), title="Past Completed Ride", type="Ride", status="completed")]
+    async with mock_app(rows) as client:
+        response = await client.get(
+            f"/myactivities/activities/{athlete_id}?start_date={quote(start_date.isoformat())}&end_date={quote(end_date.isoformat())}"
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "events" in data
+        assert len(data["events"]) == 1
+        assert data["events"][0]["title"] == "Past Completed Ride"
+        assert data["events"][0]["status"] == "completed"
 
 
 @pytest.mark.asyncio
@@ -435,130 +361,81 @@ async def test_get_activities_missing_end_date():
         assert "Field required" in response.json()["detail"][0]["msg"]
 
 @pytest.mark.asyncio
-async def test_get_activities_same_start_end_date():
-    """Test retrieving a activities where start_date is the same as end_date."""
-    async with mock_app() as client:
-        athlete_id = uuid.uuid4()
-        single_date = datetime(2026, 1, 6, 12, 0, 0, tzinfo=timezone.utc)
-        
-        mock_planned = [
-            mock_obj(
-                id=uuid.uuid4(),
-                athlete_id=athlete_id,
-                name="Planned for today",
-                type=ActivityType.run,
-                goal=ActivityGoal.endurance,
-                scheduled_date=single_date,
-                completed=False,
-                created_at=datetime.now(timezone.utc),
-            )
-        ]
-        mock_completed = [
-            mock_obj(
-                id=uuid.uuid4(),
-                athlete_id=athlete_id,
-                name="Completed today",
-                source=ActivitySource.STRAVA,
-                sport_type="Ride",
-                start_date=single_date,
-                start_date_local=single_date,
-                created_at=datetime.now(timezone.utc),
-            )
-        ]
-
-        with (
-            patch("app.services.planned_activity_service.get_planned_activities_by_date_range") as mock_get_planned,
-            patch("app.services.completed_activity_service.get_completed_activities_by_date_range") as mock_get_completed,
-        ):
-            mock_get_planned.return_value = mock_planned
-            mock_get_completed.return_value = mock_completed
-
-            response = await client.get(
-                f"/myactivities/activities/{athlete_id}?start_date={quote(single_date.isoformat())}&end_date={quote(single_date.isoformat())}"
-            )
-
-            assert response.status_code == 200
-            data = response.json()
-            assert "events" in data
-            assert len(data["events"]) == 2 # Both activities on the same day
-
-            # Assert correct order (planned before completed on the same day, or based on what service returns)
-            assert data["events"][0]["title"] == mock_planned[0].name
-            assert data["events"][1]["title"] == mock_completed[0].name
+async def test_get_activities_planned_marked_completed():
+    """Test that a planned activity flagged as completed keeps the completed status from the query."""
+    rows = [calendar_row(date=today, title="Done plan", type="Run", status="completed")]
+    async with mock_app(rows) as client:
+        response = await client.get(
+            f"/myactivities/activities/{athlete_id}?start_date={quote(today.isoformat())}&end_date={quote(today.isoformat())}"
+        )
+
+        assert response.status_code == 200
+        assert response.json()["events"][0]["status"] == "completed"
 
 @pytest.mark.asyncio
-async def test_get_activities_only_planned_activities():
-    """Test retrieving a activities with only planned activities."""
-    async with mock_app() as client:
-        athlete_id = uuid.uuid4()
-        start_date = datetime(2026, 1, 1, tzinfo=timezone.utc)
-        end_date = datetime(2026, 1, 7, tzinfo=timezone.utc)
+async def test_get_activities_untitled_entries():
+    """Test that rows without a name or type still serialize."""
+    rows = [calendar_row(date=today, status="completed")]
+    async with mock_app(rows) as client:
+        response = await client.get(
+            f"/myactivities/activities/{athlete_id}?start_date={quote(yesterday.isoformat())}&end_date={quote(tomorrow.isoformat())}"
+        )
+
+        assert response.status_code == 200
+        event = response.json()["events"][0]
+        assert event["title"] is None
+        assert event["type"] is None
+        assert event["data"] == {"distance_m": None, "duration_s": None, "training_load": None}
 
-        mock_planned = [
-            mock_obj(
-                id=uuid.uuid4(),
-                athlete_id=athlete_id,
-                name="Future Planned Run",
-                type=ActivityType.run,
-                scheduled_date=datetime(2026, 1, 3, tzinfo=timezone.utc),
-                completed=False,
-                created_at=datetime.now(timezone.utc),
-            )
-        ]
-
-        with (
-            patch("app.services.planned_activity_service.get_planned_activities_by_date_range") as mock_get_planned,
-            patch("app.services.completed_activity_service.get_completed_activities_by_date_range") as mock_get_completed,
-        ):
-            mock_get_planned.return_value = mock_planned
-            mock_get_completed.return_value = []
-
-            response = await client.get(
-                f"/myactivities/activities/{athlete_id}?start_date={quote(start_date.isoformat())}&end_date={quote(end_date.isoformat())}"
-            )
-
-            assert response.status_code == 200
-            data = response.json()
-            assert "events" in data
-            assert len(data["events"]) == 1
-            assert data["events"][0]["title"] == mock_planned[0].name
-            assert data["events"][0]["status"] == "planned"
 
 @pytest.mark.asyncio
-async def test_get_activities_only_completed_activities():
-    """Test retrieving a activities with only completed activities."""
-    async with mock_app() as client:
-        athlete_id = uuid.uuid4()
-        start_date = datetime(2026, 1, 1, tzinfo=timezone.utc)
-        end_date = datetime(2026, 1, 7, tzinfo=timezone.utc)
+async def test_get_activities_ndjson_stream():
+    """Clients asking for NDJSON get one calendar entry per line, in query order."""
+    rows = [
+        calendar_row(date=today, title="Morning Ride", type="Ride", status="completed"),
+        calendar_row(date=tomorrow, title="Evening Run", type="Run", status="planned"),
+    ]
+    async with mock_app(rows) as client:
+        response = await client.get(
+            f"/myactivities/activities/{athlete_id}?start_date={quote(yesterday.isoformat())}&end_date={quote(tomorrow.isoformat())}",
+            headers={"Accept": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.text.splitlines()]
+        assert [event["title"] for event in events] == ["Morning Ride", "Evening Run"]
+        assert events[1]["status"] == "planned"
 
-        mock_completed = [
-            mock_obj(
-                id=uuid.uuid4(),
-                athlete_id=athlete_id,
-                name="Past Completed Ride",
-                source=ActivitySource.STRAVA,
-                sport_type="Ride",
-                start_date=datetime(2026, 1, 4, tzinfo=timezone.utc),
-                start_date_local=datetime(2026, 1, 4, tzinfo=timezone.utc),
-                created_at=datetime.now(timezone.utc),
-            )
-        ]
-
-        with (
-            patch("app.services.planned_activity_service.get_planned_activities_by_date_range") as mock_get_planned,
-            patch("app.services.completed_activity_service.get_completed_activities_by_date_range") as mock_get_completed,
-        ):
-            mock_get_planned.return_value = []
-            mock_get_completed.return_value = mock_completed
-
-            response = await client.get(
-                f"/myactivities/activities/{athlete_id}?start_date={quote(start_date.isoformat())}&end_date={quote(end_date.isoformat())}"
-            )
-
-            assert response.status_code == 200
-            data = response.json()
-            assert "events" in data
-            assert len(data["events"]) == 1
-            assert data["events"][0]["title"] == mock_completed[0].name
-            assert data["events"][0]["status"] == "completed"
\ No newline at end of file
+
+@pytest.mark.asyncio
+async def test_get_activities_served_from_cache():
+    """A repeated window is answered without touching the database."""
+    rows = [calendar_row(date=today, title="Morning Ride", type="Ride", status="completed")]
+    url = f"/myactivities/activities/{athlete_id}?start_date={quote(yesterday.isoformat())}&end_date={quote(tomorrow.isoformat())}"
+    mock_db = AsyncMock()
+    before = calendar_cache.stats()
+    async with mock_app(rows, mock_db=mock_db) as client:
+        first = await client.get(url)
+        second = await client.get(url)
+
+        assert first.json() == second.json()
+        assert mock_db.execute.await_count == 1
+
+        stats = (await client.get("/myactivities/activities/cache/stats")).json()
+        assert stats["hits"] - before["hits"] == 1
+        assert stats["misses"] - before["misses"] == 1
+        assert stats["entries"] == 1
+
+
+def test_model_json_response_renders_models_and_plain_content_alike():
+    """Models and the dicts FastAPI builds from them serialize to the same JSON."""
+    entry = ActivitiesEntry(id=athlete_id, date=today, status="planned", data=ActivitiesSummary(distance_m=float("nan")))
+    model = ActivitiesResponse(events=[entry])
+
+    body = ModelJSONResponse(model).body
+    assert body == ModelJSONResponse(model.model_dump(mode="json")).body
+    event = json.loads(body)["events"][0]
+    assert event["id"] == str(athlete_id)
+    assert datetime.fromisoformat(event["date"]) == today
+    assert event["data"]["distance_m"] is None
@@ -0,0 +1,425 @@
+import pytest
+import sys
+from pathlib import Path
+import uuid
+import numpy as np
+from unittest.mock import AsyncMock, MagicMock, patch
+from httpx import AsyncClient, ASGITransport
+from contextlib import asynccontextmanager
+from sqlalchemy.dialects import postgresql
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from app.main import app
+from app.db.session import get_db
+from datetime import date, datetime, timezone
+from app.analytics.curves import CURVE_DURATIONS, mean_max, merge_curves, new_bests
+from app.analytics.fitness import ATL_DAYS, BLOCK_DAYS, CTL_DAYS, ewma, fitness_series
+from app.analytics.zones import ZONE_SLOTS, extract_zone_times, rollup_deltas
+from app.enums import RollupPeriod
+from app.models.daily_summary import DailyTrainingSummary
+from app.models.fitness import AthleteFitnessState
+from app.models.zone_times import ZoneTimeRollup
+from app.services import curve_service, daily_summary_service, fitness_service, zone_time_service
+
+
+@asynccontextmanager
+async def mock_app():
+    """Async context manager that provides a test client with mocked DB."""
+    mock_db = AsyncMock()
+
+    async def override_get_db():
+        yield mock_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+def brute_force_mean_max(samples: np.ndarray, secs: int) -> float:
+    return max(samples[i:i + secs].mean() for i in range(len(samples) - secs + 1))
+
+
+def test_mean_max_matches_brute_force():
+    """Test the cumulative-sum curve against a direct sliding-window search."""
+    rng = np.random.default_rng(7)
+    samples = rng.uniform(100, 400, 700).astype(np.float32)
+    curve = mean_max(samples)
+
+    for index, secs in enumerate(CURVE_DURATIONS):
+        if secs > len(samples):
+            assert np.isnan(curve[index])
+        else:
+            assert curve[index] == pytest.approx(brute_force_mean_max(samples.astype(np.float64), secs), rel=1e-5)
+
+
+def test_mean_max_treats_gaps_as_zero():
+    """Test that dropouts do not inflate the curve."""
+    curve = mean_max(np.array([300, np.nan, 300], dtype=np.float32))
+
+    assert curve[0] == 300
+    assert curve[1] == 150
+    assert curve[2] == 200
+
+
+def test_merge_curves_takes_element_wise_best():
+    """Test merging cached curves and tracking which curve holds each best."""
+    a = np.array([500, 400, np.nan], dtype=np.float32)
+    b = np.array([450, 420, 380], dtype=np.float32)
+
+    merged, best_index = merge_curves([a, b])
+
+    assert merged[:3].tolist() == [500, 420, 380]
+    assert best_index[:3].tolist() == [0, 1, 1]
+
+
+def test_merge_curves_empty():
+    """Test merging when no activity has a cached curve."""
+    merged, best_index = merge_curves([])
+
+    assert np.isnan(merged).all()
+    assert (best_index == -1).all()
+
+
+def test_new_bests():
+    """Test detecting durations that beat the previous best."""
+    previous = np.array([500, 400, np.nan], dtype=np.float32)
+    curve = np.array([480, 410, 300], dtype=np.float32)
+
+    assert new_bests(curve, previous).tolist() == [False, True, True]
+    assert new_bests(curve, None).tolist() == [True, True, True]
+
+
+@pytest.mark.asyncio
+async def test_compute_activity_curves_caches_and_fills_max_power():
+    """Test that curves are cached and feed max_power_w."""
+    db = AsyncMock()
+    streams = {
+        "watts": (4, np.array([200, 800, 300, 250], dtype=np.float32)),
+        "velocity_smooth": None,
+    }
+
+    async def get_stream_slice(db, activity_id, channel, start=0, end=None):
+        return streams[channel]
+
+    with patch("app.services.activity_stream_service.get_stream_slice", get_stream_slice):
+        curves = await curve_service.compute_activity_curves(db, uuid.uuid4())
+
+    assert list(curves) == ["power"]
+    assert curves["power"][0] == 800
+    statements = [str(call.args[0].compile(dialect=postgresql.dialect())) for call in db.execute.await_args_list]
+    assert "ON CONFLICT (activity_id, kind) DO UPDATE" in statements[0]
+    assert "max_power_w=coalesce(completed_activities.max_power_w" in statements[1]
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_athlete_curve_endpoint():
+    """Test the merged curve endpoint."""
+    async with mock_app() as client:
+        athlete_id, activity_id = uuid.uuid4(), uuid.uuid4()
+        curve = np.full(len(CURVE_DURATIONS), np.nan, dtype=np.float32)
+        curve[:2] = [900, 850]
+        with patch("app.services.curve_service.get_athlete_curve") as mock_curve:
+            mock_curve.return_value = (curve, [activity_id, activity_id] + [None] * (len(CURVE_DURATIONS) - 2))
+
+            r = await client.get(f"/myactivities/analytics/{athlete_id}/curves/power")
+            assert r.status_code == 200
+            points = r.json()["points"]
+            assert points[0] == {"secs": 1, "value": 900.0, "activity_id": str(activity_id)}
+            assert points[2]["value"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_activity_achievements_not_found():
+    """Test 404 for achievements of an unknown activity."""
+    async with mock_app() as client:
+        with patch("app.services.curve_service.get_activity_achievements") as mock_get:
+            mock_get.return_value = None
+
+            r = await client.get(f"/myactivities/analytics/activities/{uuid.uuid4()}/achievements")
+            assert r.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_activity_achievements():
+    """Test listing BEST_POWER achievements."""
+    async with mock_app() as client:
+        with patch("app.services.curve_service.get_activity_achievements") as mock_get:
+            mock_get.return_value = [curve_service._achievement("power", 300, 351.4)]
+
+            r = await client.get(f"/myactivities/analytics/activities/{uuid.uuid4()}/achievements")
+            assert r.status_code == 200
+            assert r.json()[0]["type"] == "BEST_POWER"
+            assert r.json()[0]["watts"] == 351
+
+
+def test_extract_zone_times_is_fixed_width():
+    """Test that every kind of zone time becomes a ZONE_SLOTS vector."""
+    zone_times = extract_zone_times({
+        "icu_zone_times": [{"id": "Z2", "secs": 600}, {"id": "SS", "secs": 300}, {"id": "Z9", "secs": 5}],
+        "icu_hr_zone_times": [100, 200, 300],
+        "pace_zone_times": None,
+    })
+
+    assert sorted(zone_times) == ["hr", "power"]
+    assert zone_times["power"].tolist() == [0, 600, 0, 0, 0, 0, 0, 300, 0, 0]
+    assert len(zone_times["hr"]) == ZONE_SLOTS
+
+
+def test_extract_zone_times_skips_malformed_fields(caplog):
+    """Test that a malformed zone field is logged and dropped while the others are kept."""
+    with caplog.at_level("WARNING", logger="app.analytics.zones"):
+        zone_times = extract_zone_times({
+            "id": "i42",
+            "icu_zone_times": [{"id": "Z1", "secs": 60}, None],
+            "icu_hr_zone_times": [100, "200"],
+            "pace_zone_times": {"Z1": 60},
+            "gap_zone_times": [30, 60.0],
+        })
+
+    assert sorted(zone_times) == ["gap"]
+    assert zone_times["gap"].tolist()[:3] == [30, 60, 0]
+    assert len(caplog.records) == 3
+    assert all("i42" in record.getMessage() for record in caplog.records)
+
+
+def test_extract_zone_times_rejects_non_numeric_power_secs():
+    """Test that a power zone with non-numeric secs drops the power vector only."""
+    zone_times = extract_zone_times({
+        "icu_zone_times": [{"id": "Z2", "secs": "600"}],
+        "icu_hr_zone_times": [100, 200],
+    })
+
+    assert sorted(zone_times) == ["hr"]
+
+
+def test_rollup_deltas_move_between_buckets():
+    """Test that moving an activity to another week only touches the affected buckets."""
+    athlete = uuid.uuid4()
+    secs = np.array([60, 120] + [0] * 8)
+
+    deltas = rollup_deltas(
+        [(athlete, date(2025, 3, 2), "hr", secs)],
+        [(athlete, date(2025, 3, 3), "hr", secs)],
+    )
+
+    # Sunday -> Monday: day and week buckets change, the month nets out
+    assert deltas[(athlete, RollupPeriod.day, date(2025, 3, 2), "hr")][:2].tolist() == [-60, -120]
+    assert deltas[(athlete, RollupPeriod.week, date(2025, 3, 3), "hr")][:2].tolist() == [60, 120]
+    assert (athlete, RollupPeriod.month, date(2025, 3, 1), "hr") not in deltas
+    assert len(deltas) == 4
+
+
+@pytest.mark.asyncio
+async def test_delete_activity_zone_times_subtracts_from_rollups():
+    """Test that deleting zone times issues one signed-delta rollup upsert."""
+    db = AsyncMock()
+    db.execute.return_value.all = MagicMock(return_value=[
+        MagicMock(athlete_id=uuid.uuid4(), day=date(2025, 3, 5), kind="power", secs=[10] * ZONE_SLOTS),
+    ])
+
+    await zone_time_service.delete_activity_zone_times(db, [uuid.uuid4()])
+
+    statements = [call.args[0].compile(dialect=postgresql.dialect()) for call in db.execute.await_args_list]
+    assert "RETURNING activity_zone_times.athlete_id" in str(statements[0])
+    assert "unnest(zone_time_rollups.secs, excluded.secs)" in str(statements[1])
+    assert statements[1].params["secs_m0"] == [-10] * ZONE_SLOTS
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_replace_activity_zone_times_writes_only_differences():
+    """Test that unchanged zone times are left alone and changed or vanished kinds move the rollups."""
+    activity_id, athlete = uuid.uuid4(), uuid.uuid4()
+    day = date(2025, 3, 5)
+    stored = [
+        MagicMock(activity_id=activity_id, athlete_id=athlete, day=day, kind="hr", secs=[10] * ZONE_SLOTS),
+        MagicMock(activity_id=activity_id, athlete_id=athlete, day=day, kind="power", secs=[5] * ZONE_SLOTS),
+    ]
+    hr = {"activity_id": activity_id, "athlete_id": athlete, "day": day, "kind": "hr", "secs": [10] * ZONE_SLOTS}
+
+    db = AsyncMock()
+    db.execute.return_value = MagicMock()
+    db.execute.return_value.scalars.return_value.all.return_value = stored[:1]
+    await zone_time_service.replace_activity_zone_times(db, [activity_id], [hr])
+    assert db.execute.await_count == 1
+
+    db = AsyncMock()
+    db.execute.return_value = MagicMock()
+    db.execute.return_value.scalars.return_value.all.return_value = stored
+    await zone_time_service.replace_activity_zone_times(db, [activity_id], [{**hr, "secs": [20] * ZONE_SLOTS}])
+
+    statements = [str(call.args[0].compile(dialect=postgresql.dialect())) for call in db.execute.await_args_list]
+    assert statements[1].startswith("INSERT INTO activity_zone_times")
+    assert statements[2].startswith("DELETE FROM activity_zone_times")
+    rollup = db.execute.await_args_list[3].args[0].compile(dialect=postgresql.dialect()).params
+    assert sorted(v[0] for k, v in rollup.items() if k.startswith("secs_m")) == [-5] * 3 + [10] * 3
+
+
+@pytest.mark.asyncio
+async def test_get_athlete_zone_times_endpoint():
+    """Test reading precomputed weekly rollups and their totals."""
+    async with mock_app() as client:
+        athlete_id = uuid.uuid4()
+        rollups = [
+            ZoneTimeRollup(athlete_id=athlete_id, period="week", period_start=date(2025, 3, 3), kind="hr", secs=[60, 0] + [0] * 8),
+            ZoneTimeRollup(athlete_id=athlete_id, period="week", period_start=date(2025, 3, 10), kind="hr", secs=[30, 90] + [0] * 8),
+        ]
+        with patch("app.services.zone_time_service.get_zone_time_rollups") as mock_rollups:
+            mock_rollups.return_value = rollups
+
+            r = await client.get(f"/myactivities/analytics/{athlete_id}/zones", params={"start_date": "2025-01-01"})
+            assert r.status_code == 200
+            body = r.json()
+            assert body["period"] == "week"
+            assert len(body["rollups"]) == 2
+            assert body["totals"] == {"hr": [90, 90] + [0] * 8}
+
+
+def test_summary_day_uses_local_wall_clock():
+    """Test that the stored local start time maps to its calendar day."""
+    assert daily_summary_service.summary_day(datetime(2025, 3, 2, 23, 30)) == date(2025, 3, 2)
+    assert daily_summary_service.summary_day(datetime(2025, 3, 2, 23, 30, tzinfo=timezone.utc)) == date(2025, 3, 2)
+    assert daily_summary_service.summary_day(None) is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_daily_summaries_recomputes_touched_days_only():
+    """Test that a refresh replaces just the given days, in two statements."""
+    db = AsyncMock()
+    athlete = uuid.uuid4()
+
+    refreshed = await daily_summary_service.refresh_daily_summaries(
+        db, [(athlete, date(2025, 3, 2)), (athlete, date(2025, 3, 2)), (athlete, None)]
+    )
+
+    assert refreshed == 1
+    statements = [str(call.args[0].compile(dialect=postgresql.dialect())) for call in db.execute.await_args_list]
+    assert len(statements) == 3
+    assert statements[0].startswith("DELETE FROM daily_training_summaries")
+    assert "(daily_training_summaries.athlete_id, daily_training_summaries.day) IN" in statements[0]
+    assert "INSERT INTO daily_training_summaries" in statements[1]
+    assert "completed_activities.start_date_local <" in statements[1]
+    assert "GROUP BY" in statements[1]
+    assert "INSERT INTO athlete_fitness_states" in statements[2]
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_refresh_daily_summaries_without_days_is_a_no_op():
+    db = AsyncMock()
+
+    assert await daily_summary_service.refresh_daily_summaries(db, [(uuid.uuid4(), None)]) == 0
+    db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_athlete_daily_summary_endpoint():
+    """Test reading daily summary rows and their per-sport totals."""
+    async with mock_app() as client:
+        athlete_id = uuid.uuid4()
+        summaries = [
+            DailyTrainingSummary(athlete_id=athlete_id, day=date(2025, 3, 3), sport_type="Ride", activity_count=2,
+                                 distance_m=60000.0, moving_time_s=7200, training_load=150.0),
+            DailyTrainingSummary(athlete_id=athlete_id, day=date(2025, 3, 4), sport_type="Ride", activity_count=1,
+                                 distance_m=30000.0, moving_time_s=3600, training_load=None),
+            DailyTrainingSummary(athlete_id=athlete_id, day=date(2025, 3, 4), sport_type="Run", activity_count=1,
+                                 distance_m=10000.0, moving_time_s=2700, training_load=55.0),
+        ]
+        with patch("app.services.daily_summary_service.get_daily_summaries") as mock_summaries:
+            mock_summaries.return_value = summaries
+
+            r = await client.get(f"/myactivities/analytics/{athlete_id}/summary", params={"start_date": "2025-03-01"})
+            assert r.status_code == 200
+            body = r.json()
+            assert len(body["days"]) == 3
+            assert body["totals"]["Ride"] == {"activity_count": 3, "distance_m": 90000.0, "moving_time_s": 10800, "training_load": 150.0}
+            assert body["totals"]["Run"]["activity_count"] == 1
+
+
+def loop_ewma(load, days, initial):
+    decay, value, out = np.exp(-1.0 / days), initial, []
+    for x in load:
+        value = value * decay + x * (1.0 - decay)
+        out.append(value)
+    return np.array(out)
+
+
+def test_ewma_matches_recurrence_across_blocks():
+    """Test the blockwise closed form against the day-by-day recurrence."""
+    load = np.random.default_rng(3).uniform(0, 250, BLOCK_DAYS * 3 + 17)
+
+    for days in (CTL_DAYS, ATL_DAYS):
+        np.testing.assert_allclose(ewma(load, days, 35.0), loop_ewma(load, days, 35.0), rtol=1e-10)
+
+
+def test_fitness_series_form_is_previous_day():
+    """Test that TSB is yesterday's CTL - ATL, starting from the seed state."""
+    ctl, atl, tsb = fitness_series(np.array([100.0, 0.0, 50.0]), ctl=40.0, atl=60.0)
+
+    assert tsb[0] == pytest.approx(-20.0)
+    assert tsb[1:].tolist() == pytest.approx((ctl - atl)[:-1].tolist())
+    assert len(fitness_series(np.array([]))[0]) == 0
+
+
+@pytest.mark.asyncio
+async def test_refresh_fitness_continues_from_dirty_day():
+    """Test that a change recomputes forward from its day, seeded from the day before."""
+    athlete = uuid.uuid4()
+    today = date(2025, 3, 10)
+    state = AthleteFitnessState(athlete_id=athlete, computed_through=date(2025, 3, 9), dirty_from=date(2025, 3, 5))
+    db = AsyncMock()
+    db.add = MagicMock()
+    db.get.return_value = state
+    seed, loads, cleared, written = MagicMock(), MagicMock(), MagicMock(), MagicMock()
+    seed.one_or_none.return_value = (50.0, 70.0)
+    loads.all.return_value = [(date(2025, 3, 5), 120.0), (date(2025, 3, 8), 80.0)]
+    db.execute.side_effect = [seed, loads, cleared, written]
+
+    days = await fitness_service.refresh_fitness(db, athlete, today)
+
+    assert days == 6
+    rows = db.execute.await_args_list[3].args[1]
+    assert [row["day"] for row in rows] == [date(2025, 3, d) for d in range(5, 11)]
+    assert [row["load"] for row in rows] == [120.0, 0.0, 0.0, 80.0, 0.0, 0.0]
+    expected_ctl, _, _ = fitness_series(np.array([row["load"] for row in rows]), 50.0, 70.0)
+    assert [row["ctl"] for row in rows] == pytest.approx(expected_ctl.tolist())
+    assert "athlete_fitness.day >=" in str(db.execute.await_args_list[2].args[0].compile(dialect=postgresql.dialect()))
+    assert (state.computed_through, state.dirty_from) == (today, None)
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_refresh_fitness_up_to_date_is_cheap():
+    """Test that a clean, current series issues no statements."""
+    athlete = uuid.uuid4()
+    db = AsyncMock()
+    db.get.return_value = AthleteFitnessState(athlete_id=athlete, computed_through=date(2025, 3, 10), dirty_from=None)
+
+    assert await fitness_service.refresh_fitness(db, athlete, date(2025, 3, 10)) == 0
+    db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_athlete_fitness_endpoint():
+    """Test the fitness chart response shape."""
+    async with mock_app() as client:
+        athlete_id = uuid.uuid4()
+        with patch("app.services.fitness_service.get_fitness") as mock_fitness:
+            mock_fitness.return_value = [
+                {"day": date(2025, 3, 10), "load": 80.0, "ctl": 50.0, "atl": 60.0, "tsb": -8.0, "forecast": False},
+                {"day": date(2025, 3, 11), "load": 0.0, "ctl": 48.8, "atl": 52.0, "tsb": -10.0, "forecast": True},
+            ]
+
+            r = await client.get(f"/myactivities/analytics/{athlete_id}/fitness", params={"end_date": "2025-03-11"})
+            assert r.status_code == 200
+            points = r.json()["points"]
+            assert [p["forecast"] for p in points] == [False, True]
+            assert points[0]["ctl"] == 50.0
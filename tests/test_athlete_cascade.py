@@ -0,0 +1,123 @@
+"""
+Athlete deletion against a real database: the children go through the
+ON DELETE rules, not through the ORM.
+
+Runs against a throwaway local Postgres named by MYACTIVITIES_PLAN_DATABASE_URL,
+like test_query_plans. The schema in that database is dropped and recreated.
+Skipped when unset.
+"""
+import os
+import sys
+import tracemalloc
+import uuid
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db import manage  # noqa: F401 - registers every model on Base.metadata
+from app.models.athlete import Athlete
+from app.models.completed_activity import CompletedActivity
+from app.models.planned_activity import PlannedActivity
+
+DATABASE_URL = os.environ.get("MYACTIVITIES_PLAN_DATABASE_URL")
+
+pytestmark = [
+    pytest.mark.skipif(not DATABASE_URL, reason="MYACTIVITIES_PLAN_DATABASE_URL is not set"),
+    pytest.mark.asyncio(loop_scope="module"),
+]
+
+ACTIVITIES = 50_000
+PLANS = 5_000
+# Loading the activities alone would take well over 100 MB
+MEMORY_BUDGET_BYTES = 5 * 1024 * 1024
+
+SEED = [
+    """
+    INSERT INTO athletes (id, email, ai_enabled, created_at, updated_at)
+    VALUES (:athlete_id, :email, true, now(), now())
+    """,
+    """
+    INSERT INTO completed_activities
+        (id, athlete_id, source, name, sport_type, start_date, start_date_local,
+         distance_m, moving_time_s, icu_training_load, analyzed)
+    SELECT gen_random_uuid(), :athlete_id, 'INTERVALS', 'Ride', 'Ride', d.ts, d.ts, 30000, 3600, 80, false
+    FROM (
+        SELECT timestamptz '2000-01-01' + g * interval '6 hours' AS ts
+        FROM generate_series(1, :activities) g
+    ) d
+    """,
+    """
+    INSERT INTO planned_activities
+        (id, athlete_id, name, type, scheduled_date, completed, created_at, linked_activity_id)
+    SELECT gen_random_uuid(), :athlete_id, 'Ride', 'ride', c.start_date_local, true, now(), c.id
+    FROM completed_activities c
+    WHERE c.athlete_id = :athlete_id
+    ORDER BY c.start_date_local
+    LIMIT :plans
+    """,
+]
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def engine():
+    engine = create_async_engine(DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+async def seed_athlete(engine) -> uuid.UUID:
+    athlete_id = uuid.uuid4()
+    params = {"athlete_id": athlete_id, "email": f"{athlete_id}@example.com", "activities": ACTIVITIES, "plans": PLANS}
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement), params)
+    return athlete_id
+
+
+async def count(db, model, athlete_id) -> int:
+    return (await db.execute(select(func.count()).select_from(model).where(model.athlete_id == athlete_id))).scalar_one()
+
+
+async def test_orm_delete_of_large_athlete_stays_in_memory_budget(engine):
+    athlete_id = await seed_athlete(engine)
+
+    async with AsyncSession(engine) as db:
+        athlete = await db.get(Athlete, athlete_id)
+        tracemalloc.start()
+        try:
+            await db.delete(athlete)
+            await db.commit()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak < MEMORY_BUDGET_BYTES, f"deleting the athlete peaked at {peak / 1024 / 1024:.1f} MB"
+        assert await count(db, CompletedActivity, athlete_id) == 0
+        assert await count(db, PlannedActivity, athlete_id) == 0
+
+
+async def test_deleting_a_linked_activity_unlinks_the_plan(engine):
+    athlete_id = await seed_athlete(engine)
+
+    async with AsyncSession(engine) as db:
+        plan = (await db.execute(
+            select(PlannedActivity).where(PlannedActivity.athlete_id == athlete_id).limit(1)
+        )).scalar_one()
+        await db.execute(text("DELETE FROM completed_activities WHERE id = :id"), {"id": plan.linked_activity_id})
+        await db.commit()
+
+        await db.refresh(plan)
+        assert plan.linked_activity_id is None
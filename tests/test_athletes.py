@@ -95,3 +95,50 @@ async def test_athlete_get_not_found_mocked():
             mock_get.return_value = None
             r = await client.get(f"/myactivities/athletes/{uuid.uuid4()}")
             assert r.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_athlete_update_not_found_mocked():
+    """Test 404 when the UPDATE ... RETURNING finds no athlete."""
+    async with mock_app() as client:
+        with patch("app.services.athlete_service.update_existing_athlete") as mock_update:
+            mock_update.return_value = None
+            test_id = uuid.uuid4()
+            r = await client.put(f"/myactivities/athletes/{test_id}", json={"ftp": 250})
+            assert r.status_code == 404
+            assert mock_update.call_args.args[1] == test_id
+
+
+@pytest.mark.asyncio
+async def test_delete_athlete_is_one_statement():
+    """Deleting issues a single DELETE ... RETURNING and only commits when a row went."""
+    from app.services import athlete_service
+
+    db = AsyncMock()
+    db.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=None))
+    assert await athlete_service.delete_athlete_by_id(db, uuid.uuid4()) is False
+    db.commit.assert_not_awaited()
+
+    athlete_id = uuid.uuid4()
+    db.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=athlete_id))
+    assert await athlete_service.delete_athlete_by_id(db, athlete_id) is True
+    db.commit.assert_awaited_once()
+
+    statement = str(db.execute.call_args.args[0])
+    assert statement.startswith("DELETE FROM athletes") and "RETURNING" in statement
+    assert db.execute.await_count == 2
+
+
+def test_athlete_children_are_deleted_by_the_database():
+    """The relationships defer to ON DELETE rules instead of loading children."""
+    from app.db import manage  # noqa: F401 - registers every model
+    from app.models.athlete import Athlete
+    from app.models.planned_activity import PlannedActivity
+
+    for relationship in (Athlete.completed_activities, Athlete.planned_activities):
+        assert relationship.property.passive_deletes is True
+        (fk,) = relationship.property.mapper.local_table.c.athlete_id.foreign_keys
+        assert fk.ondelete == "CASCADE"
+
+    (linked,) = PlannedActivity.__table__.c.linked_activity_id.foreign_keys
+    assert linked.ondelete == "SET NULL"
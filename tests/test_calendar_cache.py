@@ -0,0 +1,219 @@
+import pytest
+import sys
+import uuid
+from collections import namedtuple
+from pathlib import Path
+from datetime import date, datetime, timezone, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from app.services import completed_activity_service, planned_activity_service
+from app.services.calendar_cache import CalendarCache, calendar_cache
+from app.schemas.planned_activity import PlannedActivityUpdate
+from app.schemas.completed_activity import CompletedActivityUpdate
+
+athlete_id = uuid.uuid4()
+week = (datetime(2026, 1, 5, tzinfo=timezone.utc), datetime(2026, 1, 11, 23, 59, tzinfo=timezone.utc))
+next_week = (week[0] + timedelta(days=7), week[1] + timedelta(days=7))
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def cached(cache, window=week, events=("entry",), athlete=athlete_id):
+    cache.put(athlete, *window, list(events), cache.generation(athlete))
+
+
+def test_get_counts_hits_and_misses():
+    """Test that a stored window is returned and counted as a hit."""
+    cache = CalendarCache()
+    assert cache.get(athlete_id, *week) is None
+    cached(cache)
+
+    assert cache.get(athlete_id, *week) == ["entry"]
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "invalidations": 0, "entries": 1}
+
+
+def test_entries_expire_after_ttl():
+    """Test that an entry is a miss once its TTL has passed."""
+    clock = Clock()
+    cache = CalendarCache(ttl_s=60, clock=clock)
+    cached(cache)
+
+    clock.now = 59
+    assert cache.get(athlete_id, *week) is not None
+    clock.now = 60
+    assert cache.get(athlete_id, *week) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_is_evicted():
+    """Test that the size bound evicts the entry read longest ago."""
+    cache = CalendarCache(max_entries=2)
+    other = uuid.uuid4()
+    cached(cache)
+    cached(cache, window=next_week)
+    cache.get(athlete_id, *week)
+    cached(cache, athlete=other)
+
+    assert cache.get(athlete_id, *next_week) is None
+    assert cache.get(athlete_id, *week) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_drops_only_windows_covering_the_day():
+    """Test that a change drops the athlete's windows containing its day, and no others."""
+    cache = CalendarCache()
+    other = uuid.uuid4()
+    cached(cache)
+    cached(cache, window=next_week)
+    cached(cache, athlete=other)
+
+    assert cache.invalidate(athlete_id, [datetime(2026, 1, 8, 6, 0, tzinfo=timezone.utc)]) == 1
+    assert cache.get(athlete_id, *week) is None
+    assert cache.get(athlete_id, *next_week) is not None
+    assert cache.get(other, *week) is not None
+
+
+def test_invalidate_uses_utc_day_buckets():
+    """Test that an offset timestamp lands in its UTC day, like the daily summaries."""
+    cache = CalendarCache()
+    cached(cache, window=next_week)
+
+    late_sunday = datetime(2026, 1, 11, 23, 30, tzinfo=timezone(timedelta(hours=-2)))
+    assert cache.invalidate_days([(athlete_id, late_sunday)]) == 1
+
+
+def test_invalidate_without_days_drops_the_athlete():
+    cache = CalendarCache()
+    cached(cache)
+    cached(cache, window=next_week)
+
+    assert cache.invalidate(athlete_id) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_read_overlapping_an_invalidation_is_not_stored():
+    """Test that a result read before a writer committed is not cached after its invalidation."""
+    cache = CalendarCache()
+    generation = cache.generation(athlete_id)
+    cache.invalidate(athlete_id, [date(2026, 1, 6)])
+    cache.put(athlete_id, *week, ["stale"], generation)
+
+    assert cache.get(athlete_id, *week) is None
+
+
+@pytest.mark.asyncio
+async def test_planned_update_invalidates_old_and_new_day():
+    """Test that moving a plan invalidates the window it left and the one it moved into."""
+    calendar_cache.clear()
+    cached(calendar_cache)
+    cached(calendar_cache, window=next_week)
+    db = AsyncMock()
+    db.execute.return_value.one_or_none = MagicMock(return_value=MagicMock(
+        athlete_id=athlete_id,
+        scheduled_date=datetime(2026, 1, 13, 8, 0, tzinfo=timezone.utc),
+        previous_athlete_id=athlete_id,
+        previous_scheduled_date=datetime(2026, 1, 6, 8, 0, tzinfo=timezone.utc),
+    ))
+
+    await planned_activity_service.update_planned_activity(
+        db, uuid.uuid4(), PlannedActivityUpdate(scheduled_date=datetime(2026, 1, 13, 8, 0, tzinfo=timezone.utc))
+    )
+
+    assert calendar_cache.stats()["entries"] == 0
+    calendar_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_completed_delete_invalidates_after_commit():
+    """Test that a deleted activity's window is dropped once the delete is committed."""
+    calendar_cache.clear()
+    cached(calendar_cache)
+    Deleted = namedtuple("Deleted", "athlete_id start_date_local")
+    unlinked, deleted = MagicMock(), MagicMock()
+    unlinked.all.return_value = []
+    deleted.one_or_none.return_value = Deleted(athlete_id, datetime(2026, 1, 7, 7, 0, tzinfo=timezone.utc))
+    db = AsyncMock()
+    db.execute.side_effect = [deleted, unlinked, MagicMock()]
+
+    async def commit():
+        assert calendar_cache.get(athlete_id, *week) is not None
+
+    db.commit.side_effect = commit
+    with patch("app.services.zone_time_service.delete_activity_zone_times"), \
+            patch("app.services.daily_summary_service.refresh_daily_summaries"):
+        assert await completed_activity_service.delete_completed_activity(db, uuid.uuid4())
+
+    assert calendar_cache.get(athlete_id, *week) is None
+    calendar_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_completed_delete_of_missing_activity_writes_nothing():
+    """Test that a missing activity is found by the locking read, before any write."""
+    missing = MagicMock()
+    missing.one_or_none.return_value = None
+    db = AsyncMock()
+    db.execute.side_effect = [missing]
+
+    with patch("app.services.zone_time_service.delete_activity_zone_times") as delete_zones:
+        assert not await completed_activity_service.delete_completed_activity(db, uuid.uuid4())
+
+    assert str(db.execute.await_args.args[0]).endswith("FOR UPDATE")
+    delete_zones.assert_not_called()
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_completed_delete_unlinks_plans_and_invalidates_their_days():
+    """Test that plans the activity fulfilled are uncompleted and their calendar days dropped."""
+    calendar_cache.clear()
+    cached(calendar_cache, next_week)
+    Deleted = namedtuple("Deleted", "athlete_id start_date_local")
+    unlinked, deleted = MagicMock(), MagicMock()
+    unlinked.all.return_value = [(athlete_id, datetime(2026, 1, 13, 7, 0, tzinfo=timezone.utc))]
+    deleted.one_or_none.return_value = Deleted(athlete_id, datetime(2026, 1, 7, 7, 0, tzinfo=timezone.utc))
+    db = AsyncMock()
+    db.execute.side_effect = [deleted, unlinked, MagicMock()]
+
+    with patch("app.services.zone_time_service.delete_activity_zone_times"), \
+            patch("app.services.daily_summary_service.refresh_daily_summaries"):
+        assert await completed_activity_service.delete_completed_activity(db, uuid.uuid4())
+
+    sql = str(db.execute.await_args_list[1].args[0])
+    assert sql.startswith("UPDATE planned_activities SET linked_activity_id=:linked_activity_id, completed=:completed")
+    assert db.execute.await_args_list[1].args[0].compile().params["completed"] is False
+    assert calendar_cache.get(athlete_id, *next_week) is None
+    calendar_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_completed_update_clearing_the_date_drops_zone_times():
+    """Test that an activity whose start date is cleared leaves the zone time rollups."""
+    Updated = namedtuple("Updated", "id athlete_id start_date_local previous_start_date_local")
+    activity_id = uuid.uuid4()
+    db = AsyncMock()
+    db.execute.return_value.one_or_none = MagicMock(
+        return_value=Updated(activity_id, athlete_id, None, datetime(2026, 1, 7, 7, 0, tzinfo=timezone.utc))
+    )
+
+    with patch("app.services.zone_time_service.delete_activity_zone_times") as delete_zones, \
+            patch("app.services.zone_time_service.move_activity_zone_times") as move_zones, \
+            patch("app.services.daily_summary_service.refresh_daily_summaries"):
+        await completed_activity_service.update_completed_activity(
+            db, activity_id, CompletedActivityUpdate(start_date_local=None)
+        )
+
+    delete_zones.assert_awaited_once_with(db, [activity_id])
+    move_zones.assert_not_called()
+    calendar_cache.clear()
@@ -1,11 +1,14 @@
 import pytest
 import sys
 from pathlib import Path
+import json
 import uuid
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, patch, MagicMock
 from httpx import AsyncClient, ASGITransport
 from contextlib import asynccontextmanager
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
 
 # Ensure src is on path
 ROOT = Path(__file__).resolve().parents[1]
@@ -14,6 +17,9 @@ sys.path.insert(0, str(SRC))
 
 from app.main import app
 from app.db.session import get_db
+from app.models.completed_activity import CompletedActivity
+from app.services import completed_activity_service
+from app.services.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
 
 
 @asynccontextmanager
@@ -69,7 +75,7 @@ async def test_completed_activity_get_by_athlete_mocked():
     async with mock_app() as client:
         athlete_id, activity_id = uuid.uuid4(), uuid.uuid4()
         with patch("app.services.completed_activity_service.get_completed_activities_by_athlete") as mock_get:
-            mock_get.return_value = [
+            mock_get.return_value = ([
                 mock_obj(
                     id=activity_id,
                     athlete_id=athlete_id,
@@ -80,10 +86,57 @@ async def test_completed_activity_get_by_athlete_mocked():
                     start_date_local=None,
                     created_at=datetime.now(timezone.utc),
                 )
-            ]
+            ], "next-token")
 
-            r = await client.get(f"/myactivities/completedActivities/athlete/{athlete_id}")
+            r = await client.get(f"/myactivities/completedActivities/athlete/{athlete_id}?limit=1")
             assert r.status_code == 200
+            assert r.json()["next_cursor"] == "next-token"
+            assert r.json()["items"][0]["id"] == str(activity_id)
+            assert mock_get.call_args.args[2:] == (1, None)
+
+
+@pytest.mark.asyncio
+async def test_completed_activity_get_by_athlete_invalid_cursor():
+    """A malformed cursor is a client error."""
+    async with mock_app() as client:
+        r = await client.get(f"/myactivities/completedActivities/athlete/{uuid.uuid4()}?cursor=not-a-cursor")
+        assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_completed_activity_get_by_athlete_page_size_bounds():
+    """Page size is limited to 1..MAX_PAGE_SIZE."""
+    async with mock_app() as client:
+        for limit in (0, MAX_PAGE_SIZE + 1):
+            r = await client.get(f"/myactivities/completedActivities/athlete/{uuid.uuid4()}?limit={limit}")
+            assert r.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_completed_activities_page_walks_keyset():
+    """Pages use a keyset predicate and a one-row look-ahead instead of OFFSET."""
+    athlete_id = uuid.uuid4()
+    day = datetime(2026, 1, 6, tzinfo=timezone.utc)
+    rows = [mock_obj(id=uuid.uuid4(), start_date_local=day) for _ in range(3)]
+    db = AsyncMock()
+    db.execute.return_value = MagicMock(all=lambda: rows)
+
+    items, next_cursor = await completed_activity_service.get_completed_activities_by_athlete(db, athlete_id, limit=2)
+    assert items == rows[:2]
+    assert decode_cursor(next_cursor) == (day, rows[1].id)
+
+    await completed_activity_service.get_completed_activities_by_athlete(db, athlete_id, limit=2, cursor=next_cursor)
+    sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "OFFSET" not in sql
+    assert "(completed_activities.start_date_local, completed_activities.id) <" in sql
+    assert "ORDER BY completed_activities.start_date_local DESC NULLS FIRST, completed_activities.id DESC" in sql
+    assert "LIMIT" in sql
+
+
+def test_cursor_round_trip_with_null_date():
+    """Activities without a start date still get a usable cursor."""
+    row_id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(None, row_id)) == (None, row_id)
 
 
 @pytest.mark.asyncio
@@ -91,8 +144,7 @@ async def test_completed_activity_update_mocked():
     """Test completed activity update."""
     async with mock_app() as client:
         activity_id = uuid.uuid4()
-        with patch("app.services.completed_activity_service.get_completed_activity_by_id") as mock_get, \
-             patch("app.services.completed_activity_service.update_completed_activity") as mock_update:
+        with patch("app.services.completed_activity_service.update_completed_activity") as mock_update:
             mock_activity = mock_obj(
                 id=activity_id,
                 athlete_id=uuid.uuid4(),
@@ -103,11 +155,15 @@ async def test_completed_activity_update_mocked():
                 start_date_local=None,
                 created_at=datetime.now(timezone.utc),
             )
-            mock_get.return_value = mock_activity
             mock_update.return_value = mock_activity
 
             r = await client.put(f"/myactivities/completedActivities/{activity_id}", json={"name": "Updated"})
             assert r.status_code == 200
+            assert mock_update.call_args.args[1] == activity_id
+
+            mock_update.return_value = None
+            r = await client.put(f"/myactivities/completedActivities/{activity_id}", json={"name": "Updated"})
+            assert r.status_code == 404
 
 
 @pytest.mark.asyncio
@@ -115,12 +171,74 @@ async def test_completed_activity_delete_mocked():
     """Test completed activity deletion."""
     async with mock_app() as client:
         activity_id = uuid.uuid4()
-        with patch("app.services.completed_activity_service.get_completed_activity_by_id") as mock_get, \
-             patch("app.services.completed_activity_service.delete_completed_activity") as mock_delete:
-            mock_get.return_value = mock_obj(
-                id=activity_id,
-            )
-            mock_delete.return_value = None
+        with patch("app.services.completed_activity_service.delete_completed_activity") as mock_delete:
+            mock_delete.return_value = True
 
             r = await client.delete(f"/myactivities/completedActivities/{activity_id}")
             assert r.status_code == 204
+            assert mock_delete.call_args.args[1] == activity_id
+
+            mock_delete.return_value = False
+            r = await client.delete(f"/myactivities/completedActivities/{activity_id}")
+            assert r.status_code == 404
+
+
+def test_completed_activity_reads_skip_unused_columns():
+    """List reads select only the response columns; ORM loads leave the deferred groups out."""
+    read_sql = str(
+        select(*completed_activity_service.READ_COLUMNS).compile(dialect=postgresql.dialect())
+    )
+    orm_sql = str(select(CompletedActivity).compile(dialect=postgresql.dialect()))
+
+    for column in ("icu_training_load", "gear_name", "device_name", "last_sync", "strava_url", "description"):
+        assert column not in read_sql
+        assert column not in orm_sql
+    for column in ("start_date_local", "sport_type", "created_at"):
+        assert column in read_sql
+
+
+@pytest.mark.asyncio
+async def test_completed_activity_get_by_athlete_ndjson():
+    """NDJSON clients get every activity streamed one per line instead of a page."""
+    athlete_id = uuid.uuid4()
+    rows = [
+        mock_obj(
+            id=uuid.uuid4(),
+            athlete_id=athlete_id,
+            name=f"Ride {i}",
+            source="strava",
+            external_id=None,
+            sport_type="Ride",
+            start_date_local=None,
+            created_at=datetime.now(timezone.utc),
+        )
+        for i in range(3)
+    ]
+
+    async def stream(db, athlete, cursor):
+        for row in rows:
+            yield row
+
+    async with mock_app() as client:
+        with patch("app.services.completed_activity_service.stream_completed_activities_by_athlete", stream), \
+             patch("app.services.completed_activity_service.get_completed_activities_by_athlete") as mock_page:
+            r = await client.get(
+                f"/myactivities/completedActivities/athlete/{athlete_id}?limit=1",
+                headers={"Accept": "application/x-ndjson"},
+            )
+
+            assert r.status_code == 200
+            assert r.headers["content-type"].startswith("application/x-ndjson")
+            assert [json.loads(line)["name"] for line in r.text.splitlines()] == ["Ride 0", "Ride 1", "Ride 2"]
+            mock_page.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_completed_activity_ndjson_invalid_cursor():
+    """A malformed cursor is rejected before the stream starts."""
+    async with mock_app() as client:
+        r = await client.get(
+            f"/myactivities/completedActivities/athlete/{uuid.uuid4()}?cursor=not-a-cursor",
+            headers={"Accept": "application/x-ndjson"},
+        )
+        assert r.status_code == 400
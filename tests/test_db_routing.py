@@ -0,0 +1,124 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+from httpx import AsyncClient, ASGITransport
+from contextlib import asynccontextmanager
+from sqlalchemy.exc import OperationalError
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from app.main import app
+from app.db import session as db_session
+from app.db.replicas import ReplicaSet
+from app.db.session import get_db
+from app.db.settings import DatabaseSettings
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def replica(fail=False):
+    """Session factory whose sessions fail their connection check when asked to."""
+    session = AsyncMock()
+    if fail:
+        session.connection.side_effect = OperationalError("SELECT 1", {}, ConnectionRefusedError())
+    return MagicMock(return_value=session), session
+
+
+@asynccontextmanager
+async def mock_app(primary, replicas):
+    """Test client whose primary is a mock session and whose replicas are the given set."""
+
+    async def override_get_db():
+        yield primary
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with patch.object(db_session, "replicas", replicas):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_settings_split_replica_urls():
+    settings = DatabaseSettings.load({"MYACTIVITIES_DB_REPLICA_URLS": "postgresql+asyncpg://r1/db,postgresql+asyncpg://r2/db"})
+
+    assert settings.replica_urls == ["postgresql+asyncpg://r1/db", "postgresql+asyncpg://r2/db"]
+
+
+@pytest.mark.asyncio
+async def test_replicas_round_robin():
+    (first, a), (second, b) = replica(), replica()
+    replicas = ReplicaSet([first, second])
+
+    assert [await replicas.open_session() for _ in range(3)] == [a, b, a]
+
+
+@pytest.mark.asyncio
+async def test_failed_replica_is_skipped_until_retry():
+    """Test that a replica failing its check is skipped for retry_after_s, then tried again."""
+    clock = Clock()
+    (down, down_session), (up, up_session) = replica(fail=True), replica()
+    replicas = ReplicaSet([down, up], retry_after_s=30, clock=clock)
+
+    assert await replicas.open_session() is up_session
+    down_session.close.assert_awaited_once()
+    assert not replicas.healthy(0)
+    assert await replicas.open_session() is up_session
+    assert down.call_count == 1
+
+    clock.now = 30
+    assert await replicas.open_session() is up_session
+    assert down.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_no_healthy_replica_returns_none():
+    replicas = ReplicaSet([replica(fail=True)[0]])
+
+    assert await replicas.open_session() is None
+    assert await ReplicaSet([]).open_session() is None
+
+
+@pytest.mark.asyncio
+async def test_read_routes_use_a_replica():
+    primary = AsyncMock()
+    factory, replica_session = replica()
+    async with mock_app(primary, ReplicaSet([factory])) as client:
+        with patch("app.services.athlete_service.get_athlete_by_id", return_value=None) as mock_get:
+            r = await client.get(f"/myactivities/athletes/{'0' * 8}-0000-0000-0000-{'0' * 12}")
+
+        assert r.status_code == 404
+        assert mock_get.call_args.args[0] is replica_session
+        replica_session.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_clients_can_read_their_writes_from_the_primary():
+    """Test that writes set the read-primary cookie and that it, or the header, routes reads to the primary."""
+    primary = AsyncMock()
+    factory, _ = replica()
+    athlete_url = f"/myactivities/athletes/{'0' * 8}-0000-0000-0000-{'0' * 12}"
+    async with mock_app(primary, ReplicaSet([factory])) as client:
+        with patch("app.services.athlete_service.delete_athlete_by_id", return_value=True):
+            r = await client.delete(athlete_url)
+        assert r.status_code == 204
+        assert db_session.READ_PRIMARY_COOKIE in r.cookies
+
+        with patch("app.services.athlete_service.get_athlete_by_id", return_value=None) as mock_get:
+            await client.get(athlete_url)
+            client.cookies.clear()
+            await client.get(athlete_url, headers={db_session.READ_PRIMARY_HEADER: "1"})
+
+        assert [call.args[0] for call in mock_get.call_args_list] == [primary, primary]
+        factory.assert_not_called()
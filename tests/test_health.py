@@ -0,0 +1,90 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+from httpx import AsyncClient, ASGITransport
+from contextlib import asynccontextmanager
+from pydantic import ValidationError
+from sqlalchemy.exc import OperationalError
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from app.main import app
+from app.db.session import get_db
+from app.db.settings import DatabaseSettings
+
+POOL = {"size": 5, "checked_out": 2, "idle": 3, "overflow": 0, "max_overflow": 10}
+
+
+@asynccontextmanager
+async def mock_app(mock_db):
+    """Async context manager that provides a test client with mocked DB."""
+
+    async def override_get_db():
+        yield mock_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_settings_defaults_do_not_echo():
+    settings = DatabaseSettings.load({})
+
+    assert settings.echo is False
+    assert settings.engine_kwargs()["pool_size"] == 5
+
+
+def test_settings_environment_overrides_file(tmp_path):
+    """Test that the TOML file is read first and environment variables win."""
+    path = tmp_path / "settings.toml"
+    path.write_text('[database]\nurl = "postgresql+asyncpg://app@db/prod"\npool_size = 20\nstatement_cache_size = 0\n')
+
+    settings = DatabaseSettings.load({
+        "MYACTIVITIES_SETTINGS_FILE": str(path),
+        "MYACTIVITIES_DB_POOL_SIZE": "8",
+        "MYACTIVITIES_DB_ECHO": "true",
+        "MYACTIVITIES_DB_COMMAND_TIMEOUT_S": "15",
+    })
+    kwargs = settings.engine_kwargs()
+
+    assert settings.url == "postgresql+asyncpg://app@db/prod"
+    assert (kwargs["pool_size"], kwargs["echo"]) == (8, True)
+    assert kwargs["connect_args"]["statement_cache_size"] == 0
+    assert kwargs["connect_args"]["command_timeout"] == 15.0
+
+
+def test_settings_reject_invalid_values():
+    with pytest.raises(ValidationError):
+        DatabaseSettings.load({"MYACTIVITIES_DB_POOL_SIZE": "0"})
+    with pytest.raises(ValidationError):
+        DatabaseSettings.model_validate({"pool_sise": 3})
+
+
+@pytest.mark.asyncio
+async def test_readiness_reports_pool():
+    async with mock_app(AsyncMock()) as client:
+        with patch("app.api.routers.health.pool_status", return_value=POOL):
+            r = await client.get("/myactivities/health/ready")
+
+        assert r.status_code == 200
+        assert r.json() == {"status": "ready", "database": True, "pool": POOL, "replicas": []}
+
+
+@pytest.mark.asyncio
+async def test_readiness_unavailable_without_database():
+    mock_db = AsyncMock()
+    mock_db.execute.side_effect = OperationalError("SELECT 1", {}, ConnectionRefusedError())
+    async with mock_app(mock_db) as client:
+        with patch("app.api.routers.health.pool_status", return_value=POOL):
+            r = await client.get("/myactivities/health/ready")
+
+        assert r.status_code == 503
+        assert r.json()["status"] == "unavailable"
+        assert r.json()["pool"]["idle"] == 3
@@ -0,0 +1,71 @@
+import pytest
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.dialects import postgresql
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from app.integrations.intervals_icu.archive import build_archive_upsert, decode_payload, encode_payload
+from app.integrations.intervals_icu.replay import map_archived_payloads, replay_icu_archive
+from app.integrations.intervals_icu.service import SyncResult
+
+athlete_id = uuid.uuid4()
+payload = {
+    "id": "i1",
+    "name": "Ride",
+    "icu_zone_times": [{"id": "Z1", "secs": 600}, {"id": "Z2", "secs": 1200}],
+    "icu_achievements": [{"id": "a1", "type": "BEST_POWER", "watts": 410, "secs": 300}],
+}
+
+
+def test_payload_round_trip_is_deterministic():
+    """Test that equal payloads encode to equal bytes, whatever the key order."""
+    reordered = dict(reversed(list(payload.items())))
+
+    assert encode_payload(payload) == encode_payload(reordered)
+    assert decode_payload(encode_payload(payload)) == payload
+
+
+def test_archive_upsert_only_rewrites_changed_payloads():
+    """Test that the archive upsert is conditional on the payload changing."""
+    rows = [{"intervals_id": "i1", "athlete_id": athlete_id, "payload": encode_payload(payload), "fetched_at": None}]
+    sql = str(build_archive_upsert(rows).compile(dialect=postgresql.dialect()))
+
+    assert "ON CONFLICT (intervals_id) DO UPDATE" in sql
+    assert "icu_activity_archive.payload IS DISTINCT FROM excluded.payload" in sql
+
+
+def test_map_archived_payloads():
+    """Test that archived payloads map to the same rows as live ones."""
+    payloads, rows = map_archived_payloads([(athlete_id, encode_payload(payload)), (athlete_id, encode_payload({"id": "i2"}))])
+
+    assert payloads == [payload, {"id": "i2"}]
+    assert [row["intervals_id"] for row in rows] == ["i1", "i2"]
+    assert all(row["athlete_id"] == athlete_id for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_replay_writes_through_the_live_sync_path():
+    """Test that replay rebuilds derived tables by writing payloads the way a live sync does."""
+    archived = [MagicMock(intervals_id="i1", athlete_id=athlete_id, payload=encode_payload(payload))]
+    db = AsyncMock()
+    db.execute.side_effect = [MagicMock(all=MagicMock(return_value=archived)), MagicMock(all=MagicMock(return_value=[]))]
+    session_factory = MagicMock(return_value=MagicMock(
+        __aenter__=AsyncMock(return_value=db), __aexit__=AsyncMock(return_value=None)
+    ))
+
+    with patch("app.integrations.intervals_icu.replay.ProcessPoolExecutor", ThreadPoolExecutor), \
+         patch("app.integrations.intervals_icu.replay.write_activity_payloads", AsyncMock(return_value=SyncResult(updated=1))) as write:
+        result = await replay_icu_archive(session_factory, workers=1)
+
+    payloads, rows = write.call_args.args[1:3]
+    assert payloads == [payload]
+    assert [row["intervals_id"] for row in rows] == ["i1"]
+    assert result.updated == 1
+    db.commit.assert_awaited_once()
@@ -0,0 +1,124 @@
+import pytest
+import sys
+import json
+import os
+import hashlib
+from pathlib import Path
+from datetime import datetime, timezone, timedelta
+import httpx
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from app.integrations.intervals_icu.cache import ResponseCache
+from app.integrations.intervals_icu.client import IntervalsClient, create_http_client
+
+start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+end = start + timedelta(days=10)
+
+
+class StandInServer:
+    """Local stand-in for intervals.icu that honors If-None-Match."""
+
+    def __init__(self, activities: list[dict]):
+        self.activities = activities
+        self.statuses: list[int] = []
+
+    @property
+    def body(self) -> bytes:
+        return json.dumps(self.activities).encode()
+
+    @property
+    def etag(self) -> str:
+        return '"' + hashlib.sha1(self.body).hexdigest() + '"'
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.headers.get("If-None-Match") == self.etag:
+            response = httpx.Response(304, headers={"ETag": self.etag})
+        else:
+            response = httpx.Response(200, content=self.body, headers={"ETag": self.etag})
+        self.statuses.append(response.status_code)
+        return response
+
+
+async def fetch(cache: ResponseCache, server: StandInServer) -> list[list[dict]]:
+    http = create_http_client(transport=httpx.MockTransport(server))
+    async with IntervalsClient("key", http_client=http, cache=cache) as client:
+        pages = [p async for p in client.iter_activity_pages("i1", start, end)]
+    await http.aclose()
+    return pages
+
+
+@pytest.mark.asyncio
+async def test_cache_revalidates_and_serves_304_from_disk(tmp_path):
+    """Test that a repeated request is answered from the cache on 304."""
+    server = StandInServer([{"id": "i1", "name": "Ride"}])
+    cache = ResponseCache(tmp_path / "icu.sqlite")
+
+    first = await fetch(cache, server)
+    second = await fetch(cache, server)
+
+    assert first == second == [[{"id": "i1", "name": "Ride"}]]
+    assert server.statuses == [200, 304]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_refreshes_changed_response(tmp_path):
+    """Test that a changed upstream response replaces the cached body."""
+    server = StandInServer([{"id": "i1", "name": "Ride"}])
+    cache = ResponseCache(tmp_path / "icu.sqlite")
+
+    await fetch(cache, server)
+    server.activities = [{"id": "i1", "name": "Renamed"}]
+    pages = await fetch(cache, server)
+
+    assert pages == [[{"id": "i1", "name": "Renamed"}]]
+    assert server.statuses == [200, 200]
+    assert cache.stats()["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_persists_across_instances(tmp_path):
+    """Test that the cache survives a process restart."""
+    server = StandInServer([{"id": "i1"}])
+
+    await fetch(ResponseCache(tmp_path / "icu.sqlite"), server)
+    reopened = ResponseCache(tmp_path / "icu.sqlite")
+    await fetch(reopened, server)
+
+    assert server.statuses == [200, 304]
+    assert reopened.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that the cache stays under its size bound by evicting old entries."""
+    cache = ResponseCache(tmp_path / "icu.sqlite", max_bytes=1200)
+    bodies = [os.urandom(500) for _ in range(3)]
+
+    await cache.put("a", "/a", '"a"', None, bodies[0])
+    await cache.put("b", "/b", '"b"', None, bodies[1])
+    await cache.touch("a")
+    await cache.put("c", "/c", '"c"', None, bodies[2])
+
+    assert await cache.get("b") is None
+    assert (await cache.get("a")).body == bodies[0]
+    assert cache.evictions == 1
+    assert cache.stats()["bytes"] <= 1200
+
+
+@pytest.mark.asyncio
+async def test_cache_counts_its_own_hits_and_misses(tmp_path):
+    """Test that responses without validators count as misses but are not stored."""
+    cache = ResponseCache(tmp_path / "icu.sqlite")
+
+    await cache.record_miss("a", "/a", None, None, b"[]")
+    await cache.record_miss("b", "/b", '"b"', None, b"[]")
+    await cache.record_hit("b")
+
+    assert await cache.get("a") is None
+    assert (cache.hits, cache.misses, cache.stats()["entries"]) == (1, 2, 1)
@@ -0,0 +1,107 @@
+import pytest
+import sys
+import json
+from pathlib import Path
+from datetime import datetime, timezone, timedelta
+import httpx
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from app.integrations.intervals_icu.client import IntervalsClient, create_http_client
+from app.models.completed_activity import CompletedActivity
+
+start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def icu_activity(activity_id: str, day: datetime) -> dict:
+    return {
+        "id": activity_id,
+        "name": f"Ride {activity_id}",
+        "type": "Ride",
+        "start_date_local": day.isoformat(),
+        "distance": 30000.0,
+        "moving_time": 3600,
+    }
+
+
+def stand_in_server(activities: list[dict], requests: list[httpx.Request]):
+    """Serve activities whose start date falls inside the requested window, bounds included like the real API."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        oldest = datetime.fromisoformat(request.url.params["oldest"])
+        newest = datetime.fromisoformat(request.url.params["newest"])
+        page = [
+            a for a in activities
+            if oldest <= datetime.fromisoformat(a["start_date_local"]) <= newest
+        ]
+        return httpx.Response(200, content=json.dumps(page).encode())
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_iter_activities_requests_date_windows():
+    """Test that the history is fetched window by window over one pooled client."""
+    activities = [icu_activity(f"i{n}", start + timedelta(days=n * 20)) for n in range(6)]
+    requests: list[httpx.Request] = []
+    http = create_http_client(transport=stand_in_server(activities, requests))
+
+    async with http:
+        client = IntervalsClient("key", http_client=http, window=timedelta(days=30))
+        mapped = [
+            a async for a in client.iter_activities_from_date(
+                "i1", start, start + timedelta(days=120) - timedelta(seconds=1)
+            )
+        ]
+
+    assert len(requests) == 4
+    assert all(r.url.path == "/api/v1/athlete/i1/activities" for r in requests)
+    assert [a.intervals_id for a in mapped] == ["i0", "i1", "i2", "i3", "i4", "i5"]
+    assert all(isinstance(a, CompletedActivity) for a in mapped)
+
+
+@pytest.mark.asyncio
+async def test_iter_activity_pages_fetches_boundary_activities_once():
+    """Test that an activity on a window boundary lands in exactly one window."""
+    activities = [icu_activity(f"i{n}", start + timedelta(days=30 * n)) for n in range(4)]
+    requests: list[httpx.Request] = []
+    http = create_http_client(transport=stand_in_server(activities, requests))
+
+    async with http:
+        client = IntervalsClient("key", http_client=http, window=timedelta(days=30))
+        pages = [p async for p in client.iter_activity_pages("i1", start, start + timedelta(days=90, microseconds=5))]
+
+    assert [a["id"] for page in pages for a in page] == ["i0", "i1", "i2", "i3"]
+    assert [r.url.params["newest"] for r in requests][:2] == [
+        (start + timedelta(days=30, seconds=-1)).isoformat(),
+        (start + timedelta(days=60, seconds=-1)).isoformat(),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_activity_pages_skips_empty_windows():
+    """Test that windows without activities do not produce pages."""
+    activities = [icu_activity("i1", start + timedelta(days=65))]
+    requests: list[httpx.Request] = []
+    http = create_http_client(transport=stand_in_server(activities, requests))
+
+    async with http:
+        client = IntervalsClient("key", http_client=http, window=timedelta(days=30))
+        pages = [p async for p in client.iter_activity_pages("i1", start, start + timedelta(days=90) - timedelta(seconds=1))]
+
+    assert len(requests) == 3
+    assert len(pages) == 1
+    assert pages[0][0]["id"] == "i1"
+
+
+@pytest.mark.asyncio
+async def test_iter_activity_pages_raises_on_error():
+    """Test that upstream errors are surfaced."""
+    transport = httpx.MockTransport(lambda request: httpx.Response(401))
+
+    async with IntervalsClient("bad", http_client=create_http_client(transport=transport)) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_activities_from_date("i1", start)
@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy import inspect
+import sys
+import uuid
+from pathlib import Path
+from datetime import datetime, timezone
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from app.enums import ActivitySource
+from app.integrations.intervals_icu.mappers import (
+    IcuMappingError,
+    icu_activity_id,
+    map_icu_activities_to_rows,
+    map_icu_activity_to_completed,
+    map_icu_activity_to_values,
+)
+from app.models.completed_activity import CompletedActivity
+
+athlete_id = uuid.uuid4()
+
+payload = {
+    "id": "i123",
+    "name": "Morning Ride",
+    "type": "Ride",
+    "start_date": "2026-01-06T11:00:00Z",
+    "start_date_local": "2026-01-06T12:00:00",
+    "trainer": False,
+    "distance": 30000,
+    "moving_time": 3600.0,
+    "icu_training_load": 85,
+    "feel": 3,
+    "gear": {"id": "b1", "name": "Road bike", "distance": 1200000.0},
+    "icu_sync_date": "2026-01-06T13:00:00Z",
+    "analyzed": "2026-01-06T13:01:00Z",
+}
+
+
+def test_map_values_converts_types():
+    """Test that payload values are converted to the column types."""
+    row = map_icu_activity_to_values(payload, athlete_id)
+
+    assert row["source"] == ActivitySource.INTERVALS
+    assert row["external_id"] == row["intervals_id"] == "i123"
+    assert row["athlete_id"] == athlete_id
+    assert row["start_date"] == datetime(2026, 1, 6, 11, 0, tzinfo=timezone.utc)
+    assert row["distance_m"] == 30000.0 and isinstance(row["distance_m"], float)
+    assert row["moving_time_s"] == 3600 and isinstance(row["moving_time_s"], int)
+    assert (row["gear_id"], row["gear_name"]) == ("b1", "Road bike")
+    assert row["analyzed"] is True
+    assert row["intervals_url"] == "https://intervals.icu/activities/i123"
+
+
+def test_map_values_defaults_missing_fields():
+    """Test that absent optional fields map to None."""
+    row = map_icu_activity_to_values({"id": "i1"}, athlete_id)
+
+    assert row["name"] is None
+    assert row["gear_id"] is None
+    assert row["start_date_local"] is None
+    assert row["analyzed"] is False
+
+
+def test_map_to_completed_builds_orm_object():
+    """Test the ORM wrapper around the row mapper."""
+    activity = map_icu_activity_to_completed(payload, athlete_id)
+
+    assert isinstance(activity, CompletedActivity)
+    assert activity.icu_feel == 3
+    state = inspect(activity)
+    assert state.transient
+    assert state.attrs.intervals_id.history.added == ["i123"]
+    assert state.attrs.gear_name.history.added == [payload["gear"]["name"]]
+
+
+def test_map_values_names_invalid_field():
+    """Test that validation errors point at the offending field."""
+    with pytest.raises(IcuMappingError, match="distance"):
+        map_icu_activity_to_values({"id": "i1", "distance": "far"}, athlete_id)
+
+    with pytest.raises(IcuMappingError, match="start_date_local"):
+        map_icu_activity_to_values({"id": "i1", "start_date_local": "yesterday"}, athlete_id)
+
+
+def test_map_rows_skips_invalid_payloads():
+    """Test that a batch keeps valid payloads and drops invalid ones."""
+    rows = map_icu_activities_to_rows(
+        [payload, {"id": "i2", "trainer": "yes"}, {"name": "no id"}, {"id": "i3"}], athlete_id
+    )
+
+    assert [row["intervals_id"] for row in rows] == ["i123", "i3"]
+
+
+def test_map_rows_skips_payloads_with_non_object_parents():
+    """Test that a scalar where a nested object is expected skips only that payload."""
+    rows = map_icu_activities_to_rows([{"id": "i1", "gear": "b1"}, {"id": "i2"}], athlete_id)
+
+    assert [row["intervals_id"] for row in rows] == ["i2"]
+    with pytest.raises(IcuMappingError, match="gear: expected an object"):
+        map_icu_activity_to_values({"id": "i1", "gear": "b1"}, athlete_id)
+
+
+def test_map_values_rejects_null_or_missing_id():
+    """Test that a payload without a usable id is a mapping error, not intervals_id "None"."""
+    for bad in ({"id": None}, {}, {"id": True}):
+        with pytest.raises(IcuMappingError, match="id"):
+            map_icu_activity_to_values(bad, athlete_id)
+
+    assert map_icu_activities_to_rows([{"id": None, "name": "x"}], athlete_id) == []
+    assert icu_activity_id({"id": 42}) == "42"
+    assert icu_activity_id({"id": None}) is None
+    assert icu_activity_id("not a payload") is None
@@ -0,0 +1,191 @@
+import pytest
+import sys
+import uuid
+from pathlib import Path
+from datetime import datetime, timezone, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+import httpx
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from app.integrations.intervals_icu.client import IntervalsClient, create_http_client
+from app.integrations.intervals_icu.rate_limit import TokenBucket, retry_after_seconds
+from app.integrations.intervals_icu.scheduler import SyncScheduler
+from app.integrations.intervals_icu.service import SyncResult
+from app.models.sync_state import AthleteSyncState
+
+start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill():
+    """Test that the bucket blocks once its burst capacity is spent."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=2, clock=clock)
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    with patch("app.integrations.intervals_icu.rate_limit.asyncio.sleep", fake_sleep):
+        for _ in range(3):
+            await bucket.acquire()
+
+    assert bucket.acquired == 3
+    assert slept == [pytest.approx(0.1)]
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_pause_blocks_all_callers():
+    """Test that a Retry-After pause holds back the next acquire."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=100, clock=clock)
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    bucket.pause(5)
+    with patch("app.integrations.intervals_icu.rate_limit.asyncio.sleep", fake_sleep):
+        await bucket.acquire()
+
+    assert slept[0] == pytest.approx(5)
+    assert bucket.throttled == 1
+
+
+def test_retry_after_seconds():
+    """Test parsing Retry-After given in seconds, and the fallback."""
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "7"}), default=1) == 7
+    assert retry_after_seconds(httpx.Response(429), default=1.5) == 1.5
+
+
+@pytest.mark.asyncio
+async def test_client_retries_after_429():
+    """Test that a throttled request is retried once Retry-After has passed."""
+    responses = iter([
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(200, content=b"[]"),
+    ])
+    transport = httpx.MockTransport(lambda request: next(responses))
+    bucket = TokenBucket(rate=1000)
+
+    async with IntervalsClient("key", http_client=create_http_client(transport=transport), rate_limiter=bucket) as client:
+        pages = [p async for p in client.iter_activity_pages("i1", start, start + timedelta(days=1))]
+
+    assert pages == []
+    assert bucket.acquired == 2
+    assert bucket.throttled == 1
+
+
+def mock_client(athlete):
+    return MagicMock(aclose=AsyncMock(), rate_limiter=None)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_interleaves_athletes_round_robin():
+    """Test that a long backfill does not hold a worker until it is finished."""
+    windows = {"big": 3, "small": 1}
+    turns = []
+
+    athletes = [MagicMock(id=uuid.uuid4(), intervals_icu_id=name) for name in windows]
+
+    async def begin_sync_run(db, athlete, overlap):
+        return AthleteSyncState(
+            athlete_id=athlete.id, intervals_icu_id=athlete.intervals_icu_id,
+            run_cursor=start, run_target=start + timedelta(days=windows[athlete.intervals_icu_id]),
+        )
+
+    async def sync_next_window(db, client, state, batch_size):
+        turns.append(state.intervals_icu_id)
+        state.run_cursor += timedelta(days=1)
+        if state.run_cursor >= state.run_target:
+            state.run_cursor = state.run_target = None
+        return SyncResult(inserted=1)
+
+    with patch("app.integrations.intervals_icu.service.begin_sync_run", begin_sync_run), \
+         patch("app.integrations.intervals_icu.service.sync_next_window", sync_next_window):
+        scheduler = SyncScheduler(client_for=mock_client, workers=1, session_factory=AsyncMock)
+        progress = await scheduler.run(athletes)
+
+    assert turns == ["big", "small", "big", "big"]
+    assert progress[athletes[0].id].inserted == 3
+    assert all(p.fraction_done == 1.0 for p in progress.values())
+
+    stats = scheduler.stats()
+    assert (stats.athletes_finished, stats.windows, stats.activities) == (2, 4, 4)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_isolates_failed_athlete():
+    """Test that one athlete's failure is recorded without stopping the others."""
+    athletes = [MagicMock(id=uuid.uuid4(), intervals_icu_id=name) for name in ("ok", "broken")]
+
+    async def begin_sync_run(db, athlete, overlap):
+        return AthleteSyncState(
+            athlete_id=athlete.id, intervals_icu_id=athlete.intervals_icu_id,
+            run_cursor=start, run_target=start + timedelta(days=1),
+        )
+
+    async def sync_next_window(db, client, state, batch_size):
+        if state.intervals_icu_id == "broken":
+            raise httpx.ConnectError("boom")
+        state.run_cursor = state.run_target = None
+        return SyncResult(updated=1)
+
+    with patch("app.integrations.intervals_icu.service.begin_sync_run", begin_sync_run), \
+         patch("app.integrations.intervals_icu.service.sync_next_window", sync_next_window), \
+         patch("app.integrations.intervals_icu.service.record_sync_error", AsyncMock()) as record_error:
+        scheduler = SyncScheduler(client_for=mock_client, workers=2, session_factory=AsyncMock)
+        progress = await scheduler.run(athletes)
+
+    assert progress[athletes[0].id].error is None
+    assert progress[athletes[1].id].error == "boom"
+    record_error.assert_awaited_once()
+    assert scheduler.stats().athletes_failed == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_reuses_one_client_per_athlete_with_its_limiter():
+    """Test that each athlete gets one client for all its windows, sharing the scheduler's bucket."""
+    athlete = MagicMock(id=uuid.uuid4(), intervals_icu_id="i1")
+    bucket = TokenBucket(rate=1000)
+    clients, seen = [], []
+
+    def client_for(athlete):
+        clients.append(mock_client(athlete))
+        return clients[-1]
+
+    async def begin_sync_run(db, athlete, overlap):
+        return AthleteSyncState(
+            athlete_id=athlete.id, intervals_icu_id=athlete.intervals_icu_id,
+            run_cursor=start, run_target=start + timedelta(days=3),
+        )
+
+    async def sync_next_window(db, client, state, batch_size):
+        seen.append(client)
+        state.run_cursor += timedelta(days=1)
+        if state.run_cursor >= state.run_target:
+            state.run_cursor = state.run_target = None
+        return SyncResult(inserted=1)
+
+    with patch("app.integrations.intervals_icu.service.begin_sync_run", begin_sync_run), \
+         patch("app.integrations.intervals_icu.service.sync_next_window", sync_next_window):
+        scheduler = SyncScheduler(client_for=client_for, workers=1, rate_limiter=bucket, session_factory=AsyncMock)
+        await scheduler.run([athlete])
+
+    assert len(clients) == 1 and seen == clients * 3
+    assert clients[0].rate_limiter is bucket
+    clients[0].aclose.assert_awaited_once()
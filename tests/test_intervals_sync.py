@@ -0,0 +1,335 @@
+import pytest
+import sys
+import uuid
+from pathlib import Path
+from datetime import datetime, time, timezone, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from app.integrations.intervals_icu import service
+from app.integrations.intervals_icu.mappers import map_icu_activity_to_values
+from app.models.completed_activity import CompletedActivity
+from app.models.icu_activity_archive import IcuActivityArchive
+from app.models.sync_state import AthleteSyncState
+from app.models.zone_times import ActivityZoneTimes
+
+athlete_id = uuid.uuid4()
+
+
+def rows_for(*icu_ids: str) -> list[dict]:
+    return [map_icu_activity_to_values({"id": i, "name": f"Ride {i}"}, athlete_id) for i in icu_ids]
+
+
+def mock_db(*returned_batches: list[tuple]):
+    """
+    Mock session whose activity upserts return the given (id, inserted[, intervals_id])
+    rows per call. Archive writes are recorded in db.archived and any other
+    statement in db.other.
+    """
+    db = AsyncMock()
+    db.archived = []
+    db.other = []
+    results = []
+    for batch in returned_batches:
+        result = MagicMock()
+        result.all.return_value = [
+            MagicMock(id=row[0], inserted=row[1], intervals_id=row[2] if len(row) > 2 else None) for row in batch
+        ]
+        results.append(result)
+    results = iter(results)
+
+    async def execute(stmt, *args, **kwargs):
+        table = getattr(stmt, "table", None)
+        if table is IcuActivityArchive.__table__:
+            db.archived.append(stmt)
+            return MagicMock()
+        if table is not CompletedActivity.__table__:
+            db.other.append(stmt)
+            return MagicMock()
+        db.upserts += 1
+        return next(results)
+
+    db.upserts = 0
+    db.execute.side_effect = execute
+    return db
+
+
+def test_upsert_statement_is_conditional_on_conflict():
+    """Test that the batch upsert only rewrites rows whose synced columns differ."""
+    sql = str(service.build_upsert_statement(rows_for("i1", "i2")).compile(dialect=postgresql.dialect()))
+
+    assert "ON CONFLICT (intervals_id) DO UPDATE" in sql
+    assert "completed_activities.name IS DISTINCT FROM excluded.name" in sql
+    assert "created_at IS DISTINCT FROM" not in sql
+    assert "RETURNING completed_activities.id, completed_activities.intervals_id, (xmax = 0) AS inserted" in sql
+
+
+@pytest.mark.asyncio
+async def test_upsert_counts_inserted_updated_unchanged():
+    """Test that counts are derived from the RETURNING rows of each batch."""
+    db = mock_db(
+        [(uuid.uuid4(), True), (uuid.uuid4(), False)],
+        [(uuid.uuid4(), True)],
+    )
+
+    result = await service.upsert_completed_activities(db, rows_for("i1", "i2", "i3", "i4", "i5"), batch_size=3)
+
+    assert db.upserts == 2
+    assert (result.inserted, result.updated, result.unchanged) == (2, 1, 2)
+    assert result.total == 5
+
+
+@pytest.mark.asyncio
+async def test_upsert_deduplicates_within_batch():
+    """Test that repeated payloads for one activity are written once."""
+    db = mock_db([(uuid.uuid4(), True)])
+
+    result = await service.upsert_completed_activities(db, rows_for("i1", "i1", "i1"))
+
+    assert db.upserts == 1
+    assert result.total == 1
+
+
+@pytest.mark.asyncio
+async def test_sync_buffers_pages_into_batches():
+    """Test that several small pages are written with one statement and one commit."""
+    async def pages(*args, **kwargs):
+        yield [{"id": "i1"}, {"id": "i2"}]
+        yield [{"id": "i3"}]
+
+    client = MagicMock()
+    client.iter_activity_pages = pages
+    db = mock_db([(uuid.uuid4(), True)])
+
+    result = await service.sync_intervals_activities_from_date(
+        db, client, athlete_id, "i42", datetime(2025, 1, 1, tzinfo=timezone.utc)
+    )
+
+    assert db.upserts == 1
+    assert len(db.archived) == 1
+    db.commit.assert_awaited_once()
+    assert (result.inserted, result.unchanged) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_sync_stores_zone_times_of_written_activities():
+    """Test that a written activity gets the zone times its payload carries."""
+    async def pages(*args, **kwargs):
+        yield [
+            {"id": "i1", "start_date_local": "2025-01-02T08:00:00", "icu_hr_zone_times": [60, 120]},
+            {"id": "i2", "start_date_local": "2025-01-03T08:00:00", "icu_hr_zone_times": [30]},
+        ]
+
+    client = MagicMock()
+    client.iter_activity_pages = pages
+    activity_id = uuid.uuid4()
+    db = mock_db([(activity_id, True, "i1")])
+
+    result = await service.sync_intervals_activities_from_date(
+        db, client, athlete_id, "i42", datetime(2025, 1, 1, tzinfo=timezone.utc)
+    )
+
+    assert result.written == {"i1": activity_id}
+    zone_inserts = [stmt for stmt in db.other if getattr(stmt, "table", None) == ActivityZoneTimes.__table__]
+    assert len(zone_inserts) == 1
+    params = zone_inserts[0].compile(dialect=postgresql.dialect()).params
+    assert params["activity_id_m0"] == activity_id
+    assert params["secs_m0"] == [60, 120] + [0] * 8
+
+
+@pytest.mark.asyncio
+async def test_sync_backfills_zone_times_of_unchanged_activities(monkeypatch):
+    """Test that activities the upsert left alone still get their zone times compared and saved."""
+    replaced = []
+
+    async def replace(db, activity_ids, rows):
+        replaced.append((list(activity_ids), rows))
+
+    monkeypatch.setattr(service.zone_time_service, "replace_activity_zone_times", replace)
+    existing_id = uuid.uuid4()
+    db = mock_db([])
+    execute = db.execute.side_effect
+
+    async def execute_with_previous(stmt, *args, **kwargs):
+        if getattr(stmt, "table", None) is None:
+            return MagicMock(all=MagicMock(return_value=[
+                MagicMock(id=existing_id, intervals_id="i1", athlete_id=athlete_id, start_date_local=datetime(2025, 1, 2, 8)),
+            ]))
+        return await execute(stmt, *args, **kwargs)
+
+    db.execute.side_effect = execute_with_previous
+    payload = {"id": "i1", "start_date_local": "2025-01-02T08:00:00", "icu_hr_zone_times": [60]}
+    rows = service._map_page([payload], athlete_id, datetime.now(timezone.utc))
+
+    result = await service.write_activity_payloads(db, [payload], rows)
+
+    assert result.unchanged == 1 and result.written == {}
+    (activity_ids, zone_rows), = replaced
+    assert activity_ids == [existing_id]
+    assert [(row["activity_id"], row["kind"]) for row in zone_rows] == [(existing_id, "hr")]
+
+
+def mock_athlete():
+    return MagicMock(id=athlete_id, intervals_icu_id="i42")
+
+
+def windowed_client(window: timedelta, pages_by_oldest: dict | None = None):
+    """Mock IntervalsClient that records the windows it was asked for."""
+    client = MagicMock(window=window)
+    client.windows = []
+
+    async def pages(intervals_athlete_id, oldest, newest):
+        client.windows.append((oldest, newest))
+        page = (pages_by_oldest or {}).get(oldest)
+        if page:
+            yield page
+
+    client.iter_activity_pages = pages
+    return client
+
+
+@pytest.mark.asyncio
+async def test_begin_sync_run_starts_from_watermark_with_overlap():
+    """Test that a new run re-reads the overlap before the last successful cursor."""
+    cursor = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    state = AthleteSyncState(athlete_id=athlete_id, intervals_icu_id="i42", cursor=cursor)
+    db = AsyncMock()
+    db.get.return_value = state
+
+    await service.begin_sync_run(db, mock_athlete(), overlap=timedelta(days=3))
+
+    assert state.run_cursor == cursor - timedelta(days=3)
+    assert state.run_target > cursor
+    db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_begin_sync_run_windows_repeat_within_a_day():
+    """Test that both ends of a run are day-aligned, so same-day runs request the same windows."""
+    cursor = datetime(2025, 6, 1, 17, 30, tzinfo=timezone.utc)
+    bounds = []
+    for _ in range(2):
+        state = AthleteSyncState(athlete_id=athlete_id, intervals_icu_id="i42", cursor=cursor)
+        db = AsyncMock()
+        db.get.return_value = state
+        await service.begin_sync_run(db, mock_athlete(), overlap=timedelta(days=3))
+        bounds.append((state.run_cursor, state.run_target))
+
+    assert bounds[0] == bounds[1]
+    assert bounds[0][0] == datetime(2025, 5, 29, tzinfo=timezone.utc)
+    assert bounds[0][1].time() == time(23, 59, 59)
+
+
+@pytest.mark.asyncio
+async def test_begin_sync_run_resumes_unfinished_run():
+    """Test that a crashed run continues from its last committed window."""
+    run_cursor = datetime(2025, 5, 20, tzinfo=timezone.utc)
+    run_target = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    state = AthleteSyncState(
+        athlete_id=athlete_id, intervals_icu_id="i42",
+        cursor=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        run_cursor=run_cursor, run_target=run_target,
+    )
+    db = AsyncMock()
+    db.get.return_value = state
+
+    await service.begin_sync_run(db, mock_athlete())
+
+    assert (state.run_cursor, state.run_target) == (run_cursor, run_target)
+
+
+@pytest.mark.asyncio
+async def test_get_sync_state_bootstraps_from_synced_activities():
+    """Test that the first watermark is derived from already synced activities."""
+    last_sync = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    db = AsyncMock()
+    db.add = MagicMock()
+    db.get.return_value = None
+    db.execute.return_value.scalar_one = MagicMock(return_value=last_sync)
+
+    state = await service.get_sync_state(db, mock_athlete())
+
+    assert state.cursor == last_sync
+    assert state.intervals_icu_id == "i42"
+    db.add.assert_called_once_with(state)
+
+
+@pytest.mark.asyncio
+async def test_begin_sync_run_rejects_athlete_without_intervals_id():
+    """Test that an unlinked athlete fails clearly instead of on the NOT NULL column."""
+    db = AsyncMock()
+    db.add = MagicMock()
+
+    with pytest.raises(service.IntervalsNotLinked):
+        await service.begin_sync_run(db, MagicMock(id=athlete_id, intervals_icu_id=None))
+
+    db.add.assert_not_called()
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_sync_intervals_athlete_commits_each_window_and_advances_cursor():
+    """Test that every window commits its rows together with the advanced cursor."""
+    run_cursor = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    run_target = run_cursor + timedelta(days=25)
+    state = AthleteSyncState(
+        athlete_id=athlete_id, intervals_icu_id="i42",
+        run_cursor=run_cursor, run_target=run_target,
+    )
+    client = windowed_client(timedelta(days=10), {run_cursor: [{"id": "i1"}, {"id": "i2"}]})
+    db = mock_db([(uuid.uuid4(), True), (uuid.uuid4(), True)])
+    db.get.return_value = state
+
+    result = await service.sync_intervals_athlete(db, client, mock_athlete())
+
+    second = timedelta(seconds=1)
+    assert client.windows == [
+        (run_cursor, run_cursor + timedelta(days=10) - second),
+        (run_cursor + timedelta(days=10), run_cursor + timedelta(days=20) - second),
+        (run_cursor + timedelta(days=20), run_target),
+    ]
+    assert db.commit.await_count == 4
+    assert result.inserted == 2
+    assert state.cursor == run_target
+    assert not state.in_progress
+
+
+@pytest.mark.asyncio
+async def test_upsert_refreshes_daily_summaries_of_written_days(monkeypatch):
+    """Test that a batch refreshes the old and new days of changed activities only."""
+    refreshed = []
+
+    async def refresh(db, athlete_days):
+        refreshed.extend(athlete_days)
+
+    monkeypatch.setattr(service.daily_summary_service, "refresh_daily_summaries", refresh)
+    rows = [
+        map_icu_activity_to_values({"id": "i1", "start_date_local": "2025-01-03T08:00:00"}, athlete_id),
+        map_icu_activity_to_values({"id": "i2", "start_date_local": "2025-01-04T08:00:00"}, athlete_id),
+    ]
+    db = mock_db([(uuid.uuid4(), False, "i1")])
+    execute = db.execute.side_effect
+
+    async def execute_with_previous(stmt, *args, **kwargs):
+        if getattr(stmt, "table", None) is None:
+            previous = MagicMock()
+            previous.all.return_value = [
+                MagicMock(intervals_id="i1", athlete_id=athlete_id, start_date_local=datetime(2025, 1, 2, 8)),
+                MagicMock(intervals_id="i2", athlete_id=athlete_id, start_date_local=datetime(2025, 1, 4, 8)),
+            ]
+            return previous
+        return await execute(stmt, *args, **kwargs)
+
+    db.execute.side_effect = execute_with_previous
+
+    result = await service.upsert_completed_activities(db, rows)
+
+    days = {day for _, day in refreshed}
+    assert days == {datetime(2025, 1, 2).date(), datetime(2025, 1, 3).date()}
+    # The same days are handed to the calendar cache once the sync commits
+    assert result.days == {(athlete_id, day) for day in days}
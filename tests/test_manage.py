@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from app.db import manage
+from app.db.base import Base
+
+
+def mock_engine(tables, invalid=()):
+    """Engine whose connection reports only the given tables as present and the given indexes as invalid."""
+    conn = AsyncMock()
+    conn.execution_options.return_value = conn
+    conn.run_sync.side_effect = lambda fn: fn(MagicMock())
+
+    async def execute(statement, params=None):
+        result = MagicMock()
+        result.scalars.return_value = [name for name in invalid if name in (params or {}).get("names", ())]
+        return result
+
+    conn.execute.side_effect = execute
+    connect = MagicMock()
+    connect.__aenter__ = AsyncMock(return_value=conn)
+    connect.__aexit__ = AsyncMock(return_value=False)
+    engine = MagicMock()
+    engine.connect.return_value = connect
+    inspector = MagicMock()
+    inspector.has_table.side_effect = lambda name: name in tables
+    return engine, conn, inspector
+
+
+async def ddl_sent(engine, conn, inspector) -> list[str]:
+    with patch("app.db.manage.engine", engine), patch("app.db.manage.inspect", return_value=inspector):
+        await manage.create_missing_indexes()
+    return [
+        str(call.args[0].compile(dialect=postgresql.dialect())).strip()
+        for call in conn.execute.await_args_list[1:]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_create_missing_indexes_skips_tables_not_created_yet():
+    """An older database without the newer tables gets indexes only on the tables it has."""
+    statements = await ddl_sent(*mock_engine({"completed_activities"}))
+
+    expected = Base.metadata.tables["completed_activities"].indexes
+    assert expected and len(statements) == len(expected)
+    assert all(
+        " INDEX CONCURRENTLY IF NOT EXISTS " in statement and " ON completed_activities " in statement
+        for statement in statements
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_missing_indexes_rebuilds_invalid_indexes():
+    """An index left INVALID by an interrupted concurrent build is dropped and built again."""
+    engine, conn, inspector = mock_engine({"completed_activities"}, invalid={"ix_completed_activities_athlete_start"})
+    statements = await ddl_sent(engine, conn, inspector)
+
+    lookup = conn.execute.await_args_list[0]
+    assert "indisvalid" in str(lookup.args[0])
+    assert sorted(lookup.args[1]["names"]) == sorted(index.name for index in Base.metadata.tables["completed_activities"].indexes)
+    assert statements == [
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_completed_activities_athlete_start",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_completed_activities_athlete_start "
+        "ON completed_activities (athlete_id, start_date_local DESC NULLS FIRST, id DESC)",
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_completed_activities_external_id "
+        "ON completed_activities (external_id)",
+    ]
+
+
+def test_create_missing_indexes_leaves_the_models_untouched():
+    """The concurrent option is set on copies, so create_all still builds plain indexes."""
+    assert not any(
+        index.dialect_options["postgresql"]["concurrently"]
+        for table in Base.metadata.sorted_tables
+        for index in table.indexes
+    )
@@ -2,7 +2,7 @@ import pytest
 import sys
 from pathlib import Path
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from unittest.mock import AsyncMock, patch, MagicMock
 from httpx import AsyncClient, ASGITransport
 from contextlib import asynccontextmanager
@@ -14,6 +14,10 @@ sys.path.insert(0, str(SRC))
 
 from app.main import app
 from app.db.session import get_db
+from app.enums import ActivityType
+from app.services import activities_service, reconciliation_service
+from app.services.reconciliation_service import _Candidate
+from sqlalchemy.dialects import postgresql
 
 
 @asynccontextmanager
@@ -76,7 +80,7 @@ async def test_planned_activity_get_by_athlete_mocked():
     async with mock_app() as client:
         athlete_id, activity_id = uuid.uuid4(), uuid.uuid4()
         with patch("app.services.planned_activity_service.get_planned_activities_by_athlete") as mock_get:
-            mock_get.return_value = [
+            mock_get.return_value = ([
                 mock_obj(
                     id=activity_id,
                     athlete_id=athlete_id,
@@ -92,10 +96,12 @@ async def test_planned_activity_get_by_athlete_mocked():
                     linked_activity_id=None,
                     created_at=datetime.now(timezone.utc),
                 )
-            ]
+            ], None)
 
             r = await client.get(f"/myactivities/plannedActivities/athlete/{athlete_id}")
             assert r.status_code == 200
+            assert r.json()["next_cursor"] is None
+            assert len(r.json()["items"]) == 1
 
 
 @pytest.mark.asyncio
@@ -103,8 +109,7 @@ async def test_planned_activity_update_mocked():
     """Test planned activity update."""
     async with mock_app() as client:
         activity_id = uuid.uuid4()
-        with patch("app.services.planned_activity_service.get_planned_activity_by_id") as mock_get, \
-             patch("app.services.planned_activity_service.update_planned_activity") as mock_update:
+        with patch("app.services.planned_activity_service.update_planned_activity") as mock_update:
             mock_activity = mock_obj(
                 id=activity_id,
                 athlete_id=uuid.uuid4(),
@@ -120,11 +125,15 @@ async def test_planned_activity_update_mocked():
                 linked_activity_id=None,
                 created_at=datetime.now(timezone.utc),
             )
-            mock_get.return_value = mock_activity
             mock_update.return_value = mock_activity
 
             r = await client.put(f"/myactivities/plannedActivities/{activity_id}", json={"name": "Updated"})
             assert r.status_code == 200
+            assert mock_update.call_args.args[1] == activity_id
+
+            mock_update.return_value = None
+            r = await client.put(f"/myactivities/plannedActivities/{activity_id}", json={"name": "Updated"})
+            assert r.status_code == 404
 
 
 @pytest.mark.asyncio
@@ -132,12 +141,278 @@ async def test_planned_activity_delete_mocked():
     """Test planned activity deletion."""
     async with mock_app() as client:
         activity_id = uuid.uuid4()
-        with patch("app.services.planned_activity_service.get_planned_activity_by_id") as mock_get, \
-             patch("app.services.planned_activity_service.delete_planned_activity") as mock_delete:
-            mock_get.return_value = mock_obj(
-                id=activity_id,
-            )
-            mock_delete.return_value = None
+        with patch("app.services.planned_activity_service.delete_planned_activity") as mock_delete:
+            mock_delete.return_value = True
 
             r = await client.delete(f"/myactivities/plannedActivities/{activity_id}")
             assert r.status_code == 204
+            assert mock_delete.call_args.args[1] == activity_id
+
+            mock_delete.return_value = False
+            r = await client.delete(f"/myactivities/plannedActivities/{activity_id}")
+            assert r.status_code == 404
+
+
+def candidate(day, sport=ActivityType.run, duration_s=None, distance_m=None):
+    return _Candidate(uuid.uuid4(), date(2026, 1, day), sport, duration_s, distance_m)
+
+
+def test_match_plans_pairs_same_day_and_sport_closest_first():
+    """Test that each plan takes the same-day, same-sport activity closest to its target."""
+    easy = candidate(5, duration_s=1800)
+    long = candidate(5, duration_s=5400)
+    ride = candidate(6, ActivityType.ride, distance_m=40000)
+    unmatched = candidate(7)
+    short_run = candidate(5, duration_s=2000)
+    long_run = candidate(5, duration_s=5000)
+    trainer_ride = candidate(6, ActivityType.ride, distance_m=35000)
+    other_day_run = candidate(8)
+
+    links = reconciliation_service.match_plans(
+        [easy, long, ride, unmatched], [long_run, short_run, trainer_ride, other_day_run]
+    )
+
+    assert set(links) == {(easy.id, short_run.id), (long.id, long_run.id), (ride.id, trainer_ride.id)}
+
+
+def test_sport_family_groups_completed_sport_types():
+    assert reconciliation_service.sport_family("VirtualRide") == ActivityType.ride
+    assert reconciliation_service.sport_family("TrailRun") == ActivityType.run
+    assert reconciliation_service.sport_family("OpenWaterSwim") == ActivityType.swim
+    assert reconciliation_service.sport_family("WeightTraining") == ActivityType.other
+    assert reconciliation_service.sport_family(None) == ActivityType.other
+
+
+def test_match_plans_leaves_pairs_far_from_the_targets_unlinked():
+    """Test that a same-day, same-sport activity far off the plan's targets does not fulfil it."""
+    long_ride = candidate(5, ActivityType.ride, duration_s=4 * 3600)
+    spin = candidate(5, ActivityType.ride, duration_s=600)
+    no_targets = candidate(6, ActivityType.ride)
+    any_ride = candidate(6, ActivityType.ride, duration_s=600)
+
+    links = reconciliation_service.match_plans([long_ride, no_targets], [spin, any_ride])
+
+    assert links == [(no_targets.id, any_ride.id)]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_plans_without_matches_releases_the_lock():
+    """Test that a run with nothing to link ends its transaction instead of committing."""
+    plans, activities = MagicMock(), MagicMock()
+    plans.all.return_value = []
+    activities.all.return_value = []
+    db = AsyncMock()
+    db.execute.side_effect = [MagicMock(), plans, activities]
+
+    result = await reconciliation_service.reconcile_plans(
+        db, uuid.uuid4(), datetime(2026, 1, 5, tzinfo=timezone.utc), datetime(2026, 1, 11, tzinfo=timezone.utc)
+    )
+
+    assert result == {"linked": [], "missed": []}
+    db.rollback.assert_awaited_once()
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_reconcile_plans_links_in_one_update_and_reports_missed():
+    """Test that all links go out in a single UPDATE ... FROM (VALUES ...) and unmatched past plans are missed."""
+    athlete_id = uuid.uuid4()
+    done, skipped, upcoming = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    activity = uuid.uuid4()
+    plans, activities = MagicMock(), MagicMock()
+    plans.all.return_value = [
+        mock_obj(id=done, scheduled_date=datetime(2026, 1, 5, 7, tzinfo=timezone.utc), type=ActivityType.run, target_duration=3600, target_distance=None),
+        mock_obj(id=skipped, scheduled_date=datetime(2026, 1, 6, 7, tzinfo=timezone.utc), type=ActivityType.swim, target_duration=None, target_distance=None),
+        mock_obj(id=upcoming, scheduled_date=datetime(2026, 1, 9, 7, tzinfo=timezone.utc), type=ActivityType.run, target_duration=None, target_distance=None),
+    ]
+    activities.all.return_value = [
+        mock_obj(id=activity, start_date_local=datetime(2026, 1, 5, 18, tzinfo=timezone.utc), sport_type="Run", moving_time_s=3500, distance_m=10000.0),
+    ]
+    updated = MagicMock()
+    updated.all.return_value = [(done, activity)]
+    db = AsyncMock()
+    db.execute.side_effect = [MagicMock(), plans, activities, updated]
+
+    result = await reconciliation_service.reconcile_plans(
+        db, athlete_id, datetime(2026, 1, 5, tzinfo=timezone.utc), datetime(2026, 1, 11, tzinfo=timezone.utc), today=date(2026, 1, 8)
+    )
+
+    assert result == {
+        "linked": [{"planned_activity_id": done, "completed_activity_id": activity}],
+        "missed": [skipped],
+    }
+    assert db.execute.await_count == 4
+    lock = db.execute.await_args_list[0].args[0].compile(dialect=postgresql.dialect())
+    assert str(lock).startswith("SELECT pg_advisory_xact_lock(")
+    assert list(lock.params.values()) == [reconciliation_service._lock_key(athlete_id)]
+    sql = str(db.execute.await_args_list[3].args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE planned_activities SET linked_activity_id=links.activity_id")
+    assert "FROM (VALUES" in sql
+    assert "NOT (EXISTS (SELECT" in sql and "planned_activities_1.linked_activity_id = links.activity_id" in sql
+    assert sql.endswith("RETURNING planned_activities.id, planned_activities.linked_activity_id")
+    db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_reconcile_plans_reports_only_the_links_the_update_made():
+    """Test that a plan or activity linked concurrently is not reported as linked."""
+    athlete_id = uuid.uuid4()
+    raced, kept = uuid.uuid4(), uuid.uuid4()
+    first, second = uuid.uuid4(), uuid.uuid4()
+    plans, activities = MagicMock(), MagicMock()
+    plans.all.return_value = [
+        mock_obj(id=raced, scheduled_date=datetime(2026, 1, 5, 7, tzinfo=timezone.utc), type=ActivityType.run, target_duration=None, target_distance=None),
+        mock_obj(id=kept, scheduled_date=datetime(2026, 1, 6, 7, tzinfo=timezone.utc), type=ActivityType.run, target_duration=None, target_distance=None),
+    ]
+    activities.all.return_value = [
+        mock_obj(id=first, start_date_local=datetime(2026, 1, 5, 18, tzinfo=timezone.utc), sport_type="Run", moving_time_s=None, distance_m=None),
+        mock_obj(id=second, start_date_local=datetime(2026, 1, 6, 18, tzinfo=timezone.utc), sport_type="Run", moving_time_s=None, distance_m=None),
+    ]
+    updated = MagicMock()
+    updated.all.return_value = [(kept, second)]
+    db = AsyncMock()
+    db.execute.side_effect = [MagicMock(), plans, activities, updated]
+
+    with patch("app.services.reconciliation_service.calendar_cache") as cache:
+        result = await reconciliation_service.reconcile_plans(
+            db, athlete_id, datetime(2026, 1, 5, tzinfo=timezone.utc), datetime(2026, 1, 11, tzinfo=timezone.utc), today=date(2026, 1, 8)
+        )
+
+    assert result == {
+        "linked": [{"planned_activity_id": kept, "completed_activity_id": second}],
+        "missed": [raced],
+    }
+    cache.invalidate.assert_called_once_with(athlete_id, [date(2026, 1, 6)])
+
+
+@pytest.mark.asyncio
+async def test_reconcile_endpoint():
+    async with mock_app() as client:
+        athlete_id, plan_id = uuid.uuid4(), uuid.uuid4()
+        with patch("app.services.reconciliation_service.reconcile_plans") as mock_reconcile:
+            mock_reconcile.return_value = {"linked": [], "missed": [plan_id]}
+
+            r = await client.post(
+                f"/myactivities/plannedActivities/athlete/{athlete_id}/reconcile",
+                params={"start_date": "2026-01-05T00:00:00Z", "end_date": "2026-01-11T23:59:59Z"},
+            )
+            assert r.status_code == 200
+            assert r.json() == {"linked": [], "missed": [str(plan_id)]}
+
+
+def test_calendar_reports_past_unfinished_plans_as_missed():
+    """Test that the calendar query derives missed from the start of today."""
+    stmt = activities_service.calendar_statement(
+        uuid.uuid4(), datetime(2026, 1, 1, tzinfo=timezone.utc), datetime(2026, 1, 31, tzinfo=timezone.utc), today=date(2026, 1, 8)
+    )
+    compiled = stmt.compile(dialect=postgresql.dialect())
+
+    assert "missed" in compiled.params.values()
+    assert datetime(2026, 1, 8, tzinfo=timezone.utc) in compiled.params.values()
+
+
+def plan_payload(athlete_id, day, name="Workout"):
+    return {
+        "athlete_id": str(athlete_id), "name": name, "type": "Ride",
+        "scheduled_date": datetime(2026, 3, day, 7, tzinfo=timezone.utc).isoformat(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_create_returns_items_in_request_order():
+    athlete_id = uuid.uuid4()
+    payload = [plan_payload(athlete_id, day, f"Workout {day}") for day in range(1, 29)]
+
+    async def created(db, activities_in):
+        return [
+            mock_obj(
+                id=uuid.uuid4(), linked_activity_id=None, created_at=datetime.now(timezone.utc),
+                **activity_in.model_dump(),
+            )
+            for activity_in in activities_in
+        ]
+
+    async with mock_app() as client:
+        with patch("app.services.planned_activity_service.create_planned_activities", side_effect=created) as mock_create:
+            r = await client.post("/myactivities/plannedActivities/batch", json=payload)
+
+    assert r.status_code == 201
+    assert [item["name"] for item in r.json()] == [item["name"] for item in payload]
+    assert mock_create.await_count == 1
+    assert len(mock_create.call_args.args[1]) == 28
+
+
+@pytest.mark.asyncio
+async def test_batch_create_rejects_the_whole_list_on_one_invalid_item():
+    athlete_id = uuid.uuid4()
+    payload = [plan_payload(athlete_id, 1), {**plan_payload(athlete_id, 2), "type": "Rowing"}, plan_payload(athlete_id, 3)]
+
+    async with mock_app() as client:
+        with patch("app.services.planned_activity_service.create_planned_activities") as mock_create:
+            r = await client.post("/myactivities/plannedActivities/batch", json=payload)
+            empty = await client.post("/myactivities/plannedActivities/batch", json=[])
+
+    assert r.status_code == 422
+    assert [error["loc"][:2] for error in r.json()["detail"]] == [["body", 1]]
+    assert empty.status_code == 422
+    mock_create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_create_reports_unknown_athletes_per_item():
+    from app.services.planned_activity_service import UnknownAthletes
+
+    payload = [plan_payload(uuid.uuid4(), day) for day in range(1, 4)]
+    async with mock_app() as client:
+        with patch(
+            "app.services.planned_activity_service.create_planned_activities", side_effect=UnknownAthletes([0, 2])
+        ):
+            r = await client.post("/myactivities/plannedActivities/batch", json=payload)
+
+    assert r.status_code == 422
+    assert [error["loc"] for error in r.json()["detail"]] == [["body", 0, "athlete_id"], ["body", 2, "athlete_id"]]
+
+
+@pytest.mark.asyncio
+async def test_create_planned_activities_inserts_in_one_statement_and_commits_once():
+    from app.schemas.planned_activity import PlannedActivityCreate
+    from app.services import planned_activity_service
+    from app.services.calendar_cache import calendar_cache
+
+    athlete_id = uuid.uuid4()
+    activities_in = [PlannedActivityCreate(**plan_payload(athlete_id, day)) for day in range(1, 4)]
+    rows = [mock_obj(athlete_id=athlete_id, scheduled_date=a.scheduled_date) for a in activities_in]
+    db = AsyncMock()
+    db.execute.return_value = MagicMock(all=MagicMock(return_value=rows))
+
+    with patch.object(calendar_cache, "invalidate_days") as invalidate:
+        assert await planned_activity_service.create_planned_activities(db, activities_in) == rows
+
+    statement, parameters = db.execute.call_args.args
+    assert db.execute.await_count == 1
+    assert str(statement).startswith("INSERT INTO planned_activities") and "RETURNING" in str(statement)
+    assert [p["name"] for p in parameters] == ["Workout"] * 3
+    db.commit.assert_awaited_once()
+    assert len(list(invalidate.call_args.args[0])) == 3
+
+
+@pytest.mark.asyncio
+async def test_create_planned_activities_rolls_back_and_names_unknown_athletes():
+    from sqlalchemy.exc import IntegrityError
+    from app.schemas.planned_activity import PlannedActivityCreate
+    from app.services import planned_activity_service
+
+    known, unknown = uuid.uuid4(), uuid.uuid4()
+    activities_in = [PlannedActivityCreate(**plan_payload(athlete_id, 1)) for athlete_id in (known, unknown, known)]
+    db = AsyncMock()
+    db.execute.side_effect = [
+        IntegrityError("INSERT", {}, Exception("violates foreign key constraint")),
+        MagicMock(scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[known])))),
+    ]
+
+    with pytest.raises(planned_activity_service.UnknownAthletes) as exc:
+        await planned_activity_service.create_planned_activities(db, activities_in)
+
+    assert exc.value.indexes == [1]
+    db.rollback.assert_awaited_once()
+    db.commit.assert_not_awaited()
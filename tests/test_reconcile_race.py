@@ -0,0 +1,107 @@
+"""
+Concurrent plan reconciliation against a real database: two runs of one
+athlete must not link the same completed activity to two plans.
+
+Runs against a throwaway local Postgres named by MYACTIVITIES_PLAN_DATABASE_URL,
+like test_query_plans. The schema in that database is dropped and recreated.
+Skipped when unset.
+"""
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db import manage  # noqa: F401 - registers every model on Base.metadata
+from app.models.planned_activity import PlannedActivity
+from app.services import reconciliation_service
+
+DATABASE_URL = os.environ.get("MYACTIVITIES_PLAN_DATABASE_URL")
+
+pytestmark = [
+    pytest.mark.skipif(not DATABASE_URL, reason="MYACTIVITIES_PLAN_DATABASE_URL is not set"),
+    pytest.mark.asyncio(loop_scope="module"),
+]
+
+DAY = datetime(2026, 1, 5, tzinfo=timezone.utc)
+NOON = datetime(2026, 1, 5, 12, tzinfo=timezone.utc)
+END_OF_DAY = datetime(2026, 1, 5, 23, 59, 59, tzinfo=timezone.utc)
+
+# One run at noon, and a run planned on each side of it
+SEED = [
+    """
+    INSERT INTO athletes (id, email, ai_enabled, created_at, updated_at)
+    VALUES (:athlete_id, :email, true, now(), now())
+    """,
+    """
+    INSERT INTO completed_activities
+        (id, athlete_id, source, name, sport_type, start_date, start_date_local,
+         distance_m, moving_time_s, icu_training_load, analyzed)
+    VALUES (:activity_id, :athlete_id, 'INTERVALS', 'Run', 'Run', :noon, :noon, 10000, 3600, 50, false)
+    """,
+    """
+    INSERT INTO planned_activities (id, athlete_id, name, type, scheduled_date, completed, created_at)
+    VALUES (gen_random_uuid(), :athlete_id, 'Morning run', 'run', :noon - interval '5 hours', false, now()),
+           (gen_random_uuid(), :athlete_id, 'Evening run', 'run', :noon + interval '6 hours', false, now())
+    """,
+]
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def engine():
+    engine = create_async_engine(DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+async def test_concurrent_reconciles_link_an_activity_once(engine):
+    athlete_id, activity_id = uuid.uuid4(), uuid.uuid4()
+    params = {"athlete_id": athlete_id, "email": f"{athlete_id}@example.com", "activity_id": activity_id, "noon": NOON}
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement), params)
+
+    first_updated, release_first = asyncio.Event(), asyncio.Event()
+    async with AsyncSession(engine) as first, AsyncSession(engine) as second:
+        commit = first.commit
+
+        async def held_commit():
+            # The first run has linked the activity but not committed yet
+            first_updated.set()
+            await release_first.wait()
+            await commit()
+
+        first.commit = held_commit
+        # Each run only sees the plan on its side of noon, and both see the activity
+        first_run = asyncio.create_task(reconciliation_service.reconcile_plans(first, athlete_id, DAY, NOON))
+        await first_updated.wait()
+        second_run = asyncio.create_task(reconciliation_service.reconcile_plans(second, athlete_id, NOON, END_OF_DAY))
+        await asyncio.sleep(0.2)
+        assert not second_run.done(), "the second reconcile did not wait for the first"
+
+        release_first.set()
+        first_result, second_result = await asyncio.gather(first_run, second_run)
+
+    assert [link["completed_activity_id"] for link in first_result["linked"]] == [activity_id]
+    assert second_result["linked"] == []
+    async with AsyncSession(engine) as db:
+        links = (await db.execute(
+            select(func.count()).where(PlannedActivity.linked_activity_id == activity_id)
+        )).scalar_one()
+    assert links == 1
@@ -0,0 +1,136 @@
+import pytest
+import sys
+from pathlib import Path
+import uuid
+import numpy as np
+from unittest.mock import AsyncMock, patch, MagicMock
+from httpx import AsyncClient, ASGITransport
+from contextlib import asynccontextmanager
+
+# Ensure src is on path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from app.main import app
+from app.db.session import get_db
+from app.integrations.intervals_icu import service as intervals_service
+from app.services import activity_stream_service
+
+
+@asynccontextmanager
+async def mock_app():
+    """Async context manager that provides a test client with mocked DB."""
+    mock_db = AsyncMock()
+
+    async def override_get_db():
+        yield mock_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_encode_decode_stream_is_float32_and_zero_copy():
+    """Test that samples round-trip as float32 with gaps kept as NaN."""
+    data = activity_stream_service.encode_stream([100, None, 250.5])
+    samples = activity_stream_service.decode_stream(data)
+
+    assert len(data) == 12
+    assert samples.dtype == np.float32
+    assert not samples.flags.owndata
+    assert samples[0] == 100 and np.isnan(samples[1]) and samples[2] == 250.5
+
+
+def test_downsample_averages_buckets_ignoring_gaps():
+    """Test bucket averaging with missing samples."""
+    samples = np.array([1, 3, np.nan, 5, 6, 8], dtype=np.float32)
+
+    assert activity_stream_service.downsample(samples, 3).tolist() == [2.0, 5.0, 7.0]
+    assert activity_stream_service.downsample(samples, 10) is samples
+
+
+@pytest.mark.asyncio
+async def test_get_stream_slice_requests_byte_range():
+    """Test that a slice only asks Postgres for the bytes it needs."""
+    db = AsyncMock()
+    db.execute.return_value.one_or_none = MagicMock(
+        return_value=MagicMock(sample_count=3600, data=activity_stream_service.encode_stream([200.0] * 60))
+    )
+
+    sample_count, samples = await activity_stream_service.get_stream_slice(db, uuid.uuid4(), "watts", 600, 660)
+
+    sql = str(db.execute.await_args.args[0])
+    assert "substring(activity_streams.data" in sql
+    assert sample_count == 3600
+    assert len(samples) == 60
+
+
+@pytest.mark.asyncio
+async def test_get_stream_slice_downsampled():
+    """Test the stream endpoint with a slice and downsampling."""
+    async with mock_app() as client:
+        activity_id = uuid.uuid4()
+        with patch("app.services.activity_stream_service.get_stream_slice") as mock_slice:
+            mock_slice.return_value = (3600, np.array([100, 200, np.nan, 300], dtype=np.float32))
+
+            r = await client.get(
+                f"/myactivities/streams/{activity_id}/watts", params={"start": 10, "end": 14, "points": 2}
+            )
+            assert r.status_code == 200
+            body = r.json()
+            assert body["data"] == [150.0, 300.0]
+            assert (body["start"], body["end"], body["step"]) == (10, 14, 2.0)
+            mock_slice.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_stream_keeps_gaps_as_null():
+    """Test that missing samples are returned as null."""
+    async with mock_app() as client:
+        with patch("app.services.activity_stream_service.get_stream_slice") as mock_slice:
+            mock_slice.return_value = (2, np.array([120, np.nan], dtype=np.float32))
+
+            r = await client.get(f"/myactivities/streams/{uuid.uuid4()}/heartrate")
+            assert r.status_code == 200
+            assert r.json()["data"] == [120.0, None]
+
+
+@pytest.mark.asyncio
+async def test_get_stream_not_found():
+    """Test 404 for a missing channel."""
+    async with mock_app() as client:
+        with patch("app.services.activity_stream_service.get_stream_slice") as mock_slice:
+            mock_slice.return_value = None
+
+            r = await client.get(f"/myactivities/streams/{uuid.uuid4()}/watts")
+            assert r.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_stream_rejects_reversed_range():
+    """Test 400 when end is before start."""
+    async with mock_app() as client:
+        r = await client.get(f"/myactivities/streams/{uuid.uuid4()}/watts", params={"start": 10, "end": 5})
+        assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_sync_activity_streams_commits_streams_and_curves_together():
+    """Test that the streams and the curves derived from them land in one commit."""
+    db = AsyncMock()
+    client = AsyncMock()
+    client.get_activity_streams.return_value = {"watts": [200.0, 300.0], "heartrate": [120.0, 130.0]}
+    calls = MagicMock()
+    db.commit.side_effect = lambda: calls.commit()
+
+    with patch("app.services.curve_service.compute_activity_curves") as mock_curves:
+        mock_curves.side_effect = lambda db, activity_id: calls.curves()
+        channels = await intervals_service.sync_intervals_activity_streams(db, client, uuid.uuid4(), "i42")
+
+    assert channels == ["heartrate", "watts"]
+    assert "ON CONFLICT (activity_id, channel) DO UPDATE" in str(db.execute.await_args.args[0])
+    assert [name for name, _, _ in calls.mock_calls] == ["curves", "commit"]